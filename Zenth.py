@@ -1,847 +1,2178 @@
-import tkinter as tk
-from tkinter import ttk, simpledialog
-import math
-import decimal
-import re
-import sys
-import os
-
-def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and for PyInstaller """
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-
-    return os.path.join(base_path, relative_path)
-
-class CustomToplevel(tk.Toplevel):
-    """A custom Toplevel window with a draggable title bar."""
-    def __init__(self, parent, title, **kwargs):
-        super().__init__(parent, **kwargs)
-        
-        # These lines ensure the pop-up stays on top of and moves with the parent window.
-        self.transient(parent)
-        self.grab_set()
-        
-        self.overrideredirect(True)
-        self.parent = parent
-        self.title_text = title
-        
-        # Style
-        self.bg = '#2d2d2d'
-        self.title_bar_bg = '#1e1e1e'
-        self.fg = 'white'
-        self.configure(bg=self.bg)
-
-        # Title Bar
-        self.title_bar = tk.Frame(self, bg=self.title_bar_bg, height=30)
-        self.title_bar.pack(fill='x', side='top')
-        
-        close_button = self.create_title_bar_button('✕', self.on_close, hover_color='#ff4444')
-        close_button.pack(side='right', padx=5, pady=2)
-        
-        title_label = tk.Label(self.title_bar, text=self.title_text, bg=self.title_bar_bg, fg=self.fg)
-        title_label.pack(side='left', padx=10)
-
-        # Main content frame
-        self.main_content_frame = tk.Frame(self, bg=self.bg)
-        self.main_content_frame.pack(fill='both', expand=True, padx=5, pady=5)
-
-        # Dragging logic
-        self._drag_start_x = 0
-        self._drag_start_y = 0
-        self.title_bar.bind("<ButtonPress-1>", self._start_move)
-        self.title_bar.bind("<B1-Motion>", self._do_move)
-        title_label.bind("<ButtonPress-1>", self._start_move)
-        title_label.bind("<B1-Motion>", self._do_move)
-
-    def on_close(self):
-        self.grab_release()
-        self.destroy()
-
-    def create_title_bar_button(self, text, command, hover_color='#505050'):
-        button = tk.Button(self.title_bar, text=text, bg=self.title_bar_bg, fg=self.fg, relief='flat', command=command, font=('Arial', 12), activebackground=hover_color, activeforeground='white', borderwidth=0)
-        button.bind("<Enter>", lambda e, c=hover_color: e.widget.config(bg=c))
-        button.bind("<Leave>", lambda e: e.widget.config(bg=self.title_bar_bg))
-        return button
-
-    def _start_move(self, event):
-        self._drag_start_x = event.x
-        self._drag_start_y = event.y
-
-    def _do_move(self, event):
-        x = self.winfo_pointerx() - self._drag_start_x
-        y = self.winfo_pointery() - self._drag_start_y
-        self.geometry(f"+{x}+{y}")
-
-class CustomRenameDialog(tk.Toplevel):
-    """A custom dark-mode dialog for renaming tabs."""
-    def __init__(self, parent, title, initialvalue=""):
-        super().__init__(parent)
-        self.transient(parent)
-        self.title(title)
-        self.parent = parent
-        self.result = None
-        self.configure(bg='#2d2d2d')
-        self.label = tk.Label(self, text="Enter new name for the tab:", bg='#2d2d2d', fg='white', font=('Arial', 10))
-        self.label.pack(padx=20, pady=(20, 10))
-        self.entry = tk.Entry(self, bg='#1a1a1a', fg='white', insertbackground='white', relief='flat', font=('Arial', 10), width=30)
-        self.entry.insert(0, initialvalue)
-        self.entry.pack(padx=20, pady=10)
-        self.entry.focus_set()
-        button_frame = tk.Frame(self, bg='#2d2d2d')
-        button_frame.pack(pady=(10, 20))
-        self.ok_button = tk.Button(button_frame, text="OK", command=self.on_ok, bg='#4CAF50', fg='white', relief='flat', width=10)
-        self.ok_button.pack(side='left', padx=10)
-        self.cancel_button = tk.Button(button_frame, text="Cancel", command=self.on_cancel, bg='#5d5d5d', fg='white', relief='flat', width=10)
-        self.cancel_button.pack(side='left', padx=10)
-        self.bind("<Return>", lambda event: self.on_ok())
-        self.bind("<Escape>", lambda event: self.on_cancel())
-        self.geometry("+%d+%d" % (parent.winfo_rootx()+50, parent.winfo_rooty()+50))
-        self.protocol("WM_DELETE_WINDOW", self.on_cancel)
-        self.grab_set()
-        self.wait_window(self)
-
-    def on_ok(self):
-        self.result = self.entry.get()
-        self.destroy()
-
-    def on_cancel(self):
-        self.destroy()
-
-class RoundedButton(tk.Canvas):
-    """A custom button with rounded corners."""
-    def __init__(self, parent, text, command, **kwargs):
-        self.radius = kwargs.pop('radius', 12)
-        self.bg = kwargs.pop('bg', '#3d3d3d')
-        self.fg = kwargs.pop('fg', 'white')
-        self.hover_bg = kwargs.pop('hover_bg', '#505050')
-        height = kwargs.pop('height', 30)
-        super().__init__(parent, borderwidth=0, relief="flat", highlightthickness=0, bg=parent.cget('bg'), height=height)
-        self.command = command
-        self.text = text
-        self.bind("<ButtonPress-1>", self._on_press)
-        self.bind("<ButtonRelease-1>", self._on_release)
-        self.bind("<Enter>", self._on_enter)
-        self.bind("<Leave>", self._on_leave)
-        self.bind("<Configure>", self._on_resize)
-        self._text_id = None
-
-    def _on_resize(self, event):
-        self.draw()
-
-    def draw(self, is_hover=False):
-        self.delete("all")
-        width = self.winfo_width()
-        height = self.winfo_height()
-        if width < 2 * self.radius or height < 2 * self.radius: return
-        bg_color = self.hover_bg if is_hover else self.bg
-        self.create_oval((0, 0, self.radius*2, self.radius*2), fill=bg_color, outline=bg_color)
-        self.create_oval((width-self.radius*2, 0, width, self.radius*2), fill=bg_color, outline=bg_color)
-        self.create_oval((0, height-self.radius*2, self.radius*2, height), fill=bg_color, outline=bg_color)
-        self.create_oval((width-self.radius*2, height-self.radius*2, width, height), fill=bg_color, outline=bg_color)
-        self.create_rectangle((self.radius, 0, width-self.radius, height), fill=bg_color, outline=bg_color)
-        self.create_rectangle((0, self.radius, width, height-self.radius), fill=bg_color, outline=bg_color)
-        self._text_id = self.create_text(width/2, height/2, text=self.text, fill=self.fg, font=('Arial', 10, 'bold'))
-
-    def _on_enter(self, event): self.draw(is_hover=True)
-    def _on_leave(self, event): self.draw(is_hover=False)
-    def _on_press(self, event): pass
-    def _on_release(self, event):
-        self.draw(is_hover=True)
-        if self.command: self.command()
-
-class CalculatorTab(ttk.Frame):
-    def __init__(self, parent, app, **kwargs):
-        super().__init__(parent, **kwargs)
-        self.app = app
-        self.configure(style='Dark.TFrame')
-        self.result_var = tk.StringVar()
-        self.previous_result_var = tk.StringVar()
-        self.create_widgets()
-
-    def create_widgets(self):
-        self.display_frame = tk.Frame(self, bg=self.app.dark_bg)
-        self.display_frame.grid(row=0, column=0, columnspan=6, padx=10, pady=(10, 5), sticky='nsew')
-
-        self.previous_result_label = tk.Label(self.display_frame, textvariable=self.previous_result_var, font=('Arial', 12), bg=self.app.dark_bg, fg='#888888', anchor='e')
-        self.previous_result_label.pack(fill='x', padx=5)
-        
-        entry_frame = tk.Frame(self.display_frame, bg=self.app.dark_bg)
-        entry_frame.pack(fill='both', expand=True)
-
-        self.entry = tk.Entry(entry_frame, textvariable=self.result_var, font=('Arial', 20, 'bold'), bd=0, insertwidth=2, width=14, borderwidth=0, bg=self.app.entry_bg, fg=self.app.entry_fg, justify='right', relief='flat')
-        self.entry.pack(side='left', fill='both', expand=True)
-        self.entry.bind("<Return>", lambda event: self.calculate_result())
-        self.entry.bind("<Button-3>", lambda event: self.paste_from_clipboard())
-        
-        self.copy_btn = tk.Button(entry_frame, text='Copy', padx=12, pady=5, font=('Arial', 10, 'bold'), bg=self.app.copy_button_bg, fg=self.app.button_fg, activebackground=self.app.active_bg, activeforeground=self.app.button_fg, relief='flat', borderwidth=0, command=self.copy_to_clipboard)
-        self.copy_btn.pack(side='right', fill='y', padx=(5,0))
-        
-        self.buttons_map = {}
-        buttons_layout = [('C', 1, 0), ('(', 1, 1), (')', 1, 2), ('/', 1, 3), ('DEL', 1, 4), ('7', 2, 0), ('8', 2, 1), ('9', 2, 2), ('*', 2, 3), ('^', 2, 4), ('4', 3, 0), ('5', 3, 1), ('6', 3, 2), ('-', 3, 3), ('sqrt', 3, 4), ('1', 4, 0), ('2', 4, 1), ('3', 4, 2), ('+', 4, 3), ('%', 4, 4), ('0', 5, 0), ('.', 5, 1), ('±', 5, 2), ('=', 5, 3), ('π', 5, 4), ('sin', 6, 0), ('cos', 6, 1), ('tan', 6, 2), ('log', 6, 3), ('ln', 6, 4), ('x!', 1, 5)]
-        for text, row, col in buttons_layout:
-            button = tk.Button(self, text=text, padx=10, pady=10, font=('Arial', 12, 'bold'), relief='flat', borderwidth=0, command=lambda t=text: self.on_button_click(t))
-            button.grid(row=row, column=col, padx=3, pady=3, sticky=tk.NSEW)
-            self.buttons_map[text] = button
-        for i in range(7): self.grid_rowconfigure(i, weight=1)
-        for i in range(6): self.grid_columnconfigure(i, weight=1)
-        self.update_colors()
-
-    def update_colors(self):
-        self.display_frame.config(bg=self.app.dark_bg)
-        self.previous_result_label.config(bg=self.app.dark_bg, fg='#888888')
-        self.entry.config(bg=self.app.entry_bg, fg=self.app.entry_fg)
-        self.copy_btn.config(bg=self.app.copy_button_bg, fg=self.app.button_fg, activebackground=self.app.active_bg, activeforeground=self.app.button_fg)
-        for text, button in self.buttons_map.items():
-            if text == '=': bg = self.app.equals_button_bg
-            elif text == 'C': bg = self.app.clear_button_bg
-            elif text in ['sin', 'cos', 'tan', 'log', 'ln', 'sqrt', 'π', 'DEL', '^', '%', 'x!']: bg = self.app.special_button_bg
-            else: bg = self.app.button_bg
-            button.config(bg=bg, fg=self.app.button_fg, activebackground=self.app.active_bg, activeforeground=self.app.button_fg)
-            button.bind("<Enter>", lambda e, b=button, c=self.app.active_bg: b.config(bg=c))
-            button.bind("<Leave>", lambda e, b=button, c=bg: b.config(bg=c))
-
-    def show_notification(self, message, duration=1500): self.app.show_notification(message, duration)
-    def copy_to_clipboard(self):
-        result = self.result_var.get()
-        if result: self.master.clipboard_clear(); self.master.clipboard_append(result); self.show_notification("Copied to clipboard")
-        else: self.show_notification("Nothing to copy", 2000)
-    def paste_from_clipboard(self):
-        try:
-            clipboard_content = self.master.clipboard_get()
-            if clipboard_content: self.result_var.set(self.result_var.get() + clipboard_content); self.show_notification("Pasted from clipboard")
-            else: self.show_notification("Clipboard is empty", 2000)
-        except tk.TclError: self.show_notification("No content in clipboard", 2000)
-        return "break"
-    def on_button_click(self, char):
-        current_text = self.result_var.get()
-        if char == 'C': 
-            self.result_var.set('')
-            self.previous_result_var.set('')
-        elif char == 'DEL': self.result_var.set(current_text[:-1])
-        elif char == '±':
-            if current_text and current_text.startswith('-'): self.result_var.set(current_text[1:])
-            else: self.result_var.set('-' + current_text)
-        elif char == 'π': self.result_var.set(current_text + str(self.app.pi_decimal))
-        elif char == '=': self.calculate_result()
-        elif char == 'sqrt':
-            try:
-                self.result_var.set(str(decimal.Decimal(current_text).sqrt()))
-            except (ValueError, TypeError, decimal.InvalidOperation): self.result_var.set('Error')
-        elif char == 'x!':
-            try:
-                num = int(current_text)
-                if num < 0:
-                    self.result_var.set("Error")
-                else:
-                    # Pure Python factorial implementation to handle large numbers
-                    res = 1
-                    for i in range(2, num + 1):
-                        res *= i
-                    self.result_var.set(f"{res:,}")
-            except (ValueError, TypeError, OverflowError):
-                self.result_var.set("Error")
-        elif char in ['sin', 'cos', 'tan', 'log', 'ln']:
-            try:
-                if char in ['log', 'ln']:
-                    value = decimal.Decimal(current_text)
-                    if char == 'log': result = value.log10()
-                    elif char == 'ln': result = value.ln()
-                else:
-                    value = float(current_text)
-                    if char == 'sin': result = math.sin(math.radians(value))
-                    elif char == 'cos': result = math.cos(math.radians(value))
-                    elif char == 'tan': result = math.tan(math.radians(value))
-                self.result_var.set(str(result))
-            except (ValueError, TypeError, decimal.InvalidOperation):
-                self.result_var.set('Error')
-        else:
-            self.result_var.set(current_text + char)
-
-    def calculate_result(self):
-        try:
-            expression = self.result_var.get().replace(',', '')
-            
-            clean_expression = expression.replace('^', '**').replace('%', '/100')
-            clean_expression = clean_expression.replace('π', str(self.app.pi_decimal))
-
-            transformed_expression = re.sub(r'(\d+(\.\d*)?|\.\d+)', r"decimal.Decimal('\1')", clean_expression)
-
-            result = eval(transformed_expression, {"__builtins__": None}, {"decimal": decimal})
-
-            final_result = result.normalize()
-            
-            if final_result == final_result.to_integral_value():
-                formatted_result = f"{int(final_result):,}"
-            else:
-                formatted_result = str(final_result)
-
-            self.app.add_to_history(expression, formatted_result)
-            self.previous_result_var.set(f"{expression} =")
-            self.result_var.set(formatted_result)
-        except Exception:
-            self.result_var.set('Error')
-
-# --- Global list and function for managing multiple windows ---
-running_apps = []
-
-def open_new_instance(event=None):
-    """Creates a new calculator window as a Toplevel instance."""
-    root = running_apps[0].root
-    new_window = tk.Toplevel(root)
-    app = TabbedCalculatorApp(new_window, root)
-    running_apps.append(app)
-
-class UnitConverterWindow(CustomToplevel):
-    def __init__(self, parent, app_theme):
-        super().__init__(parent, "Unit Converter")
-        self.geometry("400x300")
-        self.app_theme = app_theme
-        
-        # This is the key to styling the dropdown list
-        self.option_add('*TCombobox*Listbox.background', self.app_theme['entry_bg'])
-        self.option_add('*TCombobox*Listbox.foreground', self.app_theme['entry_fg'])
-        self.option_add('*TCombobox*Listbox.selectBackground', self.app_theme['active_bg'])
-        self.option_add('*TCombobox*Listbox.selectForeground', self.app_theme['entry_fg'])
-
-        self.conversions = {
-            "Length": {
-                "Meters": 1, "Kilometers": 1000, "Centimeters": 0.01,
-                "Miles": 1609.34, "Feet": 0.3048, "Inches": 0.0254
-            },
-            "Mass": {
-                "Grams": 1, "Kilograms": 1000, "Milligrams": 0.001,
-                "Pounds": 453.592, "Ounces": 28.3495
-            },
-            "Temperature": {
-                "Celsius": 0, "Fahrenheit": 0, "Kelvin": 0
-            }
-        }
-        
-        self.create_widgets()
-        self.update_unit_dropdowns()
-
-    def create_widgets(self):
-        content = self.main_content_frame
-        
-        # Style for Combobox
-        style = ttk.Style(self)
-        style.theme_use('clam')
-        style.configure('TCombobox', 
-                        fieldbackground=self.app_theme['entry_bg'], 
-                        background=self.app_theme['button_bg'], 
-                        foreground=self.app_theme['entry_fg'],
-                        arrowcolor=self.app_theme['entry_fg'],
-                        bordercolor=self.app_theme['bg'],
-                        lightcolor=self.app_theme['bg'],
-                        darkcolor=self.app_theme['bg'])
-        style.map('TCombobox',
-                  fieldbackground=[('readonly', self.app_theme['entry_bg'])],
-                  selectbackground=[('readonly', self.app_theme['entry_bg'])],
-                  selectforeground=[('readonly', self.app_theme['entry_fg'])],
-                  foreground=[('readonly', self.app_theme['entry_fg'])])
-
-
-        # Conversion Type
-        tk.Label(content, text="Conversion Type:", bg=self.bg, fg=self.fg).grid(row=0, column=0, padx=10, pady=5, sticky='w')
-        self.type_var = tk.StringVar(value=list(self.conversions.keys())[0])
-        self.type_combo = ttk.Combobox(content, textvariable=self.type_var, values=list(self.conversions.keys()), state='readonly')
-        self.type_combo.grid(row=0, column=1, columnspan=2, padx=10, pady=5, sticky='ew')
-        self.type_combo.bind("<<ComboboxSelected>>", self.update_unit_dropdowns)
-
-        # Input Value
-        tk.Label(content, text="Value:", bg=self.bg, fg=self.fg).grid(row=1, column=0, padx=10, pady=5, sticky='w')
-        self.input_var = tk.StringVar()
-        self.input_entry = tk.Entry(content, textvariable=self.input_var, bg=self.app_theme['entry_bg'], fg=self.app_theme['entry_fg'], relief='flat')
-        self.input_entry.grid(row=1, column=1, columnspan=2, padx=10, pady=5, sticky='ew')
-
-        # From Unit
-        tk.Label(content, text="From:", bg=self.bg, fg=self.fg).grid(row=2, column=0, padx=10, pady=5, sticky='w')
-        self.from_unit_var = tk.StringVar()
-        self.from_unit_combo = ttk.Combobox(content, textvariable=self.from_unit_var, state='readonly')
-        self.from_unit_combo.grid(row=2, column=1, columnspan=2, padx=10, pady=5, sticky='ew')
-
-        # To Unit
-        tk.Label(content, text="To:", bg=self.bg, fg=self.fg).grid(row=3, column=0, padx=10, pady=5, sticky='w')
-        self.to_unit_var = tk.StringVar()
-        self.to_unit_combo = ttk.Combobox(content, textvariable=self.to_unit_var, state='readonly')
-        self.to_unit_combo.grid(row=3, column=1, columnspan=2, padx=10, pady=5, sticky='ew')
-
-        # Convert Button
-        convert_btn = RoundedButton(content, text="Convert", command=self.perform_conversion, bg=self.app_theme['equals_button_bg'], hover_bg='#57D85B', height=35)
-        convert_btn.grid(row=4, column=0, columnspan=3, padx=10, pady=10, sticky='ew')
-
-        # Result
-        self.result_label = tk.Label(content, text="Result: -", font=('Arial', 12, 'bold'), bg=self.bg, fg=self.fg)
-        self.result_label.grid(row=5, column=0, columnspan=3, padx=10, pady=10)
-
-    def update_unit_dropdowns(self, event=None):
-        conv_type = self.type_var.get()
-        units = list(self.conversions[conv_type].keys())
-        self.from_unit_combo['values'] = units
-        self.to_unit_combo['values'] = units
-        self.from_unit_var.set(units[0])
-        self.to_unit_var.set(units[1] if len(units) > 1 else units[0])
-
-    def perform_conversion(self):
-        try:
-            value = float(self.input_var.get())
-            conv_type = self.type_var.get()
-            from_unit = self.from_unit_var.get()
-            to_unit = self.to_unit_var.get()
-            
-            if conv_type == "Temperature":
-                # Handle temperature separately
-                if from_unit == "Celsius":
-                    if to_unit == "Fahrenheit": result = (value * 9/5) + 32
-                    elif to_unit == "Kelvin": result = value + 273.15
-                    else: result = value
-                elif from_unit == "Fahrenheit":
-                    if to_unit == "Celsius": result = (value - 32) * 5/9
-                    elif to_unit == "Kelvin": result = (value - 32) * 5/9 + 273.15
-                    else: result = value
-                elif from_unit == "Kelvin":
-                    if to_unit == "Celsius": result = value - 273.15
-                    elif to_unit == "Fahrenheit": result = (value - 273.15) * 9/5 + 32
-                    else: result = value
-            else:
-                # Standard conversion using base unit
-                base_value = value * self.conversions[conv_type][from_unit]
-                result = base_value / self.conversions[conv_type][to_unit]
-            
-            self.result_label.config(text=f"Result: {result:.4f}")
-        except (ValueError, ZeroDivisionError):
-            self.result_label.config(text="Result: Invalid Input")
-
-class TabbedCalculatorApp:
-    def __init__(self, master, root):
-        self.master = master # This is now the Toplevel window
-        self.root = root # This is the hidden main Tk() window
-        
-        self.master.overrideredirect(True)
-        
-        # We don't set the title on the hidden root, but on the visible window's label
-        try:
-            icon_path = resource_path("icon.ico")
-            # Set the icon on the hidden root, which controls the taskbar icon
-            self.root.iconbitmap(icon_path) 
-        except tk.TclError:
-            print("icon.ico not found, skipping icon.")
-
-        decimal.getcontext().prec = 100
-        self.pi_decimal = decimal.Decimal(math.pi)
-        
-        master.geometry("480x600+200+200")
-        self.set_dark_theme()
-        self._drag_start_x, self._drag_start_y = 0, 0
-        self._is_fullscreen, self._is_resizing = False, False
-        self._resize_grip_size = 8
-        self._sidebar_job, self._toast_job = None, None
-        self._toast_label = None
-        self.calculation_history, self.history_window = [], None
-        self._sidebar_close_job = None
-        self.sidebar_visible = False
-        self.settings_window = None
-        self.keybind_window = None
-        self.unit_converter_window = None
-        self.closed_tabs = []
-        
-        # --- State variables for tab cycling ---
-        self.tab_preview_window = None
-        self.preview_index = 0
-        self.is_ctrl_pressed = False
-        
-        self.keybinds = {
-            "Add Tab": ("<Control-t>", self.add_tab), 
-            "Close Tab": ("<Control-w>", self.close_tab),
-            "New Window": ("<Control-n>", open_new_instance),
-            "Reopen Tab": ("<Control-Shift-T>", self.reopen_closed_tab),
-            "Rename Tab": ("<Control-r>", self.rename_current_tab),
-            "Toggle Controls": ("<Control-q>", self.toggle_control_frame), 
-            "Toggle Title Bar": ("<Control-s>", self.toggle_title_bar),
-            "Show History": ("<Control-h>", self.show_history_window), 
-            "Show Settings": ("<F2>", self.show_settings_window),
-            "Show Help": ("<F1>", self.show_help_window),
-        }
-        self.container = tk.Frame(master, bg=self.dark_bg)
-        self.container.pack(fill='both', expand=True)
-        self.title_bar = tk.Frame(self.container, bg='#1e1e1e', height=30)
-        
-        # The close button now destroys the hidden root to exit the app
-        close_button = self.create_title_bar_button('✕', self.close_window, hover_color='#ff4444')
-        close_button.pack(side='right', padx=5, pady=2)
-
-        self.fullscreen_canvas = tk.Canvas(self.title_bar, width=20, height=20, bg='#1e1e1e', bd=0, highlightthickness=0)
-        self.fullscreen_canvas.create_rectangle(5, 5, 15, 15, outline='white', width=1)
-        self.fullscreen_canvas.pack(side='right', padx=5, pady=5)
-        self.fullscreen_canvas.bind("<Button-1>", self.toggle_fullscreen)
-        
-        # The minimize button now controls the hidden root window
-        self.minimize_canvas = tk.Canvas(self.title_bar, width=20, height=20, bg='#1e1e1e', bd=0, highlightthickness=0)
-        self.minimize_canvas.create_line(5, 10, 15, 10, fill='white', width=1)
-        self.minimize_canvas.pack(side='right', padx=5, pady=5)
-        self.minimize_canvas.bind("<Button-1>", self.minimize_window)
-        
-        self.title_label = tk.Label(self.title_bar, text="Zenth", bg='#1e1e1e', fg='white')
-        self.title_label.pack(side='left', padx=10)
-        self.title_bar.bind("<ButtonPress-1>", self.start_move)
-        self.title_bar.bind("<B1-Motion>", self.do_move)
-        self.title_label.bind("<ButtonPress-1>", self.start_move)
-        self.title_label.bind("<B1-Motion>", self.do_move)
-        self.fullscreen_canvas.bind("<Enter>", lambda e: e.widget.config(bg='#505050'))
-        self.fullscreen_canvas.bind("<Leave>", lambda e: e.widget.config(bg='#1e1e1e'))
-        self.minimize_canvas.bind("<Enter>", lambda e: e.widget.config(bg='#505050'))
-        self.minimize_canvas.bind("<Leave>", lambda e: e.widget.config(bg='#1e1e1e'))
-        self.main_frame = tk.Frame(self.container, bg=self.dark_bg)
-        self.main_frame.pack(fill='both', expand=True, padx=5, pady=5)
-        self.configure_styles()
-        top_container = tk.Frame(self.main_frame, bg=self.dark_bg)
-        top_container.pack(fill='both', expand=True)
-        top_container.grid_rowconfigure(0, weight=1)
-        top_container.grid_columnconfigure(1, weight=1)
-        self.menu_button = tk.Canvas(top_container, width=30, height=30, bg=self.dark_bg, bd=0, highlightthickness=0, cursor="hand2")
-        self.menu_button.create_line(8, 10, 22, 10, fill='white', width=2)
-        self.menu_button.create_line(8, 15, 22, 15, fill='white', width=2)
-        self.menu_button.create_line(8, 20, 22, 20, fill='white', width=2)
-        self.menu_button.grid(row=0, column=0, sticky='nw', pady=0, padx=(0, 5))
-        self.menu_button.bind("<Button-1>", self.toggle_sidebar)
-        self.menu_button.bind("<Enter>", lambda e: e.widget.config(bg=self.active_bg))
-        self.menu_button.bind("<Leave>", lambda e: e.widget.config(bg=self.dark_bg))
-        
-        self.notebook = ttk.Notebook(top_container, style='Dark.TNotebook')
-        self.notebook.grid(row=0, column=1, sticky='nsew')
-        
-        self.control_frame = tk.Frame(self.main_frame, bg=self.dark_bg)
-        self.add_tab_btn = tk.Button(self.control_frame, text="+ Add Tab", command=self.add_tab, bg='#4CAF50', fg='white', relief='flat', font=('Arial', 10, 'bold'))
-        self.add_tab_btn.pack(side='left', padx=5)
-        self.close_tab_btn = tk.Button(self.control_frame, text="- Close Tab", command=self.close_tab, bg='#ff4444', fg='white', relief='flat', font=('Arial', 10, 'bold'))
-        self.close_tab_btn.pack(side='left', padx=5)
-        
-        self.sidebar = tk.Frame(self.master, bg='#1e1e1e')
-        
-        top_frame = tk.Frame(self.sidebar, bg='#1e1e1e')
-        top_frame.pack(fill='both', expand=True)
-        
-        bottom_frame = tk.Frame(self.sidebar, bg='#1e1e1e')
-        bottom_frame.pack(fill='x', side='bottom')
-
-        self.converter_btn = RoundedButton(bottom_frame, text="Unit Converter", command=self.show_unit_converter_window, bg='#3d3d3d', hover_bg='#505050', height=30)
-        self.converter_btn.pack(fill='x', padx=10, pady=5)
-        self.history_btn = RoundedButton(bottom_frame, text="History", command=self.show_history_window, bg='#3d3d3d', hover_bg='#505050', height=30)
-        self.history_btn.pack(fill='x', padx=10, pady=5)
-        self.settings_btn = RoundedButton(bottom_frame, text="Settings", command=self.show_settings_window, bg='#3d3d3d', hover_bg='#505050', height=30)
-        self.settings_btn.pack(fill='x', padx=10, pady=5)
-        self.help_btn = RoundedButton(bottom_frame, text="Help", command=self.show_help_window, bg='#3d3d3d', hover_bg='#505050', height=30)
-        self.help_btn.pack(fill='x', padx=10, pady=(5, 10))
-        
-        self.sidebar.bind("<Enter>", self.cancel_sidebar_close)
-        self.sidebar.bind("<Leave>", self.schedule_sidebar_close)
-
-        self.add_tab()
-        self.apply_keybinds()
-        
-        self.master.bind('<Motion>', self.on_mouse_motion)
-        self.master.bind('<ButtonPress-1>', self.start_resize)
-        self.master.bind('<B1-Motion>', self.do_resize)
-        self.master.bind('<ButtonRelease-1>', lambda e: setattr(self, '_is_resizing', False))
-        
-        # --- Bind events directly to this specific window ---
-        self.master.bind("<KeyPress-Control_L>", self.on_ctrl_press)
-        self.master.bind("<KeyRelease-Control_L>", self.on_ctrl_release)
-        self.master.bind("<Control-Tab>", self.cycle_tabs)
-
-    def close_window(self):
-        """This function now destroys the hidden root, which closes the entire application."""
-        self.root.destroy()
-
-    def minimize_window(self, event=None):
-        """This function now hides the main window and iconifies the hidden root."""
-        self.master.withdraw()
-        self.root.iconify()
-
-    def set_dark_theme(self):
-        self.dark_bg, self.button_bg, self.button_fg, self.active_bg, self.entry_bg, self.entry_fg, self.special_button_bg, self.equals_button_bg, self.clear_button_bg, self.copy_button_bg = '#2d2d2d', '#3d3d3d', '#ffffff', '#505050', '#1a1a1a', '#ffffff', '#404040', '#4CAF50', '#ff4444', '#5d5d5d'
-        self.update_all_colors()
-
-    def set_light_theme(self):
-        self.dark_bg, self.button_bg, self.button_fg, self.active_bg, self.entry_bg, self.entry_fg, self.special_button_bg, self.equals_button_bg, self.clear_button_bg, self.copy_button_bg = '#f0f0f0', '#ffffff', '#000000', '#e0e0e0', '#ffffff', '#000000', '#d0d0d0', '#4CAF50', '#ff4444', '#c0c0c0'
-        self.update_all_colors()
-
-    def update_all_colors(self):
-        if not hasattr(self, 'container'): return
-        self.master.config(bg=self.dark_bg)
-        self.container.config(bg=self.dark_bg)
-        self.main_frame.config(bg=self.dark_bg)
-        self.control_frame.config(bg=self.dark_bg)
-        self.menu_button.config(bg=self.dark_bg)
-        self.configure_styles()
-        for tab_id in self.notebook.tabs():
-            try:
-                tab_widget = self.master.nametowidget(tab_id)
-                if isinstance(tab_widget, CalculatorTab): tab_widget.update_colors()
-            except tk.TclError:
-                continue
-
-    def add_to_history(self, expression, result):
-        self.calculation_history.append(f"{expression} = {result}")
-        if self.history_window and self.history_window.winfo_exists(): self.history_listbox.insert(tk.END, f"{expression} = {result}"); self.history_listbox.yview(tk.END)
-    def clear_history(self):
-        self.calculation_history.clear()
-        if self.history_window and self.history_window.winfo_exists(): self.history_listbox.delete(0, tk.END)
-        self.show_notification("History cleared")
-    def show_history_window(self, event=None):
-        if self.history_window and self.history_window.winfo_exists(): self.history_window.lift(); return
-        self.history_window = CustomToplevel(self.master, "Calculation History"); self.history_window.geometry("300x400")
-        list_frame = tk.Frame(self.history_window.main_content_frame, bg=self.dark_bg); list_frame.pack(fill='both', expand=True, padx=5, pady=5)
-        scrollbar = tk.Scrollbar(list_frame, relief='flat', troughcolor=self.dark_bg, bg=self.button_bg, activebackground=self.active_bg); scrollbar.pack(side='right', fill='y')
-        self.history_listbox = tk.Listbox(list_frame, bg=self.entry_bg, fg=self.entry_fg, selectbackground=self.active_bg, relief='flat', font=('Arial', 11), yscrollcommand=scrollbar.set, highlightthickness=0)
-        for item in self.calculation_history: self.history_listbox.insert(tk.END, item)
-        self.history_listbox.pack(side='left', fill='both', expand=True); scrollbar.config(command=self.history_listbox.yview)
-        clear_btn = RoundedButton(self.history_window.main_content_frame, text="Clear History", command=self.clear_history, bg=self.clear_button_bg, hover_bg='#ff6666', height=30); clear_btn.pack(fill='x', padx=5, pady=(0, 5))
-
-    def show_settings_window(self, event=None):
-        if self.settings_window and self.settings_window.winfo_exists(): self.settings_window.lift(); return
-        self.settings_window = CustomToplevel(self.master, "Settings"); self.settings_window.geometry("350x550")
-        
-        content = self.settings_window.main_content_frame
-        theme_label = tk.Label(content, text="Theme", bg=self.dark_bg, fg=self.button_fg, font=('Arial', 12, 'bold')); theme_label.pack(pady=(10,5))
-        dark_btn = tk.Button(content, text="Dark Mode", command=self.set_dark_theme, bg=self.button_bg, fg=self.button_fg, relief='flat', font=('Arial', 10)); dark_btn.pack(fill='x', padx=20, pady=5)
-        light_btn = tk.Button(content, text="Light Mode", command=self.set_light_theme, bg=self.button_bg, fg=self.button_fg, relief='flat', font=('Arial', 10)); light_btn.pack(fill='x', padx=20, pady=5)
-        
-        ttk.Separator(content, orient='horizontal').pack(fill='x', padx=20, pady=10)
-        
-        keybind_label = tk.Label(content, text="Keybinds", bg=self.dark_bg, fg=self.button_fg, font=('Arial', 12, 'bold')); keybind_label.pack(pady=(10,5))
-        entries = {}
-        for action, (key, _) in self.keybinds.items():
-            frame = tk.Frame(content, bg=self.dark_bg); frame.pack(fill='x', padx=20, pady=2)
-            label = tk.Label(frame, text=f"{action}:", bg=self.dark_bg, fg=self.button_fg, width=15, anchor='w'); label.pack(side='left')
-            entry = tk.Entry(frame, bg=self.entry_bg, fg=self.entry_fg, relief='flat', width=20); entry.insert(0, key); entry.pack(side='left', fill='x', expand=True)
-            entries[action] = entry
-        
-        def save_settings():
-            self.unbind_all_keybinds()
-            for action, entry in entries.items():
-                new_key, command = entry.get(), self.keybinds[action][1]
-                self.keybinds[action] = (new_key, command)
-            self.apply_keybinds(); self.settings_window.destroy(); self.show_notification("Settings updated!")
-        
-        save_btn = tk.Button(content, text="Save Settings", command=save_settings, bg=self.equals_button_bg, fg='white', relief='flat'); save_btn.pack(pady=15)
-
-    def show_help_window(self, event=None):
-        help_win = CustomToplevel(self.master, "Keybinds Help")
-        for action, (key, _) in self.keybinds.items():
-            frame = tk.Frame(help_win.main_content_frame, bg=self.dark_bg)
-            frame.pack(fill='x', padx=10, pady=5)
-            action_label = tk.Label(frame, text=f"{action}:", bg=self.dark_bg, fg=self.button_fg, width=15, anchor='w')
-            action_label.pack(side='left')
-            key_label = tk.Label(frame, text=key, bg=self.entry_bg, fg=self.entry_fg, relief='flat', width=20)
-            key_label.pack(side='left', fill='x', expand=True)
-    
-    def show_unit_converter_window(self, event=None):
-        if self.unit_converter_window and self.unit_converter_window.winfo_exists():
-            self.unit_converter_window.lift()
-            return
-        theme = {
-            'bg': self.dark_bg, 'fg': self.button_fg, 'entry_bg': self.entry_bg,
-            'entry_fg': self.entry_fg, 'button_bg': self.button_bg,
-            'equals_button_bg': self.equals_button_bg, 'active_bg': self.active_bg
-        }
-        self.unit_converter_window = UnitConverterWindow(self.master, theme)
-
-    def apply_keybinds(self):
-        root = self.master.winfo_toplevel()
-        for key, command in self.keybinds.values():
-            if key == "<Control-n>": 
-                self.root.bind_all(key, command)
-            else: 
-                self.master.bind(key, command)
-
-    def unbind_all_keybinds(self):
-        root = self.master.winfo_toplevel()
-        for key, _ in self.keybinds.values():
-            if key == "<Control-n>":
-                self.root.unbind_all(key)
-            else:
-                self.master.unbind(key)
-
-    def create_title_bar_button(self, text, command, hover_color='#505050'):
-        button = tk.Button(self.title_bar, text=text, bg='#1e1e1e', fg='white', relief='flat', command=command, font=('Arial', 12), activebackground=hover_color, activeforeground='white', borderwidth=0)
-        button.bind("<Enter>", lambda e, c=hover_color: e.widget.config(bg=c)); button.bind("<Leave>", lambda e: e.widget.config(bg='#1e1e1e')); return button
-    def start_move(self, event): self._drag_start_x, self._drag_start_y = event.x, event.y
-    def do_move(self, event): x, y = self.master.winfo_pointerx() - self._drag_start_x, self.master.winfo_pointery() - self._drag_start_y; self.master.geometry(f"+{x}+{y}")
-    def on_mouse_motion(self, event):
-        x, y, w, h, grip = event.x, event.y, self.master.winfo_width(), self.master.winfo_height(), self._resize_grip_size
-        if x > w - grip and y > h - grip: self.master.config(cursor="bottom_right_corner")
-        elif x > w - grip: self.master.config(cursor="sb_h_double_arrow")
-        elif y > h - grip: self.master.config(cursor="sb_v_double_arrow")
-        else: self.master.config(cursor="")
-    def start_resize(self, event):
-        cursor = self.master.cget("cursor")
-        if cursor != "" and cursor != "arrow": self._is_resizing = True
-    def do_resize(self, event):
-        if not self._is_resizing: return
-        w, h = self.master.winfo_width(), self.master.winfo_height()
-        dx, dy = event.x_root - self.master.winfo_rootx() - w, event.y_root - self.master.winfo_rooty() - h
-        cursor = self.master.cget("cursor")
-        if cursor == "sb_h_double_arrow": self.master.geometry(f"{w+dx}x{h}")
-        elif cursor == "sb_v_double_arrow": self.master.geometry(f"{w}x{h+dy}")
-        elif cursor == "bottom_right_corner": self.master.geometry(f"{w+dx}x{h+dy}")
-    def toggle_title_bar(self, event=None):
-        if self.title_bar.winfo_ismapped(): self.title_bar.pack_forget()
-        else: self.title_bar.pack(side='top', fill='x', before=self.main_frame)
-    
-    def toggle_fullscreen(self, event=None):
-        self._is_fullscreen = not self._is_fullscreen
-        self.master.attributes("-fullscreen", self._is_fullscreen)
-        
-    def toggle_control_frame(self, event=None):
-        if self.control_frame.winfo_ismapped(): self.control_frame.pack_forget()
-        else: self.control_frame.pack(side='bottom', pady=(5,0))
-    def schedule_sidebar_close(self, event=None):
-        if self.sidebar_visible: self._sidebar_close_job = self.master.after(1500, self.toggle_sidebar)
-    def cancel_sidebar_close(self, event=None):
-        if self._sidebar_close_job: self.master.after_cancel(self._sidebar_close_job); self._sidebar_close_job = None
-    def toggle_sidebar(self, event=None):
-        self.cancel_sidebar_close()
-        if self._sidebar_job: self.master.after_cancel(self._sidebar_job)
-        if self.sidebar_visible: self.animate_sidebar(direction='out')
-        else: self.sidebar.place(x=-200, y=0, relheight=1.0, width=200); self.animate_sidebar(direction='in')
-        self.sidebar_visible = not self.sidebar_visible
-    def animate_sidebar(self, direction='in'):
-        start_x, end_x = (-200, 0) if direction == 'in' else (0, -200)
-        animation_duration, animation_steps, sleep_interval = 200, 20, 10
-        def animate(step=0):
-            try:
-                if step <= animation_steps:
-                    fraction = 1 - pow(1 - (step / animation_steps), 3)
-                    current_x = int(start_x + (end_x - start_x) * fraction)
-                    self.sidebar.place(x=current_x, y=0, relheight=1.0, width=200)
-                    self._sidebar_job = self.master.after(sleep_interval, animate, step + 1)
-                elif direction == 'out': self.sidebar.place_forget()
-            except tk.TclError: pass
-        animate()
-    def configure_styles(self):
-        style = ttk.Style(); style.theme_use('clam'); style.configure('Dark.TFrame', background=self.dark_bg)
-        style.configure('Dark.TNotebook', background=self.dark_bg, borderwidth=0, tabposition='ne')
-        style.configure('Dark.TNotebook.Tab', background=self.button_bg, foreground=self.button_fg, borderwidth=0, padding=[10, 5])
-        style.map('Dark.TNotebook.Tab', background=[('selected', self.active_bg), ('active', '#454545')], foreground=[('selected', self.button_fg)])
-    def add_tab(self, event=None):
-        tab_count = len(self.notebook.tabs()) + 1; new_tab = CalculatorTab(self.notebook, self)
-        self.notebook.add(new_tab, text=f'Calc {tab_count}'); self.notebook.select(new_tab) 
-    def close_tab(self, event=None):
-        if not self.notebook.tabs(): return
-        selected_tab = self.master.nametowidget(self.notebook.select())
-        tab_text = self.notebook.tab(selected_tab, "text")
-        self.closed_tabs.append((tab_text, selected_tab))
-        self.notebook.forget(selected_tab)
-    
-    def reopen_closed_tab(self, event=None):
-        if not self.closed_tabs:
-            self.show_notification("No tabs to reopen")
-            return
-        tab_text, tab_widget = self.closed_tabs.pop()
-        self.notebook.add(tab_widget, text=tab_text)
-        self.notebook.select(tab_widget)
-        self.show_notification("Tab reopened")
-
-    def on_ctrl_press(self, event):
-        self.is_ctrl_pressed = True
-        try:
-            self.preview_index = self.notebook.index('current')
-        except tk.TclError:
-            self.is_ctrl_pressed = False
-
-    def on_ctrl_release(self, event):
-        self.is_ctrl_pressed = False
-        if self.tab_preview_window and self.tab_preview_window.winfo_exists():
-            self.notebook.select(self.preview_index)
-            self.tab_preview_window.destroy()
-            self.tab_preview_window = None
-
-    def cycle_tabs(self, event):
-        if not self.is_ctrl_pressed or len(self.notebook.tabs()) < 2:
-            return "break"
-
-        if not self.tab_preview_window or not self.tab_preview_window.winfo_exists():
-            self.show_tab_preview()
-        
-        num_tabs = len(self.notebook.tabs())
-        self.preview_index = (self.preview_index + 1) % num_tabs
-        
-        self.update_tab_preview()
-        return "break"
-
-    def show_tab_preview(self):
-        self.tab_preview_window = tk.Toplevel(self.master)
-        self.tab_preview_window.overrideredirect(True)
-        self.tab_preview_window.attributes('-alpha', 0.9)
-        self.tab_preview_window.attributes('-topmost', True)
-
-        self.preview_label = tk.Label(self.tab_preview_window, text="", bg=self.entry_bg, fg=self.entry_fg, font=('Arial', 14), padx=20, pady=10)
-        self.preview_label.pack()
-        self.update_tab_preview()
-
-    def update_tab_preview(self):
-        if self.tab_preview_window and self.tab_preview_window.winfo_exists():
-            tab_widget = self.master.nametowidget(self.notebook.tabs()[self.preview_index])
-            tab_text = self.notebook.tab(tab_widget, "text")
-            result_preview = tab_widget.result_var.get() or "0"
-            preview_text = f"{tab_text}: {result_preview}"
-            self.preview_label.config(text=preview_text)
-            
-            self.tab_preview_window.update_idletasks()
-            x = self.master.winfo_x() + (self.master.winfo_width() // 2) - (self.tab_preview_window.winfo_width() // 2)
-            y = self.master.winfo_y() + (self.master.winfo_height() // 2) - (self.tab_preview_window.winfo_height() // 2)
-            self.tab_preview_window.geometry(f"+{x}+{y}")
-
-    def rename_current_tab(self, event=None):
-        if not self.notebook.tabs(): return
-        current_tab_id = self.notebook.select(); current_name = self.notebook.tab(current_tab_id, "text")
-        dialog = CustomRenameDialog(self.master, "Rename Tab", initialvalue=current_name); new_name = dialog.result
-        if new_name and new_name.strip(): self.notebook.tab(current_tab_id, text=new_name.strip())
-    def show_notification(self, message, duration=1200):
-        if self._toast_job: self.master.after_cancel(self._toast_job)
-        if self._toast_label: self._toast_label.destroy()
-        self._toast_label = tk.Label(self.master, text=message, bg='#303030', fg='white', font=('Arial', 10), padx=15, pady=8, highlightbackground='#606060', highlightthickness=1)
-        end_rely, start_rely, animation_duration, animation_steps, sleep_interval = 0.95, 1.1, 250, 25, 10
-        def animate(step=0, direction='in'):
-            try:
-                if direction == 'in':
-                    if step <= animation_steps:
-                        fraction = 1 - (1 - (step / 20)) ** 3; current_rely = start_rely - (start_rely - end_rely) * fraction
-                        self._toast_label.place(relx=0.5, rely=current_rely, anchor='center')
-                        self._toast_job = self.master.after(sleep_interval, animate, step + 1, 'in')
-                    else: self._toast_job = self.master.after(duration, animate, 0, 'out')
-                elif direction == 'out':
-                    if step <= animation_steps:
-                        fraction = (step / animation_steps) ** 3; current_rely = end_rely + (start_rely - end_rely) * fraction
-                        self._toast_label.place(relx=0.5, rely=current_rely, anchor='center')
-                        self._toast_job = self.master.after(sleep_interval, animate, step + 1, 'out')
-                    else: self._toast_label.destroy(); self._toast_label = None
-            except tk.TclError: pass
-        animate()
-
-if __name__ == "__main__":
-    # This is the hidden parent window that handles the taskbar icon
-    root = tk.Tk()
-    root.title("Zenth") # The title for the taskbar
-    
-    # This is the visible, custom-framed calculator window
-    app_window = tk.Toplevel(root)
-    app = TabbedCalculatorApp(app_window, root)
-    running_apps.append(app)
-
-    # This function shows the calculator window when the taskbar icon is clicked
-    def on_map(event):
-        # When the hidden root is restored, show the main app window
-        app_window.deiconify()
-    
-    # Hide the hidden window itself, but keep it running for the taskbar icon
-    root.withdraw()
-    root.bind("<Map>", on_map)
-    
-    root.mainloop()
-
+import profiling     # first, so the startup timeline includes the imports below
+import tkinter as tk
+from tkinter import ttk, simpledialog, filedialog
+import tkinter.font as tkfont
+import decimal
+import sys
+import os
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict, deque
+
+import animation
+import appdata
+import bignum
+import constants
+import cost
+import engine
+import history
+import plotter
+import session
+import table
+import workspace
+import units
+import worker
+
+profiling.startup.mark('imports')
+
+DEFAULT_PRECISION = 100
+PREVIEW_PRECISION = 12
+LIVE_PREVIEW_DELAY = 120
+PROGRESS_AFTER = 1.0        # estimated seconds from which a calculation shows a running clock
+PROGRESS_INTERVAL = 250
+MAX_PRECISION = 100000
+DEFAULT_CONTEXT = decimal.Context(prec=DEFAULT_PRECISION)    # shared by tabs until one sets its own
+UNDO_DEPTH = 50
+CLOSED_TABS_DEPTH = 20      # closed tabs that Reopen Tab can bring back
+AUTOSAVE_DELAY = 1000       # ms after a change before the session is saved
+TOAST_SLIDE = 250           # ms for a notification to slide in or out
+TOAST_MIN_HOLD = 400        # ms a notification stays up when another is waiting
+SIDEBAR_SLIDE = 200
+SIDEBAR_WIDTH = 200
+ROUNDED_BUTTON_IMAGES = True    # use Pillow-rendered button shapes when Pillow is installed
+ROUNDED_IMAGE_CACHE = 64
+UNIT_PRECISION = 20          # significant digits shown by the unit converter
+OVERLAY_REFRESH = 500        # ms between debug overlay updates while it is shown
+PLOT_TILE_CACHE = 96        # rendered plot tiles kept per window, about 190 KB each
+PLOT_INITIAL_SCALE = 0.04   # plot units per pixel when a plot window opens, about -10 to 10 across
+PLOT_FRAME_BUDGET = 0.008   # seconds of tile drawing per frame, leaving the rest of 16 ms for input
+TABLE_JOBS = worker.DEFAULT_PROCESSES   # table batches in the pool at once; a tab's calculation waits for at most one
+HISTORY_PAGE_SIZE = 100
+HISTORY_PAGE_CACHE = 20
+HISTORY_MIN_QUERY = 3       # shorter filters scan the whole table (benchmarks/bench_history.py), so are not applied
+HISTORY_REFRESH_DELAY = 250     # ms a burst of new entries waits before the history view recounts once
+PALETTE_KEYS = ('dark_bg', 'button_bg', 'button_fg', 'active_bg', 'entry_bg', 'entry_fg', 'special_button_bg', 'equals_button_bg', 'clear_button_bg', 'copy_button_bg')
+THEMES = {
+    'dark': dict(zip(PALETTE_KEYS, ('#2d2d2d', '#3d3d3d', '#ffffff', '#505050', '#1a1a1a', '#ffffff', '#404040', '#4CAF50', '#ff4444', '#5d5d5d'))),
+    'light': dict(zip(PALETTE_KEYS, ('#f0f0f0', '#ffffff', '#000000', '#e0e0e0', '#ffffff', '#000000', '#d0d0d0', '#4CAF50', '#ff4444', '#c0c0c0'))),
+}
+SPECIAL_KEYS = ('sin', 'cos', 'tan', 'log', 'ln', 'sqrt', 'π', 'DEL', '^', '%', 'x!')
+ROUNDING_MODES = [decimal.ROUND_HALF_EVEN, decimal.ROUND_HALF_UP, decimal.ROUND_HALF_DOWN, decimal.ROUND_UP, decimal.ROUND_DOWN, decimal.ROUND_CEILING, decimal.ROUND_FLOOR, decimal.ROUND_05UP]
+
+def resource_path(relative_path):
+    """ Get absolute path to resource, works for dev and for PyInstaller """
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+class CustomToplevel(tk.Toplevel):
+    """A custom Toplevel window with a draggable title bar."""
+    def __init__(self, parent, title, **kwargs):
+        super().__init__(parent, **kwargs)
+        
+        # These lines ensure the pop-up stays on top of and moves with the parent window.
+        self.transient(parent)
+        self.grab_set()
+        
+        self.overrideredirect(True)
+        self.parent = parent
+        self.title_text = title
+        
+        # Style
+        self.bg = '#2d2d2d'
+        self.title_bar_bg = '#1e1e1e'
+        self.fg = 'white'
+        self.configure(bg=self.bg)
+
+        # Title Bar
+        self.title_bar = tk.Frame(self, bg=self.title_bar_bg, height=30)
+        self.title_bar.pack(fill='x', side='top')
+        
+        close_button = self.create_title_bar_button('✕', self.on_close, hover_color='#ff4444')
+        close_button.pack(side='right', padx=5, pady=2)
+        
+        title_label = tk.Label(self.title_bar, text=self.title_text, bg=self.title_bar_bg, fg=self.fg)
+        title_label.pack(side='left', padx=10)
+
+        # Main content frame
+        self.main_content_frame = tk.Frame(self, bg=self.bg)
+        self.main_content_frame.pack(fill='both', expand=True, padx=5, pady=5)
+
+        # Dragging logic
+        self._drag_start_x = 0
+        self._drag_start_y = 0
+        self.title_bar.bind("<ButtonPress-1>", self._start_move)
+        self.title_bar.bind("<B1-Motion>", self._do_move)
+        title_label.bind("<ButtonPress-1>", self._start_move)
+        title_label.bind("<B1-Motion>", self._do_move)
+
+    def on_close(self):
+        self.grab_release()
+        self.destroy()
+
+    def create_title_bar_button(self, text, command, hover_color='#505050'):
+        button = tk.Button(self.title_bar, text=text, bg=self.title_bar_bg, fg=self.fg, relief='flat', command=command, font=('Arial', 12), activebackground=hover_color, activeforeground='white', borderwidth=0)
+        button.bind("<Enter>", lambda e, c=hover_color: e.widget.config(bg=c))
+        button.bind("<Leave>", lambda e: e.widget.config(bg=self.title_bar_bg))
+        return button
+
+    def _start_move(self, event):
+        self._drag_start_x = event.x
+        self._drag_start_y = event.y
+
+    def _do_move(self, event):
+        x = self.winfo_pointerx() - self._drag_start_x
+        y = self.winfo_pointery() - self._drag_start_y
+        self.geometry(f"+{x}+{y}")
+
+class CustomRenameDialog(tk.Toplevel):
+    """A custom dark-mode dialog for renaming tabs."""
+    def __init__(self, parent, title, initialvalue=""):
+        super().__init__(parent)
+        self.transient(parent)
+        self.title(title)
+        self.parent = parent
+        self.result = None
+        self.configure(bg='#2d2d2d')
+        self.label = tk.Label(self, text="Enter new name for the tab:", bg='#2d2d2d', fg='white', font=('Arial', 10))
+        self.label.pack(padx=20, pady=(20, 10))
+        self.entry = tk.Entry(self, bg='#1a1a1a', fg='white', insertbackground='white', relief='flat', font=('Arial', 10), width=30)
+        self.entry.insert(0, initialvalue)
+        self.entry.pack(padx=20, pady=10)
+        self.entry.focus_set()
+        button_frame = tk.Frame(self, bg='#2d2d2d')
+        button_frame.pack(pady=(10, 20))
+        self.ok_button = tk.Button(button_frame, text="OK", command=self.on_ok, bg='#4CAF50', fg='white', relief='flat', width=10)
+        self.ok_button.pack(side='left', padx=10)
+        self.cancel_button = tk.Button(button_frame, text="Cancel", command=self.on_cancel, bg='#5d5d5d', fg='white', relief='flat', width=10)
+        self.cancel_button.pack(side='left', padx=10)
+        self.bind("<Return>", lambda event: self.on_ok())
+        self.bind("<Escape>", lambda event: self.on_cancel())
+        self.geometry("+%d+%d" % (parent.winfo_rootx()+50, parent.winfo_rooty()+50))
+        self.protocol("WM_DELETE_WINDOW", self.on_cancel)
+        self.grab_set()
+        self.wait_window(self)
+
+    def on_ok(self):
+        self.result = self.entry.get()
+        self.destroy()
+
+    def on_cancel(self):
+        self.destroy()
+
+class RoundedButton(tk.Canvas):
+    """A custom button with rounded corners.
+
+    The canvas items are created once and moved or recoloured in place; a burst
+    of <Configure> events (dragging the window edge) is laid out once at idle.
+    With Pillow installed and use_image set, the shape is a cached anti-aliased
+    image instead of ovals and rectangles.
+    """
+    def __init__(self, parent, text, command, **kwargs):
+        self.radius = kwargs.pop('radius', 12)
+        self.bg = kwargs.pop('bg', '#3d3d3d')
+        self.fg = kwargs.pop('fg', 'white')
+        self.hover_bg = kwargs.pop('hover_bg', '#505050')
+        self.use_image = kwargs.pop('use_image', ROUNDED_BUTTON_IMAGES) and bool(_load_pillow())
+        height = kwargs.pop('height', 30)
+        super().__init__(parent, borderwidth=0, relief="flat", highlightthickness=0, bg=parent.cget('bg'), height=height)
+        self.command = command
+        self.text = text
+        self.bind("<ButtonPress-1>", self._on_press)
+        self.bind("<ButtonRelease-1>", self._on_release)
+        self.bind("<Enter>", self._on_enter)
+        self.bind("<Leave>", self._on_leave)
+        self.bind("<Configure>", self._on_resize)
+        self._hover = False
+        self._size = None
+        self._layout_job = None
+        self._text_id = self.create_text(0, 0, text=self.text, fill=self.fg, font=('Arial', 10, 'bold'))
+        self._image = None          # keeps the shown image alive if the cache drops it
+        if self.use_image: self._shape_ids = (self.create_image(0, 0, anchor='nw', state='hidden'),)
+        else: self._shape_ids = tuple(self.create_oval(0, 0, 0, 0, state='hidden') for _ in range(4)) + tuple(self.create_rectangle(0, 0, 0, 0, state='hidden') for _ in range(2))
+        for item in self._shape_ids: self.tag_lower(item, self._text_id)
+
+    def _on_resize(self, event):
+        if self._layout_job is None: self._layout_job = self.after_idle(self._layout)
+
+    def _layout(self):
+        self._layout_job = None
+        size = (self.winfo_width(), self.winfo_height())
+        if size == self._size: return
+        self._size = width, height = size
+        self.coords(self._text_id, width / 2, height / 2)
+        if width < 2 * self.radius or height < 2 * self.radius:
+            for item in self._shape_ids: self.itemconfigure(item, state='hidden')
+            return
+        if not self.use_image:
+            d = self.radius * 2
+            boxes = ((0, 0, d, d), (width - d, 0, width, d), (0, height - d, d, height), (width - d, height - d, width, height),
+                     (self.radius, 0, width - self.radius, height), (0, self.radius, width, height - self.radius))
+            for item, box in zip(self._shape_ids, boxes): self.coords(item, *box)
+        for item in self._shape_ids: self.itemconfigure(item, state='normal')
+        self.draw(self._hover)
+
+    def draw(self, is_hover=False):
+        """Colour the shape for the hover state; only the fill (or image) changes."""
+        self._hover = is_hover
+        if self._size is None: return
+        color = self.hover_bg if is_hover else self.bg
+        if self.use_image:
+            self._image = rounded_rect_image(self._size[0], self._size[1], self.radius, color)
+            self.itemconfigure(self._shape_ids[0], image=self._image)
+        else:
+            for item in self._shape_ids: self.itemconfigure(item, fill=color, outline=color)
+
+    def _on_enter(self, event): self.draw(is_hover=True)
+    def _on_leave(self, event): self.draw(is_hover=False)
+    def _on_press(self, event): pass
+    def _on_release(self, event):
+        self.draw(is_hover=True)
+        if self.command: self.command()
+
+_rounded_images = OrderedDict()
+_pillow = None
+
+def _load_pillow():
+    """Pillow's (Image, ImageDraw, ImageTk), imported on first use so startup does not pay
+    for it, or False when it is not installed."""
+    global _pillow
+    if _pillow is None:
+        try:
+            from PIL import Image, ImageDraw, ImageTk
+            _pillow = (Image, ImageDraw, ImageTk)
+        except ImportError: _pillow = False
+    return _pillow
+
+def rounded_rect_image(width, height, radius, color):
+    """An anti-aliased rounded rectangle as a PhotoImage, cached by size and colour."""
+    key = (width, height, radius, color)
+    image = _rounded_images.get(key)
+    if image is not None:
+        _rounded_images.move_to_end(key)
+        return image
+    Image, ImageDraw, ImageTk = _load_pillow()
+    # Drawn at 4x and scaled down, which smooths the corners
+    scale = 4
+    mask = Image.new('L', (width * scale, height * scale), 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, width * scale - 1, height * scale - 1), radius * scale, fill=255)
+    shape = Image.new('RGBA', (width, height), color)
+    shape.putalpha(mask.resize((width, height), Image.LANCZOS))
+    image = _rounded_images[key] = ImageTk.PhotoImage(shape)
+    if len(_rounded_images) > ROUNDED_IMAGE_CACHE: _rounded_images.popitem(last=False)
+    return image
+
+class Toaster:
+    """Notifications sliding up from the bottom of a window, one at a time.
+
+    A single label is created on first use and reused. Messages arriving while
+    one is showing are queued, and the current one is cut short (after
+    TOAST_MIN_HOLD) so the queue keeps moving.
+    """
+    START_RELY, END_RELY = 1.1, 0.95
+
+    def __init__(self, master, clock):
+        self.master, self.clock = master, clock
+        self.label = None
+        self.queue = deque()                # (message, duration) waiting to be shown
+        self.state = 'hidden'               # hidden, in, shown or out
+        self._shown_at = 0.0
+        self._hold_job = None
+
+    def show(self, message, duration):
+        if self.queue and self.queue[-1][0] == message: return
+        self.queue.append((message, duration))
+        if self.state == 'hidden': self._next()
+        elif self.state == 'shown':
+            remaining = max(0, int(TOAST_MIN_HOLD - (time.monotonic() - self._shown_at) * 1000))
+            self._schedule_leave(remaining)
+
+    def _place(self, rely): self.label.place(relx=0.5, rely=rely, anchor='center')
+
+    def _next(self):
+        message, duration = self.queue.popleft()
+        if self.label is None:
+            self.label = tk.Label(self.master, bg='#303030', fg='white', font=('Arial', 10), padx=15, pady=8, highlightbackground='#606060', highlightthickness=1)
+        self.label.config(text=message)
+        self.label.lift()
+        self.state = 'in'
+        start, end = self.START_RELY, self.END_RELY
+        self.clock.animate('toast', TOAST_SLIDE, lambda f: self._place(start + (end - start) * f), animation.ease_out_cubic,
+                           on_done=lambda: self._hold(duration))
+
+    def _hold(self, duration):
+        self.state, self._shown_at = 'shown', time.monotonic()
+        self._schedule_leave(min(duration, TOAST_MIN_HOLD) if self.queue else duration)
+
+    def _schedule_leave(self, delay):
+        if self._hold_job: self.master.after_cancel(self._hold_job)
+        self._hold_job = self.master.after(delay, self._leave)
+
+    def _leave(self):
+        self._hold_job = None
+        self.state = 'out'
+        start, end = self.END_RELY, self.START_RELY
+        self.clock.animate('toast', TOAST_SLIDE, lambda f: self._place(start + (end - start) * f), animation.ease_in_cubic, on_done=self._finish)
+
+    def _finish(self):
+        if self.queue: self._next(); return
+        self.label.place_forget()
+        self.state = 'hidden'
+
+class DebugOverlay:
+    """Live readout of the tracer over a window: the last calculation's phases, event-loop
+    lag with the callback blamed for the worst stall, and memory. Tracing runs while any
+    window shows one (or for the whole run with --trace)."""
+    def __init__(self, app):
+        self.app = app
+        self.label = None
+        self._job = None
+
+    @property
+    def visible(self): return self._job is not None
+
+    def toggle(self):
+        if self.visible: self.hide()
+        else: self.show()
+
+    def show(self):
+        profiling.tracer.enable(self.app.root)
+        if self.label is None:
+            self.label = tk.Label(self.app.master, bg='#101010', fg='#9fe0a0', font=('Courier', 8), justify='left', anchor='nw', padx=6, pady=4)
+        self.label.place(x=8, y=36)
+        self._refresh()
+
+    def hide(self):
+        if self._job: self.app.master.after_cancel(self._job); self._job = None
+        if self.label: self.label.place_forget()
+        if profiling.TRACE_FLAG not in sys.argv and not any(app.debug_overlay.visible for app in running_apps):
+            profiling.tracer.disable()
+
+    def _refresh(self):
+        tracer = profiling.tracer
+        lines = [tracer.describe(event) for event in map(tracer.last, ('calculate', 'result', 'preview', 'button', 'job')) if event]
+        worst, blamed = tracer.max_lag
+        lines.append(f"loop lag  {tracer.lag:8.1f} ms | worst {worst:.0f} ms" + (f" in {blamed}" if blamed else ''))
+        if tracer.memory:
+            traced, peak, windows = tracer.memory
+            tabs = windows.get(window_label(self.app), {})
+            lines.append(f"memory    {traced / 1e6:8.1f} MB | peak {peak / 1e6:.1f} MB, this window {sum(tabs.values()) / 1e3:.0f} KB")
+            lines.extend(f"  {tab:<14}{size / 1e3:8.1f} KB" for tab, size in tabs.items())
+        self.label.config(text='\n'.join(lines))
+        self.label.lift()
+        self._job = self.app.master.after(OVERLAY_REFRESH, self._refresh)
+
+class HistoryView(tk.Frame):
+    """A history list that only creates canvas items for the rows on screen.
+
+    Entries are fetched from the store a page at a time as the view scrolls,
+    so opening it costs the same with ten entries as with a million.
+    """
+    def __init__(self, parent, store, on_select, theme):
+        super().__init__(parent, bg=theme['bg'])
+        self.store, self.on_select, self.theme = store, on_select, theme
+        self.query, self.total, self.top = '', 0, 0
+        self._pages = OrderedDict()
+        self._rows = []             # (background, text) canvas items, reused while scrolling
+        self._hover = None
+        self._refresh_job = None
+        self.font = tkfont.Font(family='Arial', size=11)
+        self.row_height = self.font.metrics('linespace') + 6
+        self.char_width = max(1, self.font.measure('0'))
+        self.scrollbar = tk.Scrollbar(self, relief='flat', troughcolor=theme['bg'], bg=theme['button_bg'], activebackground=theme['active_bg'], command=self.yview)
+        self.scrollbar.pack(side='right', fill='y')
+        self.canvas = tk.Canvas(self, bg=theme['entry_bg'], highlightthickness=0, bd=0)
+        self.canvas.pack(side='left', fill='both', expand=True)
+        self.canvas.bind("<Configure>", lambda e: self.render())
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<Leave>", lambda e: self._set_hover(None))
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self.yview('scroll', -1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind("<Button-4>", lambda e: self.yview('scroll', -1, 'units'))
+        self.canvas.bind("<Button-5>", lambda e: self.yview('scroll', 1, 'units'))
+        self.refresh()
+
+    @property
+    def visible_rows(self): return max(1, -(-self.canvas.winfo_height() // self.row_height))
+
+    def set_query(self, text):
+        query = text if len(text.strip()) >= HISTORY_MIN_QUERY else ''
+        if query != self.query:
+            self.query = query
+            self.refresh()
+
+    def entry_added(self):
+        """Refresh soon for a new entry; a burst of entries costs one recount."""
+        if self._refresh_job is None: self._refresh_job = self.after(HISTORY_REFRESH_DELAY, self.refresh)
+
+    def refresh(self):
+        """Drop cached pages and recount, e.g. after the filter or the history changed."""
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        self._pages.clear()
+        self.total = self.store.count(self.query)
+        self.top = 0
+        self.render()
+
+    def destroy(self):
+        if self._refresh_job is not None: self.after_cancel(self._refresh_job)
+        super().destroy()
+
+    def entry_at(self, index):
+        if not 0 <= index < self.total: return None
+        number, offset = divmod(index, HISTORY_PAGE_SIZE)
+        page = self._pages.get(number)
+        if page is None:
+            page = self._pages[number] = self.store.page(number * HISTORY_PAGE_SIZE, HISTORY_PAGE_SIZE, self.query)
+            if len(self._pages) > HISTORY_PAGE_CACHE: self._pages.popitem(last=False)
+        else: self._pages.move_to_end(number)
+        return page[offset] if offset < len(page) else None
+
+    def row_text(self, entry):
+        text = f"{bignum.abbreviate(entry.expression)} = {bignum.abbreviate(entry.result)}"
+        max_chars = max(4, (self.canvas.winfo_width() - 10) // self.char_width)
+        return text if len(text) <= max_chars else text[:max_chars - 1] + '…'
+
+    def render(self):
+        width, rows = self.canvas.winfo_width(), self.visible_rows
+        while len(self._rows) < rows:
+            y = len(self._rows) * self.row_height
+            background = self.canvas.create_rectangle(0, y, width, y + self.row_height, width=0, fill=self.theme['entry_bg'])
+            text = self.canvas.create_text(5, y + self.row_height / 2, anchor='w', font=self.font, fill=self.theme['entry_fg'])
+            self._rows.append((background, text))
+        for row, (background, text) in enumerate(self._rows):
+            entry = self.entry_at(self.top + row) if row < rows else None
+            self.canvas.coords(background, 0, row * self.row_height, width, (row + 1) * self.row_height)
+            self.canvas.itemconfigure(text, text=self.row_text(entry) if entry else '')
+            self.canvas.itemconfigure(background, fill=self.theme['active_bg'] if entry and row == self._hover else self.theme['entry_bg'])
+        if self.total: self.scrollbar.set(self.top / self.total, min(1.0, (self.top + rows) / self.total))
+        else: self.scrollbar.set(0, 1)
+
+    def yview(self, *args):
+        rows = self.visible_rows
+        if args[0] == 'moveto': top = int(float(args[1]) * self.total)
+        elif args[2] == 'pages': top = self.top + int(args[1]) * rows
+        else: top = self.top + int(args[1]) * 3
+        top = max(0, min(top, self.total - rows))
+        if top != self.top: self.top = top; self.render()
+
+    def _row_at(self, y): return int(y // self.row_height)
+
+    def _set_hover(self, row):
+        if row == self._hover: return
+        for index, fill in ((self._hover, self.theme['entry_bg']), (row, self.theme['active_bg'])):
+            if index is not None and index < len(self._rows) and self.entry_at(self.top + index):
+                self.canvas.itemconfigure(self._rows[index][0], fill=fill)
+        self._hover = row
+
+    def _on_motion(self, event): self._set_hover(self._row_at(event.y))
+
+    def _on_click(self, event):
+        entry = self.entry_at(self.top + self._row_at(event.y))
+        if entry: self.on_select(entry)
+
+class TableView(tk.Frame):
+    """The rows of a function table, drawn the way HistoryView draws history: canvas
+    items exist only for the rows on screen, so a million rows scroll like ten."""
+    def __init__(self, parent, theme):
+        super().__init__(parent, bg=theme['bg'])
+        self.theme, self.table, self.top = theme, None, 0
+        self._rows = []             # (x, f(x)) canvas text items, reused while scrolling
+        self.font = tkfont.Font(family='Arial', size=11)
+        self.row_height = self.font.metrics('linespace') + 6
+        self.scrollbar = tk.Scrollbar(self, relief='flat', troughcolor=theme['bg'], bg=theme['button_bg'], activebackground=theme['active_bg'], command=self.yview)
+        self.scrollbar.pack(side='right', fill='y')
+        self.canvas = tk.Canvas(self, bg=theme['entry_bg'], highlightthickness=0, bd=0)
+        self.canvas.pack(side='left', fill='both', expand=True)
+        self.canvas.bind("<Configure>", lambda e: self.render())
+        self.canvas.bind("<MouseWheel>", lambda e: self.yview('scroll', -1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind("<Button-4>", lambda e: self.yview('scroll', -1, 'units'))
+        self.canvas.bind("<Button-5>", lambda e: self.yview('scroll', 1, 'units'))
+
+    @property
+    def total(self): return len(self.table) if self.table else 0
+
+    @property
+    def visible_rows(self): return max(1, -(-self.canvas.winfo_height() // self.row_height))
+
+    def set_table(self, rows):
+        self.table, self.top = rows, 0
+        self.render()
+
+    def rows_arrived(self, first, count):
+        """Redraw if a batch that just came in is on screen."""
+        if first < self.top + self.visible_rows and first + count > self.top: self.render()
+
+    def render(self):
+        width, rows = self.canvas.winfo_width(), self.visible_rows
+        while len(self._rows) < rows:
+            y = len(self._rows) * self.row_height + self.row_height / 2
+            self._rows.append(tuple(self.canvas.create_text(0, y, anchor='w', font=self.font, fill=self.theme['entry_fg']) for _ in range(2)))
+        for row, (x_item, y_item) in enumerate(self._rows):
+            index = self.top + row
+            if row < rows and index < self.total:
+                x, y = self.table.row(index)
+                x, y = bignum.abbreviate(x), '…' if y is None else bignum.abbreviate(y)
+            else: x = y = ''
+            self.canvas.coords(x_item, 5, row * self.row_height + self.row_height / 2)
+            self.canvas.coords(y_item, width * 0.4, row * self.row_height + self.row_height / 2)
+            self.canvas.itemconfigure(x_item, text=x)
+            self.canvas.itemconfigure(y_item, text=y)
+        if self.total: self.scrollbar.set(self.top / self.total, min(1.0, (self.top + rows) / self.total))
+        else: self.scrollbar.set(0, 1)
+
+    def yview(self, *args):
+        rows = self.visible_rows
+        if args[0] == 'moveto': top = int(float(args[1]) * self.total)
+        elif args[2] == 'pages': top = self.top + int(args[1]) * rows
+        else: top = self.top + int(args[1]) * 3
+        top = max(0, min(top, self.total - rows))
+        if top != self.top: self.top = top; self.render()
+
+class TabModel:
+    """The state of one calculator tab. Each window has one CalculatorPanel that
+    displays whichever model is active, so an extra tab is just this object."""
+    __slots__ = ('name', 'key', 'stored', 'expression', 'previous', 'result_value', 'answer', 'context', 'undo', 'job', 'definitions')
+
+    def __init__(self, name, expression='', previous='', context=None, key=None):
+        self.name = name
+        self.key = key or session.new_tab_id()
+        self.stored = False                 # restored but not yet read from the session
+        self.expression = expression
+        self.previous = previous            # text of the line above the entry
+        self.result_value = None            # BigResult behind a scientific display, for Copy
+        self.answer = None                  # Decimal value of the last calculation, as `ans`
+        self.context = context or DEFAULT_CONTEXT
+        self.undo = None                    # earlier expressions, created on first use
+        self.job = None
+        # [variable or None, expression, ans text, time] behind the tab's workspace cells: the
+        # latest per variable, then the statement the tab shows, which may also be a variable
+        self.definitions = []
+
+    def push_undo(self):
+        if not self.expression: return
+        if self.undo is None: self.undo = []
+        elif self.undo and self.undo[-1] == self.expression: return
+        self.undo.append(self.expression)
+        if len(self.undo) > UNDO_DEPTH: del self.undo[0]
+
+    def fixed_names(self):
+        return {workspace.ANS: self.answer} if self.answer is not None else {}
+
+    def remember(self, target, expression, fixed, stamp):
+        """Note a statement the tab defined cells with, replacing what it superseded."""
+        key = target and workspace.name_key(target)
+        kept = [d for d in self.definitions if d[0] is not None and workspace.name_key(d[0]) != key]
+        ans = fixed.get(workspace.ANS)
+        self.definitions = kept + [[target, expression, None if ans is None else workspace.value_text(ans), stamp]]
+
+    def state(self):
+        """(expression, previous, precision, rounding, answer, definitions) as saved in the session."""
+        answer = None if self.answer is None else workspace.value_text(self.answer)
+        return (self.expression, '' if self.job else self.previous, self.context.prec, self.context.rounding, answer, self.definitions)
+
+    def restore(self, state):
+        self.expression, self.previous, prec, rounding, answer, self.definitions = state
+        self.answer = None if answer is None else workspace.parse_value(answer)
+        shared = prec == DEFAULT_CONTEXT.prec and rounding == DEFAULT_CONTEXT.rounding
+        self.context = DEFAULT_CONTEXT if shared else decimal.Context(prec=prec, rounding=rounding)
+
+    def snapshot(self):
+        """Compact copy of what a reopened tab needs; no widgets, jobs or BigResults."""
+        return (self.name,) + self.state()
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        model = cls(snapshot[0])
+        model.restore(snapshot[1:])
+        return model
+
+class CalculatorPanel(ttk.Frame):
+    """The display and keypad of a window, bound to the active TabModel."""
+    def __init__(self, parent, app, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.app = app
+        self.model = TabModel('')
+        self.configure(style='Dark.TFrame')
+        self.result_var = tk.StringVar()
+        self.previous_result_var = tk.StringVar()
+        self.live_evaluator = self._new_live_evaluator()
+        self._live_preview_job = None
+        self._setting_result = False
+        self._loading = False
+        self.create_widgets()
+        self.result_var.trace_add('write', self._on_entry_changed)
+
+    def create_widgets(self):
+        # Every widget here takes its colours from a named ttk style (see configure_styles),
+        # so switching themes never has to visit the panel
+        self.display_frame = ttk.Frame(self, style='Dark.TFrame')
+        self.display_frame.grid(row=0, column=0, columnspan=6, padx=10, pady=(10, 5), sticky='nsew')
+
+        self.previous_result_label = ttk.Label(self.display_frame, textvariable=self.previous_result_var, style='Preview.TLabel', anchor='e')
+        self.previous_result_label.pack(fill='x', padx=5)
+        
+        entry_frame = ttk.Frame(self.display_frame, style='Dark.TFrame')
+        entry_frame.pack(fill='both', expand=True)
+
+        self.entry = ttk.Entry(entry_frame, textvariable=self.result_var, font=('Arial', 20, 'bold'), width=14, justify='right', style='Display.TEntry')
+        self.entry.pack(side='left', fill='both', expand=True)
+        self.entry.bind("<Return>", lambda event: self.calculate_result())
+        self.entry.bind("<Button-3>", lambda event: self.paste_from_clipboard())
+        
+        self.copy_btn = ttk.Button(entry_frame, text='Copy', style='Copy.Calc.TButton', takefocus=False, command=self.copy_to_clipboard)
+        self.copy_btn.pack(side='right', fill='y', padx=(5,0))
+        
+        self.buttons_map = {}
+        buttons_layout = [('C', 1, 0), ('(', 1, 1), (')', 1, 2), ('/', 1, 3), ('DEL', 1, 4), ('7', 2, 0), ('8', 2, 1), ('9', 2, 2), ('*', 2, 3), ('^', 2, 4), ('4', 3, 0), ('5', 3, 1), ('6', 3, 2), ('-', 3, 3), ('sqrt', 3, 4), ('1', 4, 0), ('2', 4, 1), ('3', 4, 2), ('+', 4, 3), ('%', 4, 4), ('0', 5, 0), ('.', 5, 1), ('±', 5, 2), ('=', 5, 3), ('π', 5, 4), ('sin', 6, 0), ('cos', 6, 1), ('tan', 6, 2), ('log', 6, 3), ('ln', 6, 4), ('x!', 1, 5)]
+        for text, row, col in buttons_layout:
+            # Hover colours come from the style's 'active' state map, so no Enter/Leave bindings
+            button = ttk.Button(self, text=text, style=self.button_style(text), takefocus=False, command=lambda t=text: self.on_button_click(t))
+            button.grid(row=row, column=col, padx=3, pady=3, sticky=tk.NSEW)
+            self.buttons_map[text] = button
+        for i in range(7): self.grid_rowconfigure(i, weight=1)
+        for i in range(6): self.grid_columnconfigure(i, weight=1)
+
+    @staticmethod
+    def button_style(text):
+        if text == '=': return 'Equals.Calc.TButton'
+        if text == 'C': return 'Clear.Calc.TButton'
+        if text in SPECIAL_KEYS: return 'Special.Calc.TButton'
+        return 'Calc.TButton'
+
+    def show(self, model):
+        """Display another tab's model; its running calculation carries on."""
+        if model is self.model: return
+        if self._live_preview_job: self.after_cancel(self._live_preview_job); self._live_preview_job = None
+        self.model = model
+        self.live_evaluator = self._new_live_evaluator()
+        self._loading = True
+        try:
+            self.result_var.set(model.expression)
+            self.previous_result_var.set(model.previous)
+        finally: self._loading = False
+        self.entry.icursor(tk.END)
+
+    def show_notification(self, message, duration=1500): self.app.show_notification(message, duration)
+    def copy_to_clipboard(self):
+        result = self.result_var.get()
+        if not result: self.show_notification("Nothing to copy", 2000); return
+        model, value = self.model, self.model.result_value
+        if value is not None and result == value.display() and value.digits > bignum.INLINE_DIGITS:
+            # The entry only shows the scientific form; expand the full number off the Tk thread
+            previous = model.previous
+            def copy_full_text(text):
+                self.set_previous(model, previous)
+                self.set_clipboard(text)
+            self.start_job(worker.full_text_task, (value,), copy_full_text, status="Copying…")
+        else: self.set_clipboard(result)
+    def set_clipboard(self, text):
+        self.master.clipboard_clear(); self.master.clipboard_append(text); self.show_notification("Copied to clipboard")
+    def paste_from_clipboard(self):
+        try:
+            clipboard_content = self.master.clipboard_get()
+            if clipboard_content: self.result_var.set(self.result_var.get() + clipboard_content); self.show_notification("Pasted from clipboard")
+            else: self.show_notification("Clipboard is empty", 2000)
+        except tk.TclError: self.show_notification("No content in clipboard", 2000)
+        return "break"
+    def on_button_click(self, char):
+        current_text = self.result_var.get()
+        context = self.model.context
+        if char in ('C', 'sqrt', 'x!', 'sin', 'cos', 'tan', 'log', 'ln'): self.model.push_undo()
+        if char == 'C': 
+            self.cancel_job()
+            self.result_var.set('')
+            self.set_previous(self.model, '')
+        elif char == 'DEL': self.result_var.set(current_text[:-1])
+        elif char == '±':
+            if current_text and current_text.startswith('-'): self.result_var.set(current_text[1:])
+            else: self.result_var.set('-' + current_text)
+        elif char == 'π':
+            plan = cost.plan_function(char, context.prec, cost_limits)
+            if plan.route == cost.REFUSE: self.show_notification(plan.text, 3000)
+            elif plan.route == cost.INLINE: self.result_var.set(current_text + str(constants.pi(context.prec)))
+            else:
+                model = self.model
+                self.start_job(worker.pi_task, (context.prec,), lambda text: self.set_result(current_text + text, model))
+                if plan.seconds >= PROGRESS_AFTER: self.track_progress(model, model.job, model.previous, plan.seconds)
+        elif char == '=': self.calculate_result()
+        elif char == 'x!':
+            try:
+                num = int(current_text)
+                plan = cost.plan_factorial(num, cost_limits) if num >= 0 else None
+                if plan is None:
+                    self.result_var.set("Error")
+                elif plan.route == cost.REFUSE: self.show_notification(plan.text, 3000)
+                elif plan.route == cost.APPROXIMATE:
+                    self.set_previous(self.model, f"{num}! =")
+                    self.result_var.set(plan.text)
+                else:
+                    model = self.model
+                    def show_factorial(result):
+                        self.set_previous(model, f"{num}! =")
+                        self.set_result(result, model)
+                    self.start_job(worker.factorial_task, (num,), show_factorial)
+                    if plan.seconds >= PROGRESS_AFTER: self.track_progress(model, model.job, model.previous, plan.seconds)
+            except (ValueError, TypeError, OverflowError):
+                self.result_var.set("Error")
+        elif char in worker.FUNCTIONS:
+            span = profiling.tracer.span('button', key=char)
+            try:
+                value = decimal.Decimal(current_text)
+                plan = cost.plan_function(char, context.prec, cost_limits); span.phase('plan')
+                if plan.route == cost.REFUSE: self.show_notification(plan.text, 3000)
+                elif plan.route == cost.INLINE:
+                    result = worker.FUNCTIONS[char](value, context); span.phase('evaluate')
+                    self.show_button_result(result, span)
+                else:
+                    # Kernels at thousands of digits take seconds; every window would freeze
+                    model = self.model
+                    def show_function(text):
+                        span.phase('evaluate')
+                        self.show_button_result(text, span, model)
+                    self.start_job(worker.function_task, (char, value, context), show_function)
+                    if plan.seconds >= PROGRESS_AFTER: self.track_progress(model, model.job, model.previous, plan.seconds)
+            except (ValueError, TypeError, decimal.InvalidOperation):
+                self.result_var.set('Error')
+        else:
+            self.result_var.set(current_text + char)
+
+    def show_button_result(self, result, span, model=None):
+        text = str(result); span.phase('format')
+        if model is None: self.result_var.set(text)
+        else: self.set_result(text, model)
+        span.phase('display')
+        span.finish(digits=len(text))
+
+    def calculate_result(self):
+        model = self.model
+        statement = self.result_var.get()
+        target, expression = workspace.split_assignment(statement.replace(',', ''))
+        started = time.monotonic()
+        span = profiling.tracer.span('calculate', tab=model.name, length=len(statement))
+        # A low-precision pass is cheap enough for the Tk thread and shows something at once
+        preview_context = self.preview_context()
+        try:
+            compiled = engine.compile_expression(expression); span.phase('parse')
+            scope = shared_cells.scope(model.fixed_names())
+            plan = cost.plan(compiled, model.context, scope, cost_limits); span.phase('plan')
+            if plan.route == cost.REFUSE: self.show_notification(plan.text, 3000); return
+            if plan.route == cost.APPROXIMATE: preview = plan.text
+            elif plan.route == cost.INLINE or cost.plan(compiled, preview_context, scope, cost_limits).route == cost.INLINE:
+                value = compiled.evaluate(preview_context, scope); span.phase('evaluate')
+                preview = worker.format_preview(value, preview_context.prec); span.phase('format')
+            else: preview = None    # exact integer work costs the same at any precision
+
+        except engine.UndefinedName as exc:
+            # The name may belong to a restored tab that has not been read yet
+            if session_keeper.hydrate_all(): return self.calculate_result()
+            self.show_notification(str(exc), 2000); self.result_var.set('Error')
+            return
+        except Exception:
+            self.result_var.set('Error')
+            return
+        model.push_undo()
+        try: recalculator.define(model, target, expression)
+        except (workspace.CycleError, workspace.NameClash) as exc:
+            self.show_notification(str(exc), 2000); self.result_var.set('Error')
+            return
+        span.phase('define')
+        if preview is not None: self.set_result(preview); span.phase('display')
+        span.finish(digits=len(preview or ''))
+        recalculator.requests[model.key] = (statement, started, profiling.tracer.span('result', tab=model.name))
+        recalculator.run()
+
+    def show_cell(self, model, statement, result, request=None):
+        """Show the recomputed value of a tab's workspace cell. A recomputation the user did
+        not ask for is only shown while the tab still displays the cell's last result."""
+        if request is None and model.expression != recalculator.shown.get(model.key): return
+        if request is not None: request[2].phase('evaluate')
+        if result is None: self.set_result('Error', model)
+        else:
+            self.set_previous(model, f"{statement} =")
+            self.set_result(result, model)
+        recalculator.shown[model.key] = model.expression
+        if request is not None: request[2].phase('display'); request[2].finish(digits=len(model.expression))
+        if request is not None and result is not None:
+            text = result.abbreviated() if isinstance(result, bignum.BigResult) else result
+            self.app.add_to_history(request[0], text, tab=model.name, duration=time.monotonic() - request[1])
+
+    def load_expression(self, text):
+        self.model.push_undo()
+        self.result_var.set(text)
+        self.entry.icursor(tk.END)
+
+    def undo(self):
+        model = self.model
+        if not model.undo: self.show_notification("Nothing to undo"); return
+        self.result_var.set(model.undo.pop())
+        self.entry.icursor(tk.END)
+
+    def _new_live_evaluator(self):
+        # Cached spans go stale when workspace values change, so the evaluator is replaced then
+        self._cells_version = shared_cells.version
+        return engine.IncrementalEvaluator(self.preview_context(), names=shared_cells.scope(self.model.fixed_names()))
+
+    def preview_context(self):
+        context = self.model.context.copy()
+        context.prec = min(context.prec, PREVIEW_PRECISION)
+        return context
+
+    def set_precision(self, model, digits, rounding=None):
+        model.context = decimal.Context(prec=digits, rounding=rounding or model.context.rounding)
+        session_keeper.tab_changed(model)
+        if model is self.model: self.live_evaluator = self._new_live_evaluator()
+
+    def _on_entry_changed(self, *args):
+        if self._loading: return
+        self.model.expression = self.result_var.get()
+        session_keeper.tab_changed(self.model)
+        # Any edit to the entry makes a running calculation stale
+        self.cancel_job()
+        if self._setting_result: return
+        self.model.result_value = None
+        if self._live_preview_job: self.after_cancel(self._live_preview_job)
+        self._live_preview_job = self.after(LIVE_PREVIEW_DELAY, self.update_live_preview)
+
+    def update_live_preview(self):
+        """Show the value of the expression being typed above the entry."""
+        self._live_preview_job = None
+        _, text = workspace.split_assignment(self.result_var.get())
+        if not text.strip(): self.set_previous(self.model, ''); return
+        if self._cells_version != shared_cells.version: self.live_evaluator = self._new_live_evaluator()
+        span = profiling.tracer.span('preview', tab=self.model.name, length=len(text))
+        try: value = self.live_evaluator.evaluate(text)
+        except engine.ParseError: return    # still being typed; keep the last preview
+        except Exception: self.set_previous(self.model, ''); return
+        span.phase('evaluate')
+        if self.live_evaluator.is_literal: self.set_previous(self.model, '')
+        else:
+            preview = worker.format_preview(value, self.live_evaluator.context.prec); span.phase('format')
+            self.set_previous(self.model, f"= {preview}")
+        span.phase('display')
+        span.finish(spans=self.live_evaluator.computed)
+
+    # Calculations may finish after their tab was switched away from, so results
+    # are written to the model and only shown if it is still the active one
+
+    def set_previous(self, model, text):
+        model.previous = text
+        session_keeper.tab_changed(model)
+        if model is self.model: self.previous_result_var.set(text)
+
+    def set_result(self, result, model=None):
+        """Show a worker result; huge integers stay a BigResult so Copy can expand them later."""
+        model = model or self.model
+        if model is self.model:
+            if self._live_preview_job: self.after_cancel(self._live_preview_job); self._live_preview_job = None
+            self._setting_result = True
+            try: self.result_var.set(str(result))
+            finally: self._setting_result = False
+        else: model.expression = str(result); session_keeper.tab_changed(model)
+        model.result_value = result if isinstance(result, bignum.BigResult) else None
+
+    def start_job(self, func, args, on_result, status="Computing…"):
+        """Run func(*args) in the background worker for the active tab, showing a status until it finishes."""
+        model = self.model
+        self.cancel_job(model)
+        self.set_previous(model, status)
+        model.job = self.app.submit_job(func, *args, callback=lambda job: self._on_job_finished(model, job, on_result))
+
+    def track_progress(self, model, job, status, seconds):
+        """Show a running clock beside a long calculation's status, against its estimate.
+        Only the label changes, so the saved tab state is not touched every tick."""
+        started = time.monotonic()
+        def tick():
+            if model.job is not job: return
+            if model is self.model: self.previous_result_var.set(f"{status} {time.monotonic() - started:.0f} s of {cost.describe_seconds(seconds)}")
+            self.after(PROGRESS_INTERVAL, tick)
+        self.after(PROGRESS_INTERVAL, tick)
+
+    def cancel_job(self, model=None):
+        model = model or self.model
+        if model.job is None: return
+        evaluation_worker.cancel(model.job)
+        recalculator.forget(model.key, model.job)
+        model.job = None
+        self.set_previous(model, '')
+
+    def _on_job_finished(self, model, job, on_result):
+        if job is not model.job: return
+        model.job = None
+        self.set_previous(model, '')
+        if job.state == worker.DONE: on_result(job.result)
+        elif job.state == worker.TIMED_OUT: self.show_notification("Calculation timed out", 2000)
+        else: self.set_result('Error', model)
+
+# --- Global list and function for managing multiple windows ---
+running_apps = []
+current_theme = 'dark'
+evaluation_worker = worker.EvaluationWorker()
+history_store = history.HistoryStore()
+WORKER_POLL_INTERVAL = 20
+
+class SessionKeeper:
+    """Collects changes from every window and queues them on the session store a moment
+    later, so a burst of keystrokes becomes one save of the tabs it touched."""
+    def __init__(self, store):
+        self.store = store
+        self.dirty = set()          # TabModels changed since the last save
+        self.removed = []           # keys of tabs closed since the last save
+        self.manifest = None        # last manifest queued
+        self._job = None
+        self._reading_all = False
+
+    def tab_changed(self, model):
+        self.dirty.add(model)
+        self.changed()
+
+    def tab_closed(self, model):
+        self.dirty.discard(model)
+        self.removed.append(model.key)
+        self.changed()
+
+    def changed(self):
+        """Windows, tab order, names or settings changed; the manifest is compared when saving."""
+        if self._job is None and running_apps:
+            self._job = running_apps[0].root.after(AUTOSAVE_DELAY, self.save)
+
+    def save(self):
+        self._job = None
+        manifest = {'theme': current_theme, 'windows': [app.session_state() for app in running_apps]}
+        tabs = {model.key: model.state() for model in self.dirty if not model.stored}
+        self.store.save(None if manifest == self.manifest else manifest, tabs, self.removed)
+        self.manifest = manifest
+        self.dirty.clear()
+        self.removed = []
+
+    def hydrate(self, model):
+        """Read a restored tab's state the first time it is needed."""
+        if not model.stored: return model
+        model.stored = False
+        state = self.store.load_tab(model.key)
+        if state: model.restore(state)
+        # A definition using a variable or tab saved in a tab not read yet needs them all read
+        if recalculator.restore(model) and not self._reading_all: self.hydrate_all()
+        return model
+
+    def hydrate_all(self):
+        """Read every restored tab not read yet; returns how many were."""
+        stored = [model for app in running_apps for model in app.models.values() if model.stored]
+        self._reading_all = True
+        try:
+            for model in stored: self.hydrate(model)
+        finally: self._reading_all = False
+        return len(stored)
+
+    def close(self):
+        """Save everything now and wait for the writes to finish."""
+        if self._job: running_apps[0].root.after_cancel(self._job)
+        if running_apps: self.save()
+        self.store.close()
+
+session_keeper = SessionKeeper(session.SessionStore())
+
+def window_label(app):
+    return f"window {running_apps.index(app) + 1}" if app in running_apps else 'window'
+
+def tab_memory():
+    """{window: {tab: bytes}} for the tracer's memory samples."""
+    sizes = {}
+    for app in running_apps:
+        tabs = sizes[window_label(app)] = {model.name: profiling.deep_size(model) for model in app.models.values()}
+        if app.closed_tabs: tabs['(closed tabs)'] = profiling.deep_size(app.closed_tabs)
+    return sizes
+
+profiling.tracer.memory_source = tab_memory
+shared_cells = workspace.Workspace()        # variables and tab results shared by every window
+
+def find_tab(key):
+    """(app, model) of the open tab with this key, or (None, None)."""
+    for app in running_apps:
+        for model in app.models.values():
+            if model.key == key: return app, model
+    return None, None
+
+class Recalculator:
+    """Keeps workspace cells up to date. Every cell whose inputs are current is
+    evaluated at once, side by side in the worker pool; cells the cost model
+    finds cheap are evaluated inline, and runaway ones are approximated or refused."""
+    def __init__(self, cells):
+        self.cells = cells
+        self.jobs = {}              # cell key -> running Job
+        self.requests = {}          # tab key -> (statement, start time, tracer span) of a pending "="
+        self.statements = {}        # tab key -> statement shown as "statement =" above its result
+        self.shown = {}             # tab key -> entry text last shown for its cell
+        self.approximations = {}    # cell key -> "≈ …" text of a cell too large to compute
+        self.stamps = {}            # variable cell key -> time of its definition, the newest of which is restored
+        self.waiting = []           # restored definitions whose inputs are in tabs not read yet
+
+    def define(self, model, target, expression):
+        """Make `expression` the tab's cell; `target = expression` also defines a variable
+        that the tab then shows."""
+        fixed, stamp = model.fixed_names(), time.time()
+        if target is not None: self._define_variable(model, target, expression, fixed, stamp)
+        self._define_tab(model, target or expression, fixed)
+        model.remember(target, expression, fixed, stamp)
+        session_keeper.tab_changed(model)
+
+    def _define_variable(self, model, target, expression, fixed, stamp):
+        key = 'var:' + workspace.name_key(target)
+        self._restart(self.cells.define(key, expression, model.context, name=target, fixed=fixed))
+        self.stamps[key] = stamp
+
+    def _define_tab(self, model, expression, fixed):
+        self._restart(self.cells.define(model.key, expression, model.context, fixed=fixed))
+        self.cells.rename(model.key, model.name)
+
+    def restore(self, model):
+        """Define the cells of a tab read back from the session, and show its result again
+        once recomputed. Returns whether some definitions wait for tabs not read yet."""
+        if not model.definitions: return False
+        last = len(model.definitions) - 1
+        for index, (target, expression, ans, stamp) in enumerate(model.definitions):
+            fixed = {} if ans is None else {workspace.ANS: workspace.parse_value(ans)}
+            # A variable defined again since, in another tab, keeps that definition
+            if target is not None and self.stamps.get('var:' + workspace.name_key(target), stamp) <= stamp:
+                self.waiting.append((model, target, expression, fixed, stamp))
+            if index == last:
+                self.waiting.append((model, None, target or expression, fixed, stamp))
+                self.statements[model.key] = expression if target is None else f"{target} ={expression}"
+                self.shown[model.key] = model.expression
+        self._define_waiting()
+        if running_apps: self.run()
+        return bool(self.waiting)
+
+    def _define_waiting(self):
+        """Define restored cells in whatever order their inputs allow."""
+        progress = True
+        while progress and self.waiting:
+            progress, waiting, self.waiting = False, self.waiting, []
+            for item in waiting:
+                model, target, expression, fixed, stamp = item
+                try:
+                    if target is None: self._define_tab(model, expression, fixed)
+                    else: self._define_variable(model, target, expression, fixed, stamp)
+                    progress = True
+                except engine.UndefinedName: self.waiting.append(item)
+                except ValueError: pass         # no longer valid, e.g. a tab name now taken by a variable
+
+    def _restart(self, keys):
+        """Cancel jobs computing the old values of cells that were just invalidated."""
+        for key in keys:
+            job = self.jobs.pop(key, None)
+            if job is None: continue
+            evaluation_worker.cancel(job)
+            _, model = find_tab(key)
+            if model is not None and model.job is job: model.job = None
+
+    def remove(self, key):
+        self.forget(key)
+        for mapping in (self.requests, self.statements, self.shown, self.approximations): mapping.pop(key, None)
+        self._restart(self.cells.remove(key))
+        self.run()
+
+    def forget(self, key, job=None):
+        """Stop tracking a cell's job (cancelled by its tab); the cell stays dirty."""
+        if job is None or self.jobs.get(key) is job: self.jobs.pop(key, None)
+
+    def run(self, cells=None):
+        pending = self.cells.ready() if cells is None else list(cells)
+        while pending:
+            cell = pending.pop()
+            if not cell.dirty or cell.key in self.jobs: continue
+            try: names = self.cells.inputs(cell.key)
+            except (engine.UndefinedName, workspace.InputError) as exc:
+                # A tab showing an approximate variable (`y = 9^9^9`) shows its approximation
+                source = next(iter(cell.deps), None) if type(cell.expression.tree) is engine.Name else None
+                pending.extend(self._finish(cell, result=self.approximations.get(source), error=str(exc))); continue
+            plan = cost.plan(cell.expression, cell.context, names, cost_limits)
+            if plan.route == cost.REFUSE: pending.extend(self._finish(cell, error=plan.text)); continue
+            if plan.route == cost.APPROXIMATE:
+                # Shown, but without an exact value the cells using it fail
+                pending.extend(self._finish(cell, result=plan.text, error="Only known approximately")); continue
+            if plan.route == cost.INLINE:
+                try: value = cell.expression.evaluate_stable(cell.context, names=names)
+                except Exception as exc: pending.extend(self._finish(cell, error=worker.describe_error(exc)))
+                else: pending.extend(self._finish(cell, value, worker.to_result(value)))
+                continue
+            app, model = find_tab(cell.key)
+            app = app or running_apps[0]
+            job = app.submit_job(worker.evaluate_cell_task, cell.text, cell.context, names, callback=lambda job, cell=cell: self._on_job(cell, job))
+            self.jobs[cell.key] = job
+            # A tab edited since its cell was last shown keeps its own job and display
+            if model is not None and (cell.key in self.requests or model.expression == self.shown.get(cell.key)):
+                if model.job is not None: app.calculator.cancel_job(model)
+                model.job = job
+                statement = self.requests.get(cell.key, (self.statements.get(cell.key, cell.text),))[0]
+                app.calculator.set_previous(model, f"{statement} ≈")
+                if plan.seconds >= PROGRESS_AFTER: app.calculator.track_progress(model, job, model.previous, plan.seconds)
+
+    def _on_job(self, cell, job):
+        if self.jobs.get(cell.key) is not job: return
+        del self.jobs[cell.key]
+        _, model = find_tab(cell.key)
+        if model is not None and model.job is job: model.job = None
+        if job.state == worker.DONE: ready = self._finish(cell, *job.result)
+        else: ready = self._finish(cell, error=job.error)
+        self.run(ready)
+
+    def _finish(self, cell, value=None, result=None, error=None):
+        """Record a cell's result, show it in its tab, and return the cells now ready.
+        An approximate result has display text but an error instead of a value."""
+        ready = self.cells.set_result(cell.key, value, error)
+        if value is None and result is not None: self.approximations[cell.key] = result
+        else: self.approximations.pop(cell.key, None)
+        app, model = find_tab(cell.key)
+        if model is not None:
+            request = self.requests.pop(cell.key, None)
+            if request is not None: self.statements[cell.key] = request[0]
+            if result is not None: model.answer = value; session_keeper.tab_changed(model)
+            elif request is not None: app.show_notification(error, 2000)
+            app.calculator.show_cell(model, self.statements.get(cell.key, cell.text), result, request)
+        return ready
+
+recalculator = Recalculator(shared_cells)
+cost_limits = cost.Limits(max_seconds=worker.DEFAULT_TIMEOUT)     # what "=" and x! may attempt
+
+def open_new_instance(event=None):
+    """Creates a new calculator window as a Toplevel instance."""
+    root = running_apps[0].root
+    new_window = tk.Toplevel(root)
+    app = TabbedCalculatorApp(new_window, root)
+    running_apps.append(app)
+    session_keeper.changed()
+
+class UnitConverterWindow(CustomToplevel):
+    def __init__(self, parent, app_theme):
+        super().__init__(parent, "Unit Converter")
+        self.geometry("400x520")
+        self.app_theme = app_theme
+        
+        # This is the key to styling the dropdown list
+        self.option_add('*TCombobox*Listbox.background', self.app_theme['entry_bg'])
+        self.option_add('*TCombobox*Listbox.foreground', self.app_theme['entry_fg'])
+        self.option_add('*TCombobox*Listbox.selectBackground', self.app_theme['active_bg'])
+        self.option_add('*TCombobox*Listbox.selectForeground', self.app_theme['entry_fg'])
+
+        self.registry = units.default_registry()
+        self.context = decimal.Context(prec=UNIT_PRECISION)
+        
+        self.create_widgets()
+        self.update_unit_dropdowns()
+
+    def create_widgets(self):
+        content = self.main_content_frame
+        
+        # Style for Combobox
+        style = ttk.Style(self)
+        style.theme_use('clam')
+        style.configure('TCombobox', 
+                        fieldbackground=self.app_theme['entry_bg'], 
+                        background=self.app_theme['button_bg'], 
+                        foreground=self.app_theme['entry_fg'],
+                        arrowcolor=self.app_theme['entry_fg'],
+                        bordercolor=self.app_theme['bg'],
+                        lightcolor=self.app_theme['bg'],
+                        darkcolor=self.app_theme['bg'])
+        style.map('TCombobox',
+                  fieldbackground=[('readonly', self.app_theme['entry_bg'])],
+                  selectbackground=[('readonly', self.app_theme['entry_bg'])],
+                  selectforeground=[('readonly', self.app_theme['entry_fg'])],
+                  foreground=[('readonly', self.app_theme['entry_fg'])])
+
+
+        # Conversion Type
+        tk.Label(content, text="Conversion Type:", bg=self.bg, fg=self.fg).grid(row=0, column=0, padx=10, pady=5, sticky='w')
+        self.type_var = tk.StringVar(value=next(iter(self.registry)))
+        self.type_combo = ttk.Combobox(content, textvariable=self.type_var, values=list(self.registry), state='readonly')
+        self.type_combo.grid(row=0, column=1, columnspan=2, padx=10, pady=5, sticky='ew')
+        self.type_combo.bind("<<ComboboxSelected>>", self.update_unit_dropdowns)
+
+        # Input Value
+        tk.Label(content, text="Value:", bg=self.bg, fg=self.fg).grid(row=1, column=0, padx=10, pady=5, sticky='w')
+        self.input_var = tk.StringVar()
+        self.input_entry = tk.Entry(content, textvariable=self.input_var, bg=self.app_theme['entry_bg'], fg=self.app_theme['entry_fg'], relief='flat')
+        self.input_entry.grid(row=1, column=1, columnspan=2, padx=10, pady=5, sticky='ew')
+        self.input_entry.bind("<Return>", lambda event: self.perform_conversion())
+
+        # From Unit
+        tk.Label(content, text="From:", bg=self.bg, fg=self.fg).grid(row=2, column=0, padx=10, pady=5, sticky='w')
+        self.from_unit_var = tk.StringVar()
+        self.from_unit_combo = ttk.Combobox(content, textvariable=self.from_unit_var, state='readonly')
+        self.from_unit_combo.grid(row=2, column=1, columnspan=2, padx=10, pady=5, sticky='ew')
+
+        # To Unit
+        tk.Label(content, text="To:", bg=self.bg, fg=self.fg).grid(row=3, column=0, padx=10, pady=5, sticky='w')
+        self.to_unit_var = tk.StringVar()
+        self.to_unit_combo = ttk.Combobox(content, textvariable=self.to_unit_var, state='readonly')
+        self.to_unit_combo.grid(row=3, column=1, columnspan=2, padx=10, pady=5, sticky='ew')
+
+        # Convert Button
+        convert_btn = RoundedButton(content, text="Convert", command=self.perform_conversion, bg=self.app_theme['equals_button_bg'], hover_bg='#57D85B', height=35)
+        convert_btn.grid(row=4, column=0, columnspan=3, padx=10, pady=10, sticky='ew')
+
+        # Result
+        self.result_label = tk.Label(content, text="Result: -", font=('Arial', 12, 'bold'), bg=self.bg, fg=self.fg)
+        self.result_label.grid(row=5, column=0, columnspan=3, padx=10, pady=10)
+
+        # The value in every unit of the category
+        self.all_units_label = tk.Label(content, text="", font=('Arial', 10), bg=self.bg, fg=self.fg, justify='left', anchor='nw')
+        self.all_units_label.grid(row=6, column=0, columnspan=3, padx=10, pady=(0, 10), sticky='nsew')
+        content.grid_columnconfigure(1, weight=1)
+
+    def update_unit_dropdowns(self, event=None):
+        conv_type = self.type_var.get()
+        names = list(self.registry[conv_type])
+        self.from_unit_combo['values'] = names
+        self.to_unit_combo['values'] = names
+        self.from_unit_var.set(names[0])
+        self.to_unit_var.set(names[1] if len(names) > 1 else names[0])
+        self.all_units_label.config(text="")
+
+    def perform_conversion(self):
+        try:
+            value = decimal.Decimal(self.input_var.get().replace(',', '').strip())
+            if not value.is_finite(): raise decimal.InvalidOperation
+            category = self.registry[self.type_var.get()]
+            # Every unit in one pass; the selected target is one of them
+            results = category.convert_all(value, self.from_unit_var.get(), self.context)
+            result = results[self.to_unit_var.get()]
+        except (decimal.InvalidOperation, KeyError, units.UnitError):
+            self.result_label.config(text="Result: Invalid Input")
+            self.all_units_label.config(text="")
+            return
+        self.result_label.config(text=f"Result: {worker.format_preview(result, UNIT_PRECISION)}")
+        self.all_units_label.config(text="\n".join(f"{name}: {worker.format_preview(converted, UNIT_PRECISION)}" for name, converted in results.items()))
+
+class TableWindow(CustomToplevel):
+    """f(x) tabulated over a range or a pasted column. Batches go to the worker pool
+    a few at a time and rows are shown as their batch comes back."""
+    def __init__(self, parent, app):
+        super().__init__(parent, "Function Table")
+        self.geometry("420x600")
+        self.app, self.app_theme = app, app.theme()
+        self.table, self.column = None, None
+        self.started = 0.0
+        self._batches, self._jobs = deque(), set()
+        self.create_widgets()
+
+    def create_widgets(self):
+        content, theme = self.main_content_frame, self.app_theme
+        def entry(parent, var, width):
+            return tk.Entry(parent, textvariable=var, bg=theme['entry_bg'], fg=theme['entry_fg'], insertbackground=theme['entry_fg'], relief='flat', width=width)
+
+        tk.Label(content, text=f"f({table.VARIABLE}) =", bg=self.bg, fg=self.fg).grid(row=0, column=0, padx=10, pady=5, sticky='w')
+        self.expression_var = tk.StringVar(value=f"{table.VARIABLE}^2")
+        expression_entry = entry(content, self.expression_var, 30)
+        expression_entry.grid(row=0, column=1, padx=10, pady=5, sticky='ew')
+        expression_entry.bind("<Return>", self.run)
+
+        range_frame = tk.Frame(content, bg=self.bg); range_frame.grid(row=1, column=0, columnspan=2, padx=10, pady=5, sticky='ew')
+        self.start_var, self.stop_var, self.step_var = tk.StringVar(value='0'), tk.StringVar(value='10'), tk.StringVar(value='1')
+        for column, (text, var) in enumerate((("From", self.start_var), ("To", self.stop_var), ("Step", self.step_var))):
+            tk.Label(range_frame, text=text, bg=self.bg, fg=self.fg).grid(row=0, column=2 * column, padx=(0 if column == 0 else 8, 4), sticky='w')
+            entry(range_frame, var, 8).grid(row=0, column=2 * column + 1, sticky='ew')
+            range_frame.grid_columnconfigure(2 * column + 1, weight=1)
+            # Editing the range switches back from a pasted column
+            var.trace_add('write', lambda *args: self._use_range())
+
+        mode_frame = tk.Frame(content, bg=self.bg); mode_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=5, sticky='ew')
+        tk.Label(mode_frame, text="Mode", bg=self.bg, fg=self.fg).pack(side='left', padx=(0, 4))
+        self.mode_var = tk.StringVar(value='Float')
+        ttk.Combobox(mode_frame, textvariable=self.mode_var, values=['Float', 'Decimal'], state='readonly', width=8).pack(side='left')
+        tk.Button(mode_frame, text="Paste Column", command=self.paste_column, bg=theme['button_bg'], fg=self.fg, relief='flat').pack(side='right')
+
+        button_frame = tk.Frame(content, bg=self.bg); button_frame.grid(row=3, column=0, columnspan=2, padx=10, pady=5, sticky='ew')
+        for column, (text, command, bg) in enumerate((("Run", self.run, theme['equals_button_bg']), ("Stop", self.stop, theme['button_bg']), ("Export CSV", self.export_csv, theme['button_bg']))):
+            button_frame.grid_columnconfigure(column, weight=1)
+            RoundedButton(button_frame, text=text, command=command, bg=bg, hover_bg=theme['active_bg'], height=30).grid(row=0, column=column, sticky='ew', padx=(0 if column == 0 else 5, 0))
+
+        self.status_label = tk.Label(content, text="", bg=self.bg, fg=self.fg, anchor='w')
+        self.status_label.grid(row=4, column=0, columnspan=2, padx=10, sticky='ew')
+        self.view = TableView(content, theme)
+        self.view.grid(row=5, column=0, columnspan=2, padx=10, pady=(5, 10), sticky='nsew')
+        content.grid_columnconfigure(1, weight=1)
+        content.grid_rowconfigure(5, weight=1)
+
+    def set_status(self, text): self.status_label.config(text=text)
+
+    def _use_range(self):
+        if self.column is not None: self.column = None; self.set_status("Using the range")
+
+    def paste_column(self):
+        try: self.column = table.Column.parse(self.clipboard_get())
+        except tk.TclError: self.set_status("The clipboard is empty"); return
+        except table.TableError as exc: self.set_status(str(exc)); return
+        self.set_status(f"Pasted {len(self.column):,} values; edit the range to use it instead")
+
+    def run(self, event=None):
+        self.stop()
+        model = self.app.current_tab()
+        context = model.context if model else DEFAULT_CONTEXT
+        names = shared_cells.scope(model.fixed_names()) if model else None
+        mode = table.DECIMAL if self.mode_var.get() == 'Decimal' else table.FLOAT
+        try:
+            inputs = self.column if self.column is not None else table.Range.parse(self.start_var.get(), self.stop_var.get(), self.step_var.get(), context)
+            self.table = table.Table(self.expression_var.get(), inputs, mode, names=names, context=context)
+        except (ArithmeticError, ValueError) as exc:
+            self.set_status(str(exc) if isinstance(exc, ValueError) else worker.describe_error(exc)); return
+        self.started = time.perf_counter()
+        self._batches = deque(self.table.batches())
+        self.view.set_table(self.table)
+        self._submit()
+
+    def _submit(self):
+        current = self.table
+        while self._batches and len(self._jobs) < TABLE_JOBS:
+            first, count = self._batches.popleft()
+            job = self.app.submit_job(worker.table_batch_task, *current.batch_args(first, count),
+                                      callback=lambda job, first=first: self._on_batch(current, first, job))
+            self._jobs.add(job)
+        self.update_status()
+
+    def _on_batch(self, current, first, job):
+        self._jobs.discard(job)
+        if current is not self.table or not self.winfo_exists(): return
+        if job.state != worker.DONE:
+            self.stop(); self.set_status(f"Stopped at row {first + 1:,}: {job.error}"); return
+        current.store(first, job.result)
+        self._submit()
+        self.view.rows_arrived(first, len(job.result))
+
+    def update_status(self):
+        current, seconds = self.table, time.perf_counter() - self.started
+        if current.complete: self.set_status(f"{len(current):,} rows in {seconds:.2f} s")
+        else: self.set_status(f"{current.done:,} of {len(current):,} rows… {seconds:.1f} s")
+
+    def stop(self):
+        for job in self._jobs: evaluation_worker.cancel(job)
+        self._jobs.clear()
+        if self._batches or self.table and not self.table.complete:
+            self.set_status(f"Stopped with {self.table.done:,} of {len(self.table):,} rows")
+        self._batches.clear()
+
+    def export_csv(self):
+        current = self.table
+        if current is None or not current.done: self.set_status("Nothing to export yet"); return
+        if self._jobs: self.set_status("Still computing; wait or stop it first"); return
+        path = filedialog.asksaveasfilename(parent=self, defaultextension='.csv', filetypes=[("CSV", "*.csv")])
+        if not path: return
+        # Writing a million rows takes seconds, so it happens off the Tk thread
+        outcome = {}
+        def write():
+            try: outcome['rows'] = current.write_csv(path)
+            except OSError as exc: outcome['error'] = exc
+        thread = threading.Thread(target=write, name='zenth-table-export', daemon=True)
+        thread.start()
+        self.set_status("Exporting…")
+        def wait_for_export():
+            if not self.winfo_exists(): return
+            if thread.is_alive(): self.after(100, wait_for_export)
+            elif 'error' in outcome: self.set_status(f"Export failed: {outcome['error']}")
+            else: self.set_status(f"Exported {outcome['rows']:,} rows")
+        wait_for_export()
+
+    def on_close(self):
+        self.stop()
+        super().on_close()
+
+class PlotWindow(CustomToplevel):
+    """Graphs of expressions in x, separated by ';'. The plane is drawn as cached tiles:
+    dragging moves the tiles already on the canvas, and the wheel zooms about the pointer.
+    Missing tiles are drawn nearest the centre first, each as a quick sketch and then
+    refined, a frame's budget at a time. Without Pillow, tiles are canvas lines."""
+    def __init__(self, parent, app):
+        super().__init__(parent, "Plot")
+        self.geometry("560x560")
+        self.app, self.app_theme = app, app.theme()
+        self.use_images = bool(_load_pillow())
+        self.plot = None
+        self._tiles = OrderedDict()     # (level, column, row) -> (PhotoImage or drawing operations, final)
+        self._items = {}                # the same keys -> (canvas item ids, rendered) of the tiles on screen
+        self._render_job = None
+        self._drag = None
+        self.level = plotter.level_for(PLOT_INITIAL_SCALE)
+        self.origin = None              # global pixel coordinates of the canvas's top left corner, once sized
+        self.create_widgets()
+
+    def create_widgets(self):
+        content, theme = self.main_content_frame, self.app_theme
+        top = tk.Frame(content, bg=self.bg); top.pack(fill='x', padx=10, pady=5)
+        tk.Label(top, text="y =", bg=self.bg, fg=self.fg).pack(side='left')
+        self.expression_var = tk.StringVar(value=f"{table.VARIABLE}^2; 1/{table.VARIABLE}")
+        entry = tk.Entry(top, textvariable=self.expression_var, bg=theme['entry_bg'], fg=theme['entry_fg'], insertbackground=theme['entry_fg'], relief='flat')
+        entry.pack(side='left', fill='x', expand=True, padx=5)
+        entry.bind("<Return>", self.draw_plot)
+        RoundedButton(top, text="Reset", command=self.reset, bg=theme['button_bg'], hover_bg=theme['active_bg'], height=30).pack(side='right', padx=(5, 0))
+        RoundedButton(top, text="Plot", command=self.draw_plot, bg=theme['equals_button_bg'], hover_bg='#57D85B', height=30).pack(side='right')
+        self.canvas = tk.Canvas(content, bg=theme['entry_bg'], highlightthickness=0, bd=0, cursor='fleur')
+        self.canvas.pack(fill='both', expand=True, padx=10)
+        self.status_label = tk.Label(content, text="", bg=self.bg, fg=self.fg, anchor='w')
+        self.status_label.pack(fill='x', padx=10, pady=(2, 5))
+        self.canvas.bind("<Configure>", lambda e: self._schedule())
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom(1 if e.delta > 0 else -1, e.x, e.y))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom(1, e.x, e.y))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom(-1, e.x, e.y))
+        self.draw_plot()
+
+    def draw_plot(self, event=None):
+        model = self.app.current_tab()
+        names = shared_cells.scope(model.fixed_names()) if model else None
+        texts = [text for text in self.expression_var.get().split(';') if text.strip()]
+        try: curves = [plotter.Curve(text, plotter.COLORS[i % len(plotter.COLORS)], names) for i, text in enumerate(texts)]
+        except (ArithmeticError, ValueError) as exc:
+            self.status_label.config(text=str(exc) if isinstance(exc, ValueError) else worker.describe_error(exc)); return
+        theme = self.app_theme
+        self.plot = plotter.Plot(curves, theme['entry_bg'], theme['button_bg'], theme['entry_fg'])
+        self._tiles.clear()
+        self._clear_canvas()
+        self.canvas.delete('legend')
+        for i, curve in enumerate(curves):
+            self.canvas.create_text(10, 10 + 16 * i, anchor='nw', text=f"y = {curve.text}", fill=curve.color, font=('Arial', 10, 'bold'), tags='legend')
+        self.status_label.config(text="")
+        self._schedule()
+
+    def reset(self):
+        """Back to the first view, centred on the origin."""
+        self.level, self.origin = plotter.level_for(PLOT_INITIAL_SCALE), None
+        self._clear_canvas()
+        self._schedule()
+
+    def _clear_canvas(self):
+        self.canvas.delete('tile')
+        self._items.clear()
+
+    # --- Interaction ---
+
+    def _on_press(self, event): self._drag = (event.x, event.y)
+
+    def _on_drag(self, event):
+        if self._drag is None or self.origin is None: return
+        dx, dy = event.x - self._drag[0], event.y - self._drag[1]
+        self._drag = (event.x, event.y)
+        self.origin = (self.origin[0] - dx, self.origin[1] - dy)
+        # Tiles already drawn just move; the ones coming into view are drawn next frame
+        self.canvas.move('tile', dx, dy)
+        self._schedule()
+        self._on_motion(event)
+
+    def _on_motion(self, event):
+        if self.origin is None: return
+        scale = plotter.scale_at(self.level)
+        x, y = (self.origin[0] + event.x) * scale, -(self.origin[1] + event.y) * scale
+        self.status_label.config(text=f"x = {x:.6g}   y = {y:.6g}")
+
+    def zoom(self, steps, x, y):
+        """Zoom `steps` levels in (out if negative), keeping the point under (x, y) in place."""
+        level = max(plotter.MIN_LEVEL, min(plotter.MAX_LEVEL, self.level - steps))
+        if level == self.level or self.origin is None: return
+        old, new = plotter.scale_at(self.level), plotter.scale_at(level)
+        self.origin = (round((self.origin[0] + x) * old / new - x), round((self.origin[1] + y) * old / new - y))
+        self.level = level
+        self._clear_canvas()
+        self._schedule()
+
+    # --- Tiles ---
+
+    def _schedule(self):
+        if self._render_job is None: self._render_job = self.after(1, self._render)
+
+    def _visible(self):
+        """Keys of the tiles covering the canvas, nearest its centre first."""
+        size, (left, top) = plotter.TILE_SIZE, self.origin
+        width, height = max(1, self.canvas.winfo_width()), max(1, self.canvas.winfo_height())
+        centre = ((left + width / 2) / size - 0.5, (top + height / 2) / size - 0.5)
+        keys = [(self.level, column, row) for column in range(left // size, (left + width) // size + 1)
+                for row in range(top // size, (top + height) // size + 1)]
+        keys.sort(key=lambda key: (key[1] - centre[0]) ** 2 + (key[2] - centre[1]) ** 2)
+        return keys
+
+    def _render(self):
+        self._render_job = None
+        if self.plot is None or not self.winfo_exists(): return
+        if self.origin is None: self.origin = (-(self.canvas.winfo_width() // 2), -(self.canvas.winfo_height() // 2))
+        deadline = time.perf_counter() + PLOT_FRAME_BUDGET
+        visible = self._visible()
+        wanted = set(visible)
+        for key in [key for key in self._items if key not in wanted]: self.canvas.delete(*self._items.pop(key)[0])
+        # Every visible tile at least sketched before any is refined
+        for refine in (False, True):
+            for key in visible:
+                tile = self._tiles.get(key)
+                if tile is not None and (tile[1] or not refine):
+                    if key not in self._items: self._place(key, tile[0]); self._tiles.move_to_end(key)
+                    continue
+                if time.perf_counter() > deadline: self._schedule(); return
+                ops, final = self.plot.tile(*key, refine=refine)
+                rendered = _load_pillow()[2].PhotoImage(plotter.render_image(ops, self.plot.background)) if self.use_images else ops
+                self._tiles[key] = (rendered, final)
+                self._tiles.move_to_end(key)
+                if len(self._tiles) > PLOT_TILE_CACHE: self._tiles.popitem(last=False)
+                if key in self._items: self.canvas.delete(*self._items.pop(key)[0])
+                self._place(key, rendered)
+        self.canvas.tag_raise('legend')
+
+    def _place(self, key, rendered):
+        """Put a rendered tile on the canvas at its place in the current view. The entry in
+        _items keeps its image alive should the cache drop it while it is shown."""
+        _, column, row = key
+        x, y = column * plotter.TILE_SIZE - self.origin[0], row * plotter.TILE_SIZE - self.origin[1]
+        tag = 'tile%d_%d' % (column, row)
+        if self.use_images:
+            self._items[key] = ((self.canvas.create_image(x, y, image=rendered, anchor='nw', tags=('tile', tag)),), rendered)
+            return
+        items = []
+        for op in rendered:
+            if op[0] == 'line':
+                points = [value + (x if i % 2 == 0 else y) for i, value in enumerate(op[3])]
+                items.append(self.canvas.create_line(*points, fill=op[1], width=op[2], tags=('tile', tag)))
+            else: items.append(self.canvas.create_text(x + op[2][0], y + op[2][1], anchor='nw', text=op[3], fill=op[1], font=('Arial', 8), tags=('tile', tag)))
+        self._items[key] = (items, rendered)
+        self.canvas.tag_lower(tag)
+
+    def on_close(self):
+        if self._render_job is not None: self.after_cancel(self._render_job)
+        super().on_close()
+
+class TabbedCalculatorApp:
+    def __init__(self, master, root, state=None):
+        self.master = master # This is now the Toplevel window
+        self.root = root # This is the hidden main Tk() window
+        
+        self.master.overrideredirect(True)
+        
+        # We don't set the title on the hidden root, but on the visible window's label
+        try:
+            icon_path = resource_path("icon.ico")
+            # Set the icon on the hidden root, which controls the taskbar icon
+            self.root.iconbitmap(icon_path) 
+        except tk.TclError:
+            print("icon.ico not found, skipping icon.")
+
+        
+        master.geometry("480x600+200+200")
+        self.load_palette(current_theme)
+        self._drag_start_x, self._drag_start_y = 0, 0
+        self._is_fullscreen, self._is_resizing = False, False
+        self._resize_grip_size = 8
+        self.clock = animation.AnimationClock(master)       # drives every animation in this window
+        self.toaster = Toaster(master, self.clock)
+        self.debug_overlay = DebugOverlay(self)
+        self.history_window = None
+        history_store.listeners.append(self._on_history_entry)
+        self._sidebar_close_job = None
+        self._worker_poll_job = None
+        self.sidebar_visible = False
+        self.settings_window = None
+        self.keybind_window = None
+        self.unit_converter_window = None
+        self.table_window = None
+        self.plot_window = None
+        self.closed_tabs = deque(maxlen=CLOSED_TABS_DEPTH)     # TabModel snapshots, newest last
+        
+        # --- State variables for tab cycling ---
+        self.tab_preview_window = None
+        self.preview_index = 0
+        self.is_ctrl_pressed = False
+        
+        self.keybinds = {
+            "Add Tab": ("<Control-t>", self.add_tab), 
+            "Close Tab": ("<Control-w>", self.close_tab),
+            "New Window": ("<Control-n>", open_new_instance),
+            "Reopen Tab": ("<Control-Shift-T>", self.reopen_closed_tab),
+            "Rename Tab": ("<Control-r>", self.rename_current_tab),
+            "Undo": ("<Control-z>", self.undo),
+            "Toggle Controls": ("<Control-q>", self.toggle_control_frame), 
+            "Toggle Title Bar": ("<Control-s>", self.toggle_title_bar),
+            "Show History": ("<Control-h>", self.show_history_window), 
+            "Show Settings": ("<F2>", self.show_settings_window),
+            "Show Help": ("<F1>", self.show_help_window),
+            "Debug Overlay": ("<Control-Shift-D>", self.toggle_debug_overlay),
+            "Save Trace": ("<Control-Shift-P>", self.save_trace),
+            "Function Table": ("<Control-Shift-F>", self.show_table_window),
+            "Plot": ("<Control-Shift-G>", self.show_plot_window),
+        }
+        self.container = tk.Frame(master, bg=self.dark_bg)
+        self.container.pack(fill='both', expand=True)
+        self.title_bar = tk.Frame(self.container, bg='#1e1e1e', height=30)
+        
+        # The close button now destroys the hidden root to exit the app
+        close_button = self.create_title_bar_button('✕', self.close_window, hover_color='#ff4444')
+        close_button.pack(side='right', padx=5, pady=2)
+
+        self.fullscreen_canvas = tk.Canvas(self.title_bar, width=20, height=20, bg='#1e1e1e', bd=0, highlightthickness=0)
+        self.fullscreen_canvas.create_rectangle(5, 5, 15, 15, outline='white', width=1)
+        self.fullscreen_canvas.pack(side='right', padx=5, pady=5)
+        self.fullscreen_canvas.bind("<Button-1>", self.toggle_fullscreen)
+        
+        # The minimize button now controls the hidden root window
+        self.minimize_canvas = tk.Canvas(self.title_bar, width=20, height=20, bg='#1e1e1e', bd=0, highlightthickness=0)
+        self.minimize_canvas.create_line(5, 10, 15, 10, fill='white', width=1)
+        self.minimize_canvas.pack(side='right', padx=5, pady=5)
+        self.minimize_canvas.bind("<Button-1>", self.minimize_window)
+        
+        self.title_label = tk.Label(self.title_bar, text="Zenth", bg='#1e1e1e', fg='white')
+        self.title_label.pack(side='left', padx=10)
+        self.title_bar.bind("<ButtonPress-1>", self.start_move)
+        self.title_bar.bind("<B1-Motion>", self.do_move)
+        self.title_label.bind("<ButtonPress-1>", self.start_move)
+        self.title_label.bind("<B1-Motion>", self.do_move)
+        self.fullscreen_canvas.bind("<Enter>", lambda e: e.widget.config(bg='#505050'))
+        self.fullscreen_canvas.bind("<Leave>", lambda e: e.widget.config(bg='#1e1e1e'))
+        self.minimize_canvas.bind("<Enter>", lambda e: e.widget.config(bg='#505050'))
+        self.minimize_canvas.bind("<Leave>", lambda e: e.widget.config(bg='#1e1e1e'))
+        self.main_frame = tk.Frame(self.container, bg=self.dark_bg)
+        self.main_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        profiling.startup.mark('title bar')
+        self.configure_styles()
+        profiling.startup.mark('styles')
+        top_container = tk.Frame(self.main_frame, bg=self.dark_bg)
+        top_container.pack(fill='both', expand=True)
+        top_container.grid_rowconfigure(1, weight=1)
+        top_container.grid_columnconfigure(1, weight=1)
+        self.menu_button = tk.Canvas(top_container, width=30, height=30, bg=self.dark_bg, bd=0, highlightthickness=0, cursor="hand2")
+        self.menu_button.create_line(8, 10, 22, 10, fill='white', width=2)
+        self.menu_button.create_line(8, 15, 22, 15, fill='white', width=2)
+        self.menu_button.create_line(8, 20, 22, 20, fill='white', width=2)
+        self.menu_button.grid(row=0, column=0, sticky='nw', pady=0, padx=(0, 5))
+        self.menu_button.bind("<Button-1>", self.toggle_sidebar)
+        self.menu_button.bind("<Enter>", lambda e: e.widget.config(bg=self.active_bg))
+        self.menu_button.bind("<Leave>", lambda e: e.widget.config(bg=self.dark_bg))
+        
+        # The notebook only carries the tab labels (over empty pages); one shared
+        # panel below it shows the selected tab's TabModel
+        self.notebook = ttk.Notebook(top_container, style='Dark.TNotebook')
+        self.notebook.grid(row=0, column=1, sticky='new')
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self.models = {}
+        self.calculator = CalculatorPanel(top_container, self)
+        self.calculator.grid(row=1, column=0, columnspan=2, sticky='nsew')
+        
+        # Hidden until asked for: built on first use, or at idle after the first paint
+        self.control_frame = None
+        self.sidebar = None
+        profiling.startup.mark('window chrome')
+
+        if state: self.restore_state(state)
+        else: self.add_tab()
+        profiling.startup.mark('first tab')
+        self.apply_keybinds()
+        
+        self.master.bind('<Motion>', self.on_mouse_motion)
+        self.master.bind('<ButtonPress-1>', self.start_resize)
+        self.master.bind('<B1-Motion>', self.do_resize)
+        self.master.bind('<ButtonRelease-1>', lambda e: setattr(self, '_is_resizing', False))
+        
+        # --- Bind events directly to this specific window ---
+        self.master.bind("<KeyPress-Control_L>", self.on_ctrl_press)
+        self.master.bind("<KeyRelease-Control_L>", self.on_ctrl_release)
+        self.master.bind("<Control-Tab>", self.cycle_tabs)
+        self.master.bind("<Configure>", lambda e: e.widget is self.master and session_keeper.changed(), add='+')
+        self._deferred_scheduled = False
+        self.master.bind("<Expose>", self._on_first_expose, add='+')
+
+    def _on_first_expose(self, event):
+        if self._deferred_scheduled: return
+        self._deferred_scheduled = True
+        # Queued behind the redraws this Expose triggered, so it runs once the window is painted
+        self.master.after_idle(self._build_deferred)
+
+    def _build_deferred(self):
+        profiling.startup.mark('first paint')
+        if self.sidebar is None: self._build_sidebar()
+        profiling.startup.mark('sidebar (idle)')
+        history_store.open()
+        profiling.startup.mark('history (idle)')
+        profiling.startup.report()
+
+    def _build_control_frame(self):
+        self.control_frame = tk.Frame(self.main_frame, bg=self.dark_bg)
+        self.add_tab_btn = tk.Button(self.control_frame, text="+ Add Tab", command=self.add_tab, bg='#4CAF50', fg='white', relief='flat', font=('Arial', 10, 'bold'))
+        self.add_tab_btn.pack(side='left', padx=5)
+        self.close_tab_btn = tk.Button(self.control_frame, text="- Close Tab", command=self.close_tab, bg='#ff4444', fg='white', relief='flat', font=('Arial', 10, 'bold'))
+        self.close_tab_btn.pack(side='left', padx=5)
+
+    def _build_sidebar(self):
+        self.sidebar = tk.Frame(self.master, bg='#1e1e1e')
+        
+        top_frame = tk.Frame(self.sidebar, bg='#1e1e1e')
+        top_frame.pack(fill='both', expand=True)
+        
+        bottom_frame = tk.Frame(self.sidebar, bg='#1e1e1e')
+        bottom_frame.pack(fill='x', side='bottom')
+
+        self.plot_btn = RoundedButton(bottom_frame, text="Plot", command=self.show_plot_window, bg='#3d3d3d', hover_bg='#505050', height=30)
+        self.plot_btn.pack(fill='x', padx=10, pady=5)
+        self.table_btn = RoundedButton(bottom_frame, text="Function Table", command=self.show_table_window, bg='#3d3d3d', hover_bg='#505050', height=30)
+        self.table_btn.pack(fill='x', padx=10, pady=5)
+        self.converter_btn = RoundedButton(bottom_frame, text="Unit Converter", command=self.show_unit_converter_window, bg='#3d3d3d', hover_bg='#505050', height=30)
+        self.converter_btn.pack(fill='x', padx=10, pady=5)
+        self.history_btn = RoundedButton(bottom_frame, text="History", command=self.show_history_window, bg='#3d3d3d', hover_bg='#505050', height=30)
+        self.history_btn.pack(fill='x', padx=10, pady=5)
+        self.settings_btn = RoundedButton(bottom_frame, text="Settings", command=self.show_settings_window, bg='#3d3d3d', hover_bg='#505050', height=30)
+        self.settings_btn.pack(fill='x', padx=10, pady=5)
+        self.help_btn = RoundedButton(bottom_frame, text="Help", command=self.show_help_window, bg='#3d3d3d', hover_bg='#505050', height=30)
+        self.help_btn.pack(fill='x', padx=10, pady=(5, 10))
+        
+        self.sidebar.bind("<Enter>", self.cancel_sidebar_close)
+        self.sidebar.bind("<Leave>", self.schedule_sidebar_close)
+
+    def close_window(self):
+        """This function now destroys the hidden root, which closes the entire application."""
+        if profiling.TRACE_FLAG in sys.argv: self.save_trace()
+        session_keeper.close()
+        evaluation_worker.shutdown()
+        history_store.close()
+        self.root.destroy()
+
+    def minimize_window(self, event=None):
+        """This function now hides the main window and iconifies the hidden root."""
+        self.master.withdraw()
+        self.root.iconify()
+
+    def set_dark_theme(self): self.apply_theme('dark')
+    def set_light_theme(self): self.apply_theme('light')
+
+    def apply_theme(self, name):
+        """Switch every window to a palette. Tabs are styled through shared ttk styles,
+        so the cost is a fixed number of style updates however many tabs are open."""
+        global current_theme
+        current_theme = name
+        apps = running_apps if self in running_apps else running_apps + [self]
+        for app in apps:
+            app.load_palette(name)
+            app.update_window_colors()
+        self.configure_styles()
+        session_keeper.changed()
+
+    def load_palette(self, name):
+        for key, value in THEMES[name].items(): setattr(self, key, value)
+
+    def update_window_colors(self):
+        """Recolour the few plain Tk widgets owned by the window itself."""
+        if not hasattr(self, 'container'): return
+        self.master.config(bg=self.dark_bg)
+        self.container.config(bg=self.dark_bg)
+        self.main_frame.config(bg=self.dark_bg)
+        if self.control_frame: self.control_frame.config(bg=self.dark_bg)
+        self.menu_button.config(bg=self.dark_bg)
+
+    def submit_job(self, func, *args, callback=None):
+        if profiling.tracer.enabled: callback = profiling.tracer.job_callback(callback)
+        job = evaluation_worker.submit(func, *args, callback=callback)
+        if self._worker_poll_job is None: self._worker_poll_job = self.master.after(WORKER_POLL_INTERVAL, self._poll_worker)
+        return job
+    def _poll_worker(self):
+        self._worker_poll_job = None
+        try: evaluation_worker.poll()
+        finally:
+            if evaluation_worker.pending: self._worker_poll_job = self.master.after(WORKER_POLL_INTERVAL, self._poll_worker)
+
+    def add_to_history(self, expression, result, tab='', duration=None):
+        history_store.add(expression, result, tab, duration)
+    def clear_history(self):
+        history_store.clear()
+        self.show_notification("History cleared")
+    def _on_history_entry(self, entry):
+        # The store is shared by all windows, so every open history view follows it
+        if not (self.history_window and self.history_window.winfo_exists()): return
+        if entry is None: self.history_view.refresh()
+        else: self.history_view.entry_added()
+    def load_history_entry(self, entry):
+        if self.current_tab(): self.calculator.load_expression(entry.expression)
+        self.history_window.on_close()
+    def export_history(self):
+        path = filedialog.asksaveasfilename(parent=self.history_window, defaultextension='.csv', filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+        if not path: return
+        try: self.show_notification(f"Exported {history_store.export_file(path, self.history_view.query):,} entries")
+        except OSError: self.show_notification("Export failed")
+    def import_history(self):
+        path = filedialog.askopenfilename(parent=self.history_window, filetypes=[("History files", "*.csv *.jsonl"), ("All files", "*.*")])
+        if not path: return
+        history_store.import_file(path)
+        def wait_for_import():
+            if history_store.busy: self.master.after(200, wait_for_import)
+            elif self.history_window and self.history_window.winfo_exists(): self.history_view.refresh()
+        wait_for_import()
+    def show_history_window(self, event=None):
+        if self.history_window and self.history_window.winfo_exists(): self.history_window.lift(); return
+        self.history_window = CustomToplevel(self.master, "Calculation History"); self.history_window.geometry("300x400")
+        content = self.history_window.main_content_frame
+        filter_var = tk.StringVar()
+        filter_entry = tk.Entry(content, textvariable=filter_var, bg=self.entry_bg, fg=self.entry_fg, insertbackground=self.entry_fg, relief='flat', font=('Arial', 11)); filter_entry.pack(fill='x', padx=5, pady=(5, 0))
+        self.history_view = HistoryView(content, history_store, self.load_history_entry, self.theme()); self.history_view.pack(fill='both', expand=True, padx=5, pady=5)
+        filter_var.trace_add('write', lambda *args: self.history_view.set_query(filter_var.get()))
+        filter_entry.focus_set()
+        button_frame = tk.Frame(content, bg=self.dark_bg); button_frame.pack(fill='x', padx=5, pady=(0, 5))
+        for column, (text, command) in enumerate((("Export", self.export_history), ("Import", self.import_history))):
+            button_frame.grid_columnconfigure(column, weight=1)
+            RoundedButton(button_frame, text=text, command=command, bg=self.button_bg, hover_bg=self.active_bg, height=30).grid(row=0, column=column, sticky='ew', padx=(0, 5) if column == 0 else 0)
+        clear_btn = RoundedButton(content, text="Clear History", command=self.clear_history, bg=self.clear_button_bg, hover_bg='#ff6666', height=30); clear_btn.pack(fill='x', padx=5, pady=(0, 5))
+
+    def show_settings_window(self, event=None):
+        if self.settings_window and self.settings_window.winfo_exists(): self.settings_window.lift(); return
+        self.settings_window = CustomToplevel(self.master, "Settings"); self.settings_window.geometry("350x850")
+        
+        content = self.settings_window.main_content_frame
+        theme_label = tk.Label(content, text="Theme", bg=self.dark_bg, fg=self.button_fg, font=('Arial', 12, 'bold')); theme_label.pack(pady=(10,5))
+        dark_btn = tk.Button(content, text="Dark Mode", command=self.set_dark_theme, bg=self.button_bg, fg=self.button_fg, relief='flat', font=('Arial', 10)); dark_btn.pack(fill='x', padx=20, pady=5)
+        light_btn = tk.Button(content, text="Light Mode", command=self.set_light_theme, bg=self.button_bg, fg=self.button_fg, relief='flat', font=('Arial', 10)); light_btn.pack(fill='x', padx=20, pady=5)
+        
+        ttk.Separator(content, orient='horizontal').pack(fill='x', padx=20, pady=10)
+        
+        current_tab = self.current_tab()
+        precision_label = tk.Label(content, text="Tab Precision", bg=self.dark_bg, fg=self.button_fg, font=('Arial', 12, 'bold')); precision_label.pack(pady=(10,5))
+        digits_frame = tk.Frame(content, bg=self.dark_bg); digits_frame.pack(fill='x', padx=20, pady=2)
+        tk.Label(digits_frame, text="Digits:", bg=self.dark_bg, fg=self.button_fg, width=15, anchor='w').pack(side='left')
+        digits_entry = tk.Entry(digits_frame, bg=self.entry_bg, fg=self.entry_fg, relief='flat', width=20); digits_entry.pack(side='left', fill='x', expand=True)
+        rounding_frame = tk.Frame(content, bg=self.dark_bg); rounding_frame.pack(fill='x', padx=20, pady=2)
+        tk.Label(rounding_frame, text="Rounding:", bg=self.dark_bg, fg=self.button_fg, width=15, anchor='w').pack(side='left')
+        rounding_var = tk.StringVar(value=current_tab.context.rounding if current_tab else decimal.ROUND_HALF_EVEN)
+        rounding_combo = ttk.Combobox(rounding_frame, textvariable=rounding_var, values=ROUNDING_MODES, state='readonly', width=18); rounding_combo.pack(side='left', fill='x', expand=True)
+        digits_entry.insert(0, str(current_tab.context.prec if current_tab else DEFAULT_PRECISION))
+        depth_frame = tk.Frame(content, bg=self.dark_bg); depth_frame.pack(fill='x', padx=20, pady=2)
+        tk.Label(depth_frame, text="Closed tabs kept:", bg=self.dark_bg, fg=self.button_fg, width=15, anchor='w').pack(side='left')
+        depth_entry = tk.Entry(depth_frame, bg=self.entry_bg, fg=self.entry_fg, relief='flat', width=20); depth_entry.pack(side='left', fill='x', expand=True)
+        depth_entry.insert(0, str(self.closed_tabs.maxlen))
+        wait_frame = tk.Frame(content, bg=self.dark_bg); wait_frame.pack(fill='x', padx=20, pady=2)
+        tk.Label(wait_frame, text="Max wait (s):", bg=self.dark_bg, fg=self.button_fg, width=15, anchor='w').pack(side='left')
+        wait_entry = tk.Entry(wait_frame, bg=self.entry_bg, fg=self.entry_fg, relief='flat', width=20); wait_entry.pack(side='left', fill='x', expand=True)
+        wait_entry.insert(0, f"{cost_limits.max_seconds:g}")
+
+        ttk.Separator(content, orient='horizontal').pack(fill='x', padx=20, pady=10)
+
+        keybind_label = tk.Label(content, text="Keybinds", bg=self.dark_bg, fg=self.button_fg, font=('Arial', 12, 'bold')); keybind_label.pack(pady=(10,5))
+        entries = {}
+        for action, (key, _) in self.keybinds.items():
+            frame = tk.Frame(content, bg=self.dark_bg); frame.pack(fill='x', padx=20, pady=2)
+            label = tk.Label(frame, text=f"{action}:", bg=self.dark_bg, fg=self.button_fg, width=15, anchor='w'); label.pack(side='left')
+            entry = tk.Entry(frame, bg=self.entry_bg, fg=self.entry_fg, relief='flat', width=20); entry.insert(0, key); entry.pack(side='left', fill='x', expand=True)
+            entries[action] = entry
+        
+        def save_settings():
+            try:
+                digits = int(digits_entry.get())
+                if not 1 <= digits <= MAX_PRECISION: raise ValueError
+            except ValueError:
+                self.show_notification(f"Precision must be 1 to {MAX_PRECISION:,} digits", 2000); return
+            try:
+                depth = int(depth_entry.get())
+                if depth < 0: raise ValueError
+            except ValueError:
+                self.show_notification("Closed tabs kept must be 0 or more", 2000); return
+            try:
+                wait = float(wait_entry.get())
+                if not wait > 0: raise ValueError
+            except ValueError:
+                self.show_notification("Max wait must be more than 0 seconds", 2000); return
+            if depth != self.closed_tabs.maxlen: self.closed_tabs = deque(self.closed_tabs, maxlen=depth)
+            # Calculations estimated to run longer are refused, and jobs time out after it
+            cost_limits.max_seconds = evaluation_worker.timeout = wait
+            if current_tab: self.calculator.set_precision(current_tab, digits, rounding_var.get())
+            self.unbind_all_keybinds()
+            for action, entry in entries.items():
+                new_key, command = entry.get(), self.keybinds[action][1]
+                self.keybinds[action] = (new_key, command)
+            self.apply_keybinds(); session_keeper.changed()
+            self.settings_window.destroy(); self.show_notification("Settings updated!")
+        
+        save_btn = tk.Button(content, text="Save Settings", command=save_settings, bg=self.equals_button_bg, fg='white', relief='flat'); save_btn.pack(pady=15)
+
+    def show_help_window(self, event=None):
+        help_win = CustomToplevel(self.master, "Keybinds Help")
+        for action, (key, _) in self.keybinds.items():
+            frame = tk.Frame(help_win.main_content_frame, bg=self.dark_bg)
+            frame.pack(fill='x', padx=10, pady=5)
+            action_label = tk.Label(frame, text=f"{action}:", bg=self.dark_bg, fg=self.button_fg, width=15, anchor='w')
+            action_label.pack(side='left')
+            key_label = tk.Label(frame, text=key, bg=self.entry_bg, fg=self.entry_fg, relief='flat', width=20)
+            key_label.pack(side='left', fill='x', expand=True)
+    
+    def show_unit_converter_window(self, event=None):
+        if self.unit_converter_window and self.unit_converter_window.winfo_exists():
+            self.unit_converter_window.lift()
+            return
+        self.unit_converter_window = UnitConverterWindow(self.master, self.theme())
+
+    def show_table_window(self, event=None):
+        if self.table_window and self.table_window.winfo_exists():
+            self.table_window.lift()
+            return
+        self.table_window = TableWindow(self.master, self)
+
+    def show_plot_window(self, event=None):
+        if self.plot_window and self.plot_window.winfo_exists():
+            self.plot_window.lift()
+            return
+        self.plot_window = PlotWindow(self.master, self)
+
+    def theme(self):
+        return {
+            'bg': self.dark_bg, 'fg': self.button_fg, 'entry_bg': self.entry_bg,
+            'entry_fg': self.entry_fg, 'button_bg': self.button_bg,
+            'equals_button_bg': self.equals_button_bg, 'active_bg': self.active_bg
+        }
+
+    def apply_keybinds(self):
+        root = self.master.winfo_toplevel()
+        for key, command in self.keybinds.values():
+            if key == "<Control-n>": 
+                self.root.bind_all(key, command)
+            else: 
+                self.master.bind(key, command)
+
+    def unbind_all_keybinds(self):
+        root = self.master.winfo_toplevel()
+        for key, _ in self.keybinds.values():
+            if key == "<Control-n>":
+                self.root.unbind_all(key)
+            else:
+                self.master.unbind(key)
+
+    def create_title_bar_button(self, text, command, hover_color='#505050'):
+        button = tk.Button(self.title_bar, text=text, bg='#1e1e1e', fg='white', relief='flat', command=command, font=('Arial', 12), activebackground=hover_color, activeforeground='white', borderwidth=0)
+        button.bind("<Enter>", lambda e, c=hover_color: e.widget.config(bg=c)); button.bind("<Leave>", lambda e: e.widget.config(bg='#1e1e1e')); return button
+    def start_move(self, event): self._drag_start_x, self._drag_start_y = event.x, event.y
+    def do_move(self, event): x, y = self.master.winfo_pointerx() - self._drag_start_x, self.master.winfo_pointery() - self._drag_start_y; self.master.geometry(f"+{x}+{y}")
+    def on_mouse_motion(self, event):
+        x, y, w, h, grip = event.x, event.y, self.master.winfo_width(), self.master.winfo_height(), self._resize_grip_size
+        if x > w - grip and y > h - grip: self.master.config(cursor="bottom_right_corner")
+        elif x > w - grip: self.master.config(cursor="sb_h_double_arrow")
+        elif y > h - grip: self.master.config(cursor="sb_v_double_arrow")
+        else: self.master.config(cursor="")
+    def start_resize(self, event):
+        cursor = self.master.cget("cursor")
+        if cursor != "" and cursor != "arrow": self._is_resizing = True
+    def do_resize(self, event):
+        if not self._is_resizing: return
+        w, h = self.master.winfo_width(), self.master.winfo_height()
+        dx, dy = event.x_root - self.master.winfo_rootx() - w, event.y_root - self.master.winfo_rooty() - h
+        cursor = self.master.cget("cursor")
+        if cursor == "sb_h_double_arrow": self.master.geometry(f"{w+dx}x{h}")
+        elif cursor == "sb_v_double_arrow": self.master.geometry(f"{w}x{h+dy}")
+        elif cursor == "bottom_right_corner": self.master.geometry(f"{w+dx}x{h+dy}")
+    def toggle_title_bar(self, event=None):
+        if self.title_bar.winfo_ismapped(): self.title_bar.pack_forget()
+        else: self.title_bar.pack(side='top', fill='x', before=self.main_frame)
+    
+    def toggle_fullscreen(self, event=None):
+        self._is_fullscreen = not self._is_fullscreen
+        self.master.attributes("-fullscreen", self._is_fullscreen)
+        
+    def toggle_control_frame(self, event=None):
+        if self.control_frame is None: self._build_control_frame()
+        if self.control_frame.winfo_ismapped(): self.control_frame.pack_forget()
+        else: self.control_frame.pack(side='bottom', pady=(5,0))
+    def schedule_sidebar_close(self, event=None):
+        if self.sidebar_visible: self._sidebar_close_job = self.master.after(1500, self.toggle_sidebar)
+    def cancel_sidebar_close(self, event=None):
+        if self._sidebar_close_job: self.master.after_cancel(self._sidebar_close_job); self._sidebar_close_job = None
+    def toggle_sidebar(self, event=None):
+        self.cancel_sidebar_close()
+        if self.sidebar is None: self._build_sidebar()
+        if not self.sidebar.winfo_ismapped(): self.sidebar.place(x=-SIDEBAR_WIDTH, y=0, relheight=1.0, width=SIDEBAR_WIDTH)
+        self.sidebar_visible = not self.sidebar_visible
+        self.animate_sidebar(direction='in' if self.sidebar_visible else 'out')
+    def animate_sidebar(self, direction='in'):
+        # Start from wherever the sidebar is, so reversing mid-slide does not jump
+        start_x = int(self.sidebar.place_info().get('x', -SIDEBAR_WIDTH))
+        end_x = 0 if direction == 'in' else -SIDEBAR_WIDTH
+        def move(fraction): self.sidebar.place(x=int(start_x + (end_x - start_x) * fraction), y=0, relheight=1.0, width=SIDEBAR_WIDTH)
+        self.clock.animate('sidebar', SIDEBAR_SLIDE, move, on_done=self.sidebar.place_forget if direction == 'out' else None)
+    def configure_styles(self):
+        style = ttk.Style()
+        if style.theme_use() != 'clam': style.theme_use('clam')
+        style.configure('Dark.TFrame', background=self.dark_bg)
+        style.configure('Dark.TNotebook', background=self.dark_bg, borderwidth=0, tabposition='ne')
+        style.configure('Dark.TNotebook.Tab', background=self.button_bg, foreground=self.button_fg, borderwidth=0, padding=[10, 5])
+        style.map('Dark.TNotebook.Tab', background=[('selected', self.active_bg), ('active', '#454545')], foreground=[('selected', self.button_fg)])
+        style.configure('Preview.TLabel', background=self.dark_bg, foreground='#888888', font=('Arial', 12))
+        style.configure('Display.TEntry', fieldbackground=self.entry_bg, foreground=self.entry_fg, insertcolor=self.entry_fg, borderwidth=0, relief='flat', padding=0,
+                        bordercolor=self.entry_bg, lightcolor=self.entry_bg, darkcolor=self.entry_bg)
+        # Calc.TButton is the keypad base style; the prefixed variants inherit from it
+        for name, bg in (('Calc.TButton', self.button_bg), ('Special.Calc.TButton', self.special_button_bg), ('Equals.Calc.TButton', self.equals_button_bg),
+                         ('Clear.Calc.TButton', self.clear_button_bg), ('Copy.Calc.TButton', self.copy_button_bg)):
+            style.configure(name, background=bg, bordercolor=bg, lightcolor=bg, darkcolor=bg)
+            style.map(name, background=[('pressed', self.active_bg), ('active', self.active_bg)])
+        style.configure('Calc.TButton', foreground=self.button_fg, font=('Arial', 12, 'bold'), padding=10, borderwidth=0, relief='flat', focuscolor=self.button_bg)
+        style.configure('Copy.Calc.TButton', font=('Arial', 10, 'bold'), padding=(12, 5))
+    def current_tab(self):
+        """The TabModel of the selected tab, or None when no tab is open."""
+        if not self.notebook.tabs(): return None
+        return self.models[str(self.notebook.select())]
+    def _add_page(self, model):
+        page = ttk.Frame(self.notebook, style='Dark.TFrame')
+        self.models[str(page)] = model
+        self.notebook.add(page, text=model.name)
+        return page
+    def _add_model(self, model):
+        self.notebook.select(self._add_page(model))
+        session_keeper.tab_changed(model)
+        self._on_tab_changed()      # <<NotebookTabChanged>> only arrives through the event queue
+    def _on_tab_changed(self, event=None):
+        model = self.current_tab()
+        session_keeper.changed()
+        if model is None: self.calculator.grid_remove(); return
+        self.calculator.grid()
+        self.calculator.show(session_keeper.hydrate(model))
+    def restore_state(self, state):
+        """Recreate a saved window. Tabs only get their names here; the rest of each
+        tab is read from the session when it is first shown."""
+        try: self.master.geometry(state['geometry'])
+        except (KeyError, TypeError, tk.TclError): pass
+        for action, key in dict(state.get('keybinds') or {}).items():
+            if action in self.keybinds: self.keybinds[action] = (key, self.keybinds[action][1])
+        for key, name in state.get('tabs') or ():
+            model = TabModel(name, key=key)
+            model.stored = True
+            self._add_page(model)
+        tabs = self.notebook.tabs()
+        if not tabs: self.add_tab(); return
+        selected = state.get('selected')
+        self.notebook.select(tabs[selected if isinstance(selected, int) and 0 <= selected < len(tabs) else 0])
+        self._on_tab_changed()
+    def session_state(self):
+        """This window's part of the session manifest."""
+        pages = self.notebook.tabs()
+        return {'geometry': self.master.geometry(),
+                'keybinds': {action: key for action, (key, _) in self.keybinds.items()},
+                'tabs': [[model.key, model.name] for model in (self.models[str(page)] for page in pages)],
+                'selected': self.notebook.index('current') if pages else 0}
+    def add_tab(self, event=None):
+        self._add_model(TabModel(f'Calc {len(self.notebook.tabs()) + 1}'))
+    def close_tab(self, event=None):
+        if not self.notebook.tabs(): return
+        page = str(self.notebook.select())
+        model = session_keeper.hydrate(self.models.pop(page))
+        self.calculator.cancel_job(model)
+        recalculator.remove(model.key)
+        self.closed_tabs.append(model.snapshot())
+        session_keeper.tab_closed(model)
+        self.notebook.forget(page)
+        self.master.nametowidget(page).destroy()
+        self._on_tab_changed()
+    
+    def reopen_closed_tab(self, event=None):
+        if not self.closed_tabs:
+            self.show_notification("No tabs to reopen")
+            return
+        model = TabModel.from_snapshot(self.closed_tabs.pop())
+        self._add_model(model)
+        recalculator.restore(model)
+        self.show_notification("Tab reopened")
+    def undo(self, event=None):
+        if self.current_tab(): self.calculator.undo()
+        return "break"
+
+    def on_ctrl_press(self, event):
+        self.is_ctrl_pressed = True
+        try:
+            self.preview_index = self.notebook.index('current')
+        except tk.TclError:
+            self.is_ctrl_pressed = False
+
+    def on_ctrl_release(self, event):
+        self.is_ctrl_pressed = False
+        if self.tab_preview_window and self.tab_preview_window.winfo_exists():
+            self.notebook.select(self.preview_index)
+            self.tab_preview_window.destroy()
+            self.tab_preview_window = None
+
+    def cycle_tabs(self, event):
+        if not self.is_ctrl_pressed or len(self.notebook.tabs()) < 2:
+            return "break"
+
+        if not self.tab_preview_window or not self.tab_preview_window.winfo_exists():
+            self.show_tab_preview()
+        
+        num_tabs = len(self.notebook.tabs())
+        self.preview_index = (self.preview_index + 1) % num_tabs
+        
+        self.update_tab_preview()
+        return "break"
+
+    def show_tab_preview(self):
+        self.tab_preview_window = tk.Toplevel(self.master)
+        self.tab_preview_window.overrideredirect(True)
+        self.tab_preview_window.attributes('-alpha', 0.9)
+        self.tab_preview_window.attributes('-topmost', True)
+
+        self.preview_label = tk.Label(self.tab_preview_window, text="", bg=self.entry_bg, fg=self.entry_fg, font=('Arial', 14), padx=20, pady=10)
+        self.preview_label.pack()
+        self.update_tab_preview()
+
+    def update_tab_preview(self):
+        if self.tab_preview_window and self.tab_preview_window.winfo_exists():
+            model = session_keeper.hydrate(self.models[str(self.notebook.tabs()[self.preview_index])])
+            result_preview = bignum.abbreviate(model.expression) or "0"
+            preview_text = f"{model.name}: {result_preview}"
+            self.preview_label.config(text=preview_text)
+            
+            self.tab_preview_window.update_idletasks()
+            x = self.master.winfo_x() + (self.master.winfo_width() // 2) - (self.tab_preview_window.winfo_width() // 2)
+            y = self.master.winfo_y() + (self.master.winfo_height() // 2) - (self.tab_preview_window.winfo_height() // 2)
+            self.tab_preview_window.geometry(f"+{x}+{y}")
+
+    def rename_current_tab(self, event=None):
+        if not self.notebook.tabs(): return
+        current_tab_id = self.notebook.select(); current_name = self.notebook.tab(current_tab_id, "text")
+        dialog = CustomRenameDialog(self.master, "Rename Tab", initialvalue=current_name); new_name = dialog.result
+        if new_name and new_name.strip():
+            self.models[str(current_tab_id)].name = new_name.strip()
+            shared_cells.rename(self.models[str(current_tab_id)].key, new_name.strip())
+            self.notebook.tab(current_tab_id, text=new_name.strip())
+            session_keeper.changed()
+    def show_notification(self, message, duration=1200): self.toaster.show(message, duration)
+
+    def toggle_debug_overlay(self, event=None): self.debug_overlay.toggle()
+
+    def save_trace(self, event=None):
+        """Write what the tracer has recorded to a JSON trace file in the data directory."""
+        if not profiling.tracer.events: self.show_notification("Nothing traced yet; open the debug overlay first", 2000); return
+        path = os.path.join(appdata.data_dir('traces'), time.strftime('trace-%Y%m%d-%H%M%S.json'))
+        try: self.show_notification(f"Trace saved to {profiling.tracer.dump(path)}", 3000)
+        except OSError as exc: self.show_notification(f"Could not save the trace: {exc}", 3000)
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    # This is the hidden parent window that handles the taskbar icon
+    root = tk.Tk()
+    root.title("Zenth") # The title for the taskbar
+    profiling.startup.mark('tk root')
+    if profiling.TRACE_FLAG in sys.argv: profiling.tracer.enable(root)
+    
+    # Reopen the windows of the last session, or start with one fresh window
+    manifest = session_keeper.store.load()
+    if manifest and manifest.get('theme') in THEMES: current_theme = manifest['theme']
+    for state in (manifest or {}).get('windows') or [None]:
+        running_apps.append(TabbedCalculatorApp(tk.Toplevel(root), root, state))
+    # This is the visible, custom-framed calculator window
+    app_window = running_apps[0].master
+    # Tabs shown so far may use variables from tabs in windows created after them
+    if recalculator.waiting: session_keeper.hydrate_all()
+    recalculator.run()
+    session_keeper.changed()
+
+    # This function shows the calculator window when the taskbar icon is clicked
+    def on_map(event):
+        # When the hidden root is restored, show the main app window
+        app_window.deiconify()
+    
+    # Hide the hidden window itself, but keep it running for the taskbar icon
+    root.withdraw()
+    root.bind("<Map>", on_map)
+    # Start the evaluation processes once the window is up so the first "=" is quick
+    root.after(500, evaluation_worker.warm_up)
+    
+    root.mainloop()
+
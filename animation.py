@@ -0,0 +1,64 @@
+"""A frame clock for Zenth's window animations (toasts, the sidebar).
+
+Each window has one AnimationClock. Every running tween is advanced from the
+same `after()` timer. Progress comes from elapsed time, not frame count, so
+when the event loop falls behind, frames are skipped instead of queued and
+an animation still ends on time. With nothing animating, no timer is pending.
+"""
+import time
+import tkinter as tk
+
+FRAME_INTERVAL = 16         # ms between frames, about 60 per second
+
+
+def ease_out_cubic(t): return 1 - (1 - t) ** 3
+def ease_in_cubic(t): return t ** 3
+
+
+class _Tween:
+    __slots__ = ('duration', 'apply', 'easing', 'on_done', 'started')
+
+    def __init__(self, duration, apply, easing, on_done, started):
+        self.duration, self.apply, self.easing, self.on_done, self.started = duration, apply, easing, on_done, started
+
+
+class AnimationClock:
+    """Runs named tweens for one window from a single timer."""
+    def __init__(self, widget, interval=FRAME_INTERVAL):
+        self.widget = widget
+        self.interval = interval
+        self._tweens = {}
+        self._job = None
+
+    @property
+    def active(self): return bool(self._tweens)
+
+    def animate(self, key, duration, apply, easing=ease_out_cubic, on_done=None):
+        """Start the tween `key`, replacing one already running under that name.
+        `apply(fraction)` is called each frame with the eased progress from 0 to 1,
+        and `on_done()` after the last frame."""
+        self._tweens[key] = _Tween(duration / 1000, apply, easing, on_done, time.perf_counter())
+        if self._job is None: self._job = self.widget.after_idle(self._tick)
+
+    def cancel(self, key):
+        self._tweens.pop(key, None)
+        if not self._tweens and self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    def _tick(self):
+        self._job = None
+        now = time.perf_counter()
+        for key, tween in list(self._tweens.items()):
+            if self._tweens.get(key) is not tween: continue     # replaced by an earlier callback
+            progress = min(1.0, (now - tween.started) / tween.duration) if tween.duration > 0 else 1.0
+            try:
+                tween.apply(tween.easing(progress))
+                if progress < 1.0: continue
+                del self._tweens[key]
+                if tween.on_done: tween.on_done()
+            except tk.TclError: self._tweens.pop(key, None)     # its widget was destroyed
+        if self._tweens and self._job is None:
+            # Aim for the next frame boundary; a late tick is not made up for
+            spent = int((time.perf_counter() - now) * 1000)
+            self._job = self.widget.after(max(1, self.interval - spent), self._tick)
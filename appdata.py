@@ -0,0 +1,23 @@
+"""Location of Zenth's on-disk data (caches, history, sessions)."""
+import os
+
+ENV_VAR = 'ZENTH_DATA_DIR'
+
+
+def data_dir(*parts):
+    """Path inside the data directory ($ZENTH_DATA_DIR or ~/.zenth), created on demand."""
+    base = os.environ.get(ENV_VAR) or os.path.join(os.path.expanduser('~'), '.zenth')
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def atomic_write(path, data):
+    """Write bytes or text to path via a temporary file so readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    mode, encoding = ('wb', None) if isinstance(data, bytes) else ('w', 'utf-8')
+    with open(tmp_path, mode, encoding=encoding) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
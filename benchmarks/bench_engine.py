@@ -0,0 +1,70 @@
+"""Compare the compiled engine against the old regex-rewrite + eval path.
+
+Run from the repository root:  python benchmarks/bench_engine.py [count]
+"""
+import decimal
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import constants
+import engine
+
+# The old path substituted str(pi) textually; use the same digits so results compare equal
+PI = constants.pi(100)
+
+
+def legacy_evaluate(expression):
+    """The original CalculatorTab.calculate_result evaluation path."""
+    expression = expression.replace(',', '')
+    clean_expression = expression.replace('^', '**').replace('%', '/100')
+    clean_expression = clean_expression.replace('π', str(PI))
+    transformed_expression = re.sub(r'(\d+(\.\d*)?|\.\d+)', r"decimal.Decimal('\1')", clean_expression)
+    return eval(transformed_expression, {"__builtins__": None}, {"decimal": decimal})
+
+
+def random_expression(rng, depth=0):
+    if depth > 3 or rng.random() < 0.3:
+        choice = rng.random()
+        if choice < 0.1: return 'π'
+        if choice < 0.5: return str(rng.randint(1, 10_000))
+        return f"{rng.randint(0, 999)}.{rng.randint(0, 999)}"
+    op = rng.choice('+-*/')
+    left, right = random_expression(rng, depth + 1), random_expression(rng, depth + 1)
+    if rng.random() < 0.2: return f"({left}){op}{right}"
+    if rng.random() < 0.1: return f"{left}^{rng.randint(2, 5)}"
+    return f"{left}{op}{right}"
+
+
+def timed(fn, expressions):
+    start = time.perf_counter()
+    results = []
+    for text in expressions:
+        try: results.append(fn(text))
+        except (ArithmeticError, ValueError): results.append(None)
+    return time.perf_counter() - start, results
+
+
+def main(count=5000):
+    decimal.getcontext().prec = 100
+    rng = random.Random(1234)
+    unique = [random_expression(rng) for _ in range(count)]
+    # A calculator session re-evaluates a small working set of expressions
+    working_set = unique[:max(1, count // 20)]
+    repeated = [rng.choice(working_set) for _ in range(count)]
+
+    for label, expressions in (("unique", unique), ("repeated", repeated)):
+        engine._cache.clear()
+        legacy_time, legacy_results = timed(legacy_evaluate, expressions)
+        engine_time, engine_results = timed(engine.evaluate, expressions)
+        mismatches = sum(1 for a, b in zip(legacy_results, engine_results) if a != b)
+        print(f"{label:>8}: {len(expressions)} expressions  legacy {legacy_time*1000:8.1f} ms  "
+              f"engine {engine_time*1000:8.1f} ms  speedup {legacy_time/engine_time:5.1f}x  "
+              f"mismatches {mismatches}  cache hits {engine._cache.hits}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,87 @@
+"""Compare the exact integer path of engine against the Decimal-only path.
+
+Run from the repository root:  python benchmarks/bench_exact.py [rounds]
+Each expression is checked against Python int arithmetic. The exact path must
+match every digit; the Decimal path rounds at the working precision, so its
+results are only counted as exact or rounded.
+"""
+import decimal
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import engine
+
+PRECISION = 100
+
+
+def random_expression(rng, depth):
+    """(text, int value) of a random integer expression using + - * and ^."""
+    if depth == 0 or rng.random() < 0.2:
+        n = rng.randrange(1, 10 ** rng.randrange(1, 30))
+        return str(n), n
+    op = rng.choice('+-*^')
+    if op == '^':
+        base, value = random_expression(rng, depth - 1)
+        exponent = rng.randrange(2, 40)
+        return f"({base})^{exponent}", value ** exponent
+    (left, a), (right, b) = random_expression(rng, depth - 1), random_expression(rng, depth - 1)
+    value = a + b if op == '+' else a - b if op == '-' else a * b
+    return f"({left}){op}({right})", value
+
+
+CASES = [
+    ("2^400", 2 ** 400),
+    ("3^2000", 3 ** 2000),
+    ("2^64 - 1", 2 ** 64 - 1),
+    ("123456789123456789 * 987654321987654321", 123456789123456789 * 987654321987654321),
+    ("(10^50 + 1) * (10^50 - 1)", (10 ** 50 + 1) * (10 ** 50 - 1)),
+    ("2*3*4*5*6*7*8*9*10*11*12*13*14*15*16*17*18*19*20*21*22*23*24*25", 2 * 3 * 4 * 5 * 6 * 7 * 8 * 9 * 10 * 11 * 12 * 13 * 14 * 15 * 16 * 17 * 18 * 19 * 20 * 21 * 22 * 23 * 24 * 25),
+    ("7^7^3", 7 ** 7 ** 3),
+    ("1 + 2 + 3 + 4 + 5", 15),
+]
+
+
+def evaluate(text, exact):
+    engine.EXACT_INTEGERS = exact
+    engine._cache.clear()
+    context = decimal.Context(prec=PRECISION)
+    start = time.perf_counter()
+    value = engine.compile_expression(text).evaluate_stable(context)
+    return time.perf_counter() - start, value
+
+
+def timed_repeat(text, exact, rounds):
+    engine.EXACT_INTEGERS = exact
+    engine._cache.clear()
+    context = decimal.Context(prec=PRECISION)
+    expression = engine.compile_expression(text)
+    start = time.perf_counter()
+    for _ in range(rounds): expression.evaluate_stable(context)
+    return (time.perf_counter() - start) / rounds
+
+
+def main(rounds=200):
+    rng = random.Random(2026)
+    cases = CASES + [random_expression(rng, 4) for _ in range(200)]
+    exact_wrong = decimal_rounded = 0
+    for text, expected in cases:
+        _, exact = evaluate(text, True)
+        _, legacy = evaluate(text, False)
+        if exact != expected: exact_wrong += 1; print(f"MISMATCH {text}: {exact} != {expected}")
+        if not (legacy.is_finite() and legacy == expected): decimal_rounded += 1
+    print(f"{len(cases)} expressions: exact path wrong {exact_wrong}, Decimal path rounded {decimal_rounded}")
+
+    for text, _ in CASES:
+        legacy_time = timed_repeat(text, False, rounds)
+        exact_time = timed_repeat(text, True, rounds)
+        print(f"{text[:40]:40}  decimal {legacy_time * 1e6:9.1f} us  exact {exact_time * 1e6:9.1f} us  "
+              f"speedup {legacy_time / exact_time:6.2f}x", flush=True)
+    engine.EXACT_INTEGERS = True
+    assert exact_wrong == 0
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
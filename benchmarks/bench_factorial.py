@@ -0,0 +1,43 @@
+"""Compare factorial.factorial against the old x! loop for n = 10^3 .. 10^6.
+
+Run from the repository root:  python benchmarks/bench_factorial.py [max_exponent]
+The old loop is quadratic; at n = 10^6 it takes several minutes.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import factorial
+
+
+def legacy_factorial(num):
+    """The original x! loop from CalculatorTab.on_button_click."""
+    res = 1
+    for i in range(2, num + 1):
+        res *= i
+    return res
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main(max_exponent=6):
+    for exponent in range(3, max_exponent + 1):
+        n = 10 ** exponent
+        factorial._cache.clear()
+        cold_time, fast = timed(factorial.factorial, n)
+        warm_time, _ = timed(factorial.factorial, n)
+        resume_time, _ = timed(factorial.factorial, n + n // 10)
+        legacy_time, slow = timed(legacy_factorial, n)
+        assert fast == slow
+        print(f"n = 10^{exponent}: legacy {legacy_time:9.3f} s  engine {cold_time:8.3f} s  "
+              f"speedup {legacy_time / cold_time:7.1f}x  cached {warm_time*1e6:6.1f} us  "
+              f"resume to 1.1n {resume_time:7.3f} s", flush=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
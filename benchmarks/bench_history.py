@@ -0,0 +1,60 @@
+"""Cost of filtering a large history, as the history view does on each keystroke.
+
+Run from the repository root:  python benchmarks/bench_history.py [rows]
+Fills a temporary store with `rows` entries (default 100000), then times the
+count and first page the view fetches for queries of each length (budget: 16 ms).
+One- and two-character queries are shorter than a trigram and scan the table,
+which is why the view only filters from HISTORY_MIN_QUERY characters.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import history
+
+FRAME_MS = 16.0
+ROWS = 100000
+PAGE = 100
+QUERIES = ['', '7', '+3', '2^1', '12*4', 'no such thing']
+
+
+def fill(store, rows):
+    rng = random.Random(1)
+    for _ in range(rows):
+        a, b = rng.randrange(10 ** 6), rng.randrange(1, 10 ** 4)
+        op = rng.choice('+-*/^')
+        store.add(f"{a}{op}{b}", str(rng.random() * 10 ** rng.randrange(30)))
+    store.flush()
+
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    with tempfile.TemporaryDirectory() as directory:
+        store = history.HistoryStore(os.path.join(directory, 'history.sqlite3'))
+        start = time.perf_counter()
+        fill(store, rows)
+        print(f"{rows:,} rows written in {time.perf_counter() - start:.1f} s  (full-text index: {store._fts or 'none'})")
+        for query in QUERIES:
+            total = store.count(query)
+            count_ms = best_of(lambda: store.count(query))
+            page_ms = best_of(lambda: store.page(0, PAGE, query))
+            worst = count_ms + page_ms
+            print(f"{query!r:>16}: {total:7,} matches  count {count_ms:7.2f} ms  first page {page_ms:7.2f} ms  "
+                  f"{'ok' if worst < FRAME_MS else 'OVER BUDGET'}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
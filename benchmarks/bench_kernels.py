@@ -0,0 +1,45 @@
+"""Time the Decimal kernels against decimal's own exp/ln/log10 at 50..5000 digits.
+
+Run from the repository root:  python benchmarks/bench_kernels.py [precisions...]
+sin/cos/tan have no Decimal counterpart; the old buttons used 16-digit floats.
+"""
+import decimal
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import kernels
+
+ARGUMENTS = [decimal.Decimal(v) for v in ('0.5', '1.75', '2', '12.345', '123.456789', '98765.4321')]
+
+
+def timed(fn, context):
+    start = time.perf_counter()
+    for x in ARGUMENTS: fn(x, context)
+    return (time.perf_counter() - start) / len(ARGUMENTS)
+
+
+def main(precisions=(50, 100, 500, 1000, 5000)):
+    for prec in precisions:
+        context = decimal.Context(prec=prec)
+        kernels._reduction_constants(prec + kernels._guard(prec))   # warm the π / ln 2 constants
+        print(f"--- {prec} digits (ms per call) ---")
+        for name, ours, reference in (
+                ('exp', kernels.exp, lambda x, c: c.exp(x)),
+                ('ln', kernels.ln, lambda x, c: c.ln(x)),
+                ('log10', kernels.log10, lambda x, c: c.log10(x)),
+                ('sin', kernels.sin, None), ('cos', kernels.cos, None),
+                ('tan', kernels.tan, None), ('atan', kernels.atan, None)):
+            kernels.clear_memo()
+            cold = timed(ours, context)
+            warm = timed(ours, context)
+            line = f"{name:>6}: kernels {cold*1000:9.3f}  memoized {warm*1000:7.4f}"
+            if reference:
+                ref = timed(reference, context)
+                line += f"  decimal {ref*1000:9.3f}  speedup {ref/cold:6.1f}x"
+            print(line, flush=True)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or (50, 100, 500, 1000, 5000))
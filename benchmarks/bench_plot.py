@@ -0,0 +1,56 @@
+"""Time plot tiles for a few typical functions against a 60 fps frame.
+
+Run from the repository root:  python benchmarks/bench_plot.py
+For a 560x480 view, every tile is sketched and then refined, as the plot
+window does after a zoom; then the view is panned by a tile, which only
+draws the tiles coming into view. Tile times are without Pillow's rasterizing
+unless Pillow is installed, in which case render_image is included.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import plotter
+
+FUNCTIONS = ("x^2", "x^3 - 2*x", "1/x", "1/(x^2 - 4)", "(x^2 - 1)^0.5", "2^x", "x^0.5*3 - 1/(x - 1)")
+WIDTH, HEIGHT = 560, 480
+FRAME = 1 / 60
+
+
+def tiles(left, top, level):
+    size = plotter.TILE_SIZE
+    return [(level, column, row) for column in range(left // size, (left + WIDTH) // size + 1)
+            for row in range(top // size, (top + HEIGHT) // size + 1)]
+
+
+def draw(plot, keys, refine, rasterize):
+    """Seconds per tile, drawing each of `keys`."""
+    times = []
+    for key in keys:
+        start = time.perf_counter()
+        ops, _ = plot.tile(*key, refine=refine)
+        if rasterize: plotter.render_image(ops, plot.background)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    rasterize = bool(plotter._load_pillow())
+    print(f"tiles {'with' if rasterize else 'without'} Pillow rasterizing; a frame is {FRAME * 1000:.1f} ms")
+    level = plotter.level_for(0.04)
+    left, top = -WIDTH // 2, -HEIGHT // 2
+    for text in FUNCTIONS:
+        plot = plotter.Plot([plotter.Curve(text, plotter.COLORS[0])], '#1e1e1e', '#3d3d3d', '#ffffff')
+        view = tiles(left, top, level)
+        sketch = draw(plot, view, False, rasterize)
+        refine = draw(plot, view, True, rasterize)
+        panned = [key for key in tiles(left + plotter.TILE_SIZE, top, level) if key not in view]
+        pan = draw(plot, panned, False, rasterize) + draw(plot, panned, True, rasterize)
+        print(f"{text:22} {len(view)} tiles: sketch {sum(sketch) * 1000:6.2f} ms  refine {sum(refine) * 1000:6.2f} ms  "
+              f"(worst tile {max(refine) * 1000:5.2f} ms)  pan {len(panned)} new tiles {sum(pan) * 1000:6.2f} ms  "
+              f"frames to sharp {(sum(sketch) + sum(refine)) / FRAME:4.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Per-keystroke cost of the live preview on long expressions.
+
+Run from the repository root:  python benchmarks/bench_preview.py
+Types each expression one character at a time through an IncrementalEvaluator
+and reports the worst and mean Tk-thread time per keystroke (budget: 16 ms).
+"""
+import decimal
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import engine
+
+FRAME_MS = 16.0
+CASES = {
+    "sum of products": '+'.join(f"({i}*{i + 1}/{i + 2})" for i in range(1500)),
+    "long product": '*'.join(str(i % 9 + 1) for i in range(4000)),
+    "open parenthesis": '(' + '+'.join(str(i) for i in range(4000)),
+    "nested": "(" * 40 + "+".join(f"{i}.5" for i in range(2000)),
+}
+
+
+def type_out(text, context, tail=200):
+    """Paste all but the last `tail` characters, then type the rest one key at a time."""
+    evaluator = engine.IncrementalEvaluator(context)
+    start = time.perf_counter()
+    try: evaluator.evaluate(text[:-tail])
+    except (engine.ParseError, ArithmeticError): pass
+    paste_ms = (time.perf_counter() - start) * 1000
+    timings = []
+    for end in range(len(text) - tail + 1, len(text) + 1):
+        start = time.perf_counter()
+        try: evaluator.evaluate(text[:end])
+        except (engine.ParseError, ArithmeticError): pass
+        timings.append((time.perf_counter() - start) * 1000)
+    return paste_ms, timings
+
+
+def main():
+    context = decimal.Context(prec=12)
+    for name, text in CASES.items():
+        paste_ms, timings = type_out(text, context)
+        worst = max(timings)
+        print(f"{name:>17}: {len(text):6} chars  paste {paste_ms:7.2f} ms  keystroke mean {sum(timings)/len(timings):6.3f} ms  "
+              f"worst {worst:6.3f} ms  {'ok' if worst < FRAME_MS else 'OVER BUDGET'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Time theme switches in a window with 1, 50 and 500 open tabs.
+
+Run from the repository root (needs a display):  python benchmarks/bench_theme.py
+Each switch is timed until Tk has processed the resulting idle redraws. With
+tabs styled through shared ttk styles the cost should not grow with the tab count.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the app's history database out of the user's data directory
+os.environ.setdefault('ZENTH_DATA_DIR', tempfile.mkdtemp(prefix='zenth-bench-'))
+import tkinter as tk
+
+import Zenth
+
+TAB_COUNTS = (1, 50, 500)
+SWITCHES = 20
+
+
+def bench(root, tab_count):
+    window = tk.Toplevel(root)
+    app = Zenth.TabbedCalculatorApp(window, root)
+    Zenth.running_apps.append(app)
+    try:
+        while len(app.notebook.tabs()) < tab_count: app.add_tab()
+        root.update()
+        timings = []
+        for switch in range(SWITCHES):
+            start = time.perf_counter()
+            app.apply_theme('light' if switch % 2 == 0 else 'dark')
+            root.update_idletasks()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+    finally:
+        Zenth.running_apps.remove(app)
+        window.destroy()
+
+
+def main():
+    try: root = tk.Tk()
+    except tk.TclError as exc:
+        print(f"No display available: {exc}")
+        return
+    root.withdraw()
+    for tab_count in TAB_COUNTS:
+        timings = sorted(bench(root, tab_count))
+        print(f"{tab_count:4} tabs: median {timings[len(timings) // 2]:7.2f} ms  worst {timings[-1]:7.2f} ms", flush=True)
+    Zenth.history_store.close()
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Lazy display of very large integer results.
+
+A BigResult knows its digit count and its leading and trailing digits without
+ever building the full decimal string; that is only produced by `full()`,
+which converts in subquadratic time.
+"""
+import decimal
+
+INLINE_DIGITS = 40          # results up to this many digits are shown in full
+SCIENTIFIC_DIGITS = 30      # significant digits in the scientific display form
+LEADING_DIGITS = 10
+TRAILING_DIGITS = 6
+ABBREVIATE_CHARS = 48
+_EXACT_BITS = 4096          # below this, str() is cheap enough to use directly
+_LOG_CONTEXT = decimal.Context(prec=SCIENTIFIC_DIGITS + 20)
+_LOG10_2 = _LOG_CONTEXT.log10(decimal.Decimal(2))
+_BOUNDARY = decimal.Decimal('1e-35')
+
+
+def group_digits(digits):
+    """Insert thousands separators into a plain digit string."""
+    head = len(digits) % 3 or 3
+    return ','.join([digits[:head]] + [digits[i:i + 3] for i in range(head, len(digits), 3)])
+
+
+def int_to_decimal(n):
+    """Exact Decimal for a huge int in subquadratic time.
+
+    Splits n in binary and recombines the halves as Decimals, whose
+    multiplication (libmpdec) is subquadratic, unlike int -> str.
+    """
+    D = decimal.Decimal
+    if n.bit_length() <= _EXACT_BITS: return D(n)
+    with decimal.localcontext() as ctx:
+        ctx.prec, ctx.Emax, ctx.Emin = decimal.MAX_PREC, decimal.MAX_EMAX, decimal.MIN_EMIN
+        ctx.traps[decimal.Inexact] = True
+        powers = {}
+        def power_of_two(w):
+            result = powers.get(w)
+            if result is None: result = powers[w] = D(2) ** w
+            return result
+        def inner(n, w):
+            if w <= _EXACT_BITS: return D(n)
+            half = w >> 1
+            hi = n >> half
+            lo = n - (hi << half)
+            return inner(lo, half) + inner(hi, w - half) * power_of_two(half)
+        negative = n < 0
+        result = inner(-n if negative else n, n.bit_length())
+        return -result if negative else result
+
+
+def to_decimal_string(n):
+    """str(n) for huge ints in subquadratic time."""
+    if n.bit_length() <= _EXACT_BITS: return str(n)
+    return format(int_to_decimal(n), 'f')
+
+
+class BigResult:
+    """An integer result that renders abbreviated forms lazily."""
+    __slots__ = ('value', 'digits', 'leading', 'trailing')
+
+    def __init__(self, value):
+        self.value = value
+        magnitude = abs(value)
+        if magnitude.bit_length() <= _EXACT_BITS:
+            text = str(magnitude)
+            self.digits, self.leading = len(text), text[:SCIENTIFIC_DIGITS]
+            self.trailing = text[-TRAILING_DIGITS:]
+            return
+        # log10 of the top 128 bits plus the shifted-out power of two gives
+        # the exponent and mantissa without touching the full number
+        shift = magnitude.bit_length() - 128
+        with decimal.localcontext(_LOG_CONTEXT):
+            log10 = decimal.Decimal(magnitude >> shift).log10() + _LOG10_2 * shift
+            exponent = int(log10)
+            mantissa = decimal.Decimal(10) ** (log10 - exponent)
+            self.leading = str(int(mantissa.scaleb(SCIENTIFIC_DIGITS - 1)))[:SCIENTIFIC_DIGITS]
+            near_power_of_ten = abs(log10 - log10.to_integral_value()) < _BOUNDARY
+        if near_power_of_ten:
+            # Within rounding error of 10^k: settle the exponent and digits exactly
+            exponent = int(log10.to_integral_value())
+            if magnitude < 10 ** exponent: exponent -= 1
+            self.leading = str(magnitude // 10 ** (exponent - SCIENTIFIC_DIGITS + 1))
+        self.digits = exponent + 1
+        self.trailing = str(magnitude % 10 ** TRAILING_DIGITS).zfill(TRAILING_DIGITS)
+
+    @property
+    def sign(self): return '-' if self.value < 0 else ''
+
+    def scientific(self):
+        mantissa = self.leading[0] + ('.' + self.leading[1:]).rstrip('0').rstrip('.')
+        return f"{self.sign}{mantissa}E+{self.digits - 1}"
+
+    def display(self):
+        """Text for the entry: exact when short, otherwise parseable scientific notation."""
+        if self.digits <= INLINE_DIGITS: return f"{self.value:,}"
+        return self.scientific()
+
+    def abbreviated(self):
+        """Leading and trailing digits with the digit count, for history and previews."""
+        if self.digits <= INLINE_DIGITS: return f"{self.value:,}"
+        return f"{self.sign}{self.leading[:LEADING_DIGITS]}…{self.trailing} ({self.digits:,} digits)"
+
+    def full(self):
+        """The complete grouped expansion. Expensive for huge values."""
+        return self.sign + group_digits(to_decimal_string(abs(self.value)))
+
+    def __str__(self): return self.display()
+
+
+def abbreviate(result):
+    """Short form of a result (BigResult or text) for history entries and tab previews."""
+    if isinstance(result, BigResult): return result.abbreviated()
+    if len(result) <= ABBREVIATE_CHARS: return result
+    return f"{result[:LEADING_DIGITS * 2]}…{result[-TRAILING_DIGITS * 2:]}"
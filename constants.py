@@ -0,0 +1,131 @@
+"""Arbitrary-precision mathematical constants for Zenth.
+
+π uses the Chudnovsky series, e the factorial series and the logarithms
+Machin-like atanh formulas, all summed by binary splitting. The most precise
+value of each constant is kept in memory (and, for large precisions, on
+disk); lower precisions are obtained by rounding it down.
+"""
+import decimal
+import math
+import os
+
+import appdata
+import bignum
+
+GUARD_DIGITS = 10
+DISK_CACHE_ENABLED = True
+DISK_CACHE_MIN_PREC = 1000      # below this, computing is faster than reading a file
+
+
+def _to_decimal(n):
+    return bignum.int_to_decimal(n)
+
+
+def _pi(prec):
+    C3_OVER_24 = 640320 ** 3 // 24
+    def split(a, b):
+        if b - a == 1:
+            if a == 0: p = q = 1
+            else: p, q = (6*a - 5) * (2*a - 1) * (6*a - 1), a * a * a * C3_OVER_24
+            t = p * (13591409 + 545140134 * a)
+            return p, q, -t if a & 1 else t
+        m = (a + b) // 2
+        p1, q1, t1 = split(a, m)
+        p2, q2, t2 = split(m, b)
+        return p1 * p2, q1 * q2, q2 * t1 + p1 * t2
+    _, q, t = split(0, prec // 14 + 2)      # each term adds ~14.18 digits
+    with decimal.localcontext(decimal.Context(prec=prec)):
+        return 426880 * decimal.Decimal(10005).sqrt() * _to_decimal(q) / _to_decimal(t)
+
+
+def _e(prec):
+    # Smallest n with n! > 10^prec, via lgamma
+    n = 2
+    while math.lgamma(n + 1) / math.log(10) < prec: n = n * 9 // 8 + 1
+    def split(a, b):
+        if b - a == 1: return 1, b
+        m = (a + b) // 2
+        p1, q1 = split(a, m)
+        p2, q2 = split(m, b)
+        return p1 * q2 + p2, q1 * q2
+    p, q = split(0, n)
+    with decimal.localcontext(decimal.Context(prec=prec)):
+        return 1 + _to_decimal(p) / _to_decimal(q)
+
+
+def _atanh_inverse(x, prec):
+    """atanh(1/x) = sum 1 / ((2k+1) x^(2k+1)) by binary splitting."""
+    terms = int(prec / (2 * math.log10(x))) + 2
+    x2 = x * x
+    def split(a, b):
+        # Returns (Q, B, T) for terms a..b-1 with partial sum T / (B * Q)
+        if b - a == 1:
+            return (x if a == 0 else x2), 2 * a + 1, 1
+        m = (a + b) // 2
+        q1, b1, t1 = split(a, m)
+        q2, b2, t2 = split(m, b)
+        return q1 * q2, b1 * b2, b2 * q2 * t1 + b1 * t2
+    q, b, t = split(0, terms)
+    with decimal.localcontext(decimal.Context(prec=prec)):
+        return _to_decimal(t) / (_to_decimal(b) * _to_decimal(q))
+
+
+def _ln2(prec):
+    with decimal.localcontext(decimal.Context(prec=prec)):
+        return 18 * _atanh_inverse(26, prec) - 2 * _atanh_inverse(4801, prec) + 8 * _atanh_inverse(8749, prec)
+
+
+def _ln10(prec):
+    # ln 10 = 3 ln 2 + ln(5/4), and ln(5/4) = 2 atanh(1/9)
+    with decimal.localcontext(decimal.Context(prec=prec)):
+        return 3 * ln2(prec + GUARD_DIGITS) + 2 * _atanh_inverse(9, prec)
+
+
+class _Constant:
+    """A constant cached at its best precision, plus rounded copies per precision."""
+    def __init__(self, name, compute):
+        self.name = name
+        self._compute = compute
+        self._best = None
+        self._best_prec = 0
+        self._rounded = {}
+
+    def __call__(self, prec):
+        value = self._rounded.get(prec)
+        if value is not None: return value
+        if prec + GUARD_DIGITS > self._best_prec:
+            self._best, self._best_prec = self._load(prec) or self._compute_and_store(prec)
+            self._rounded.clear()
+        value = self._rounded[prec] = decimal.Context(prec=prec).plus(self._best)
+        return value
+
+    def _compute_and_store(self, prec):
+        working_prec = prec + GUARD_DIGITS
+        value = self._compute(working_prec)
+        if DISK_CACHE_ENABLED and prec >= DISK_CACHE_MIN_PREC:
+            try: appdata.atomic_write(self._path(), f"{working_prec}\n{value}")
+            except OSError: pass
+        return value, working_prec
+
+    def _load(self, prec):
+        if not (DISK_CACHE_ENABLED and prec >= DISK_CACHE_MIN_PREC): return None
+        try:
+            with open(self._path(), encoding='utf-8') as f:
+                stored_prec, digits = int(f.readline()), f.readline().strip()
+        except (OSError, ValueError): return None
+        if stored_prec < prec + GUARD_DIGITS: return None
+        try: return decimal.Decimal(digits), stored_prec
+        except decimal.InvalidOperation: return None
+
+    def _path(self):
+        return os.path.join(appdata.data_dir('constants'), f"{self.name}.txt")
+
+    def clear(self):
+        self._best, self._best_prec = None, 0
+        self._rounded.clear()
+
+
+pi = _Constant('pi', _pi)
+e = _Constant('e', _e)
+ln2 = _Constant('ln2', _ln2)
+ln10 = _Constant('ln10', _ln10)
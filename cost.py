@@ -0,0 +1,263 @@
+"""Cost estimates for Zenth calculations, made before anything is evaluated.
+
+The parsed expression is walked once. Every node's value is followed in log
+space (a sign and log10 of the magnitude), which bounds the size of each
+intermediate without computing it. Every operation is also charged a time:
+Decimal operations at the working precision, exact integer ones (see
+engine) by the sizes of their operands. From the two, `plan` picks a route:
+
+    inline        cheap enough to run on the Tk thread
+    background    sent to a worker process, with its progress shown
+    approximate   a Decimal intermediate would overflow the context's exponent
+                  range (or n! would exceed max_digits), so the result is
+                  shown from its log-magnitude instead: "≈ 4.2812 × 10^369693099"
+    refuse        too slow at this precision, or too large even to estimate
+
+`plan_factorial` and `plan_function` (the scientific buttons and π, timed as
+whole kernels) choose among the same routes.
+
+The timings are rough fits to libmpdec and Python ints on a desktop machine;
+they only need to tell milliseconds from minutes.
+"""
+import decimal
+import math
+
+import engine
+
+INLINE, BACKGROUND, APPROXIMATE, REFUSE = 'inline', 'background', 'approximate', 'refuse'
+
+INLINE_SECONDS = 0.005      # estimated time up to which work stays on the Tk thread
+MAX_SECONDS = 60.0          # estimated time beyond which work is refused
+MAX_DIGITS = 10_000_000     # digits an exact result may have, about 4 MB per integer
+
+_LOG10_PI = math.log10(math.pi)
+_LOG2_10 = math.log2(10)
+
+
+class Limits:
+    __slots__ = ('inline_seconds', 'max_seconds', 'max_digits')
+
+    def __init__(self, inline_seconds=INLINE_SECONDS, max_seconds=MAX_SECONDS, max_digits=MAX_DIGITS):
+        self.inline_seconds, self.max_seconds, self.max_digits = inline_seconds, max_seconds, max_digits
+
+DEFAULT_LIMITS = Limits()
+
+
+class Plan:
+    """The route for one calculation, its estimated time in seconds, log10 of the result's
+    magnitude (when known), and the text to show for approximate or refused routes."""
+    __slots__ = ('route', 'seconds', 'magnitude', 'text')
+
+    def __init__(self, route, seconds=0.0, magnitude=None, text=None):
+        self.route, self.seconds, self.magnitude, self.text = route, seconds, magnitude, text
+
+    def __repr__(self): return f"Plan({self.route!r}, {self.seconds:.3g}s, {self.text or ''!r})"
+
+
+# --- Time per operation at p digits, in seconds ---
+
+def _add_time(p): return 2e-7 + 1e-9 * p
+def _mul_time(p): return 2e-7 + 3e-5 * (p / 1000) ** 1.5
+def _div_time(p): return 2e-7 + 3e-5 * (p / 1000) ** 1.9
+def _transcendental_time(p): return 5e-5 + 3.6e-2 * (p / 1000) ** 2.6
+def _int_mul_time(big, small):
+    # A lopsided int product is cut into small x small pieces, each done by Karatsuba
+    small = max(small, 1)
+    return 2e-7 + 1.7e-3 * (big / small) * (small / 5000) ** 1.58
+def _int_shift_time(digits): return 2e-7 + 2e-10 * digits
+def _factorial_time(digits): return 0.4 * (digits / 456573) ** 1.7
+
+# The scientific buttons (see kernels): series of about sqrt(p) terms after as many
+# reduction steps, each term a p-digit multiply, so close to p^2; cold constant caches included
+def _sqrt_time(p): return 2e-5 + 5e-4 * (p / 1000) ** 2
+def _pi_time(p): return 1e-4 + 1e-3 * (p / 1000) ** 1.9
+def _log_time(p): return 2e-4 + 1.7e-2 * (p / 1000) ** 1.95
+def _trig_time(p): return 2e-3 + 4.5e-3 * (p / 1000) ** 2
+
+_FUNCTION_TIMES = {'sqrt': _sqrt_time, 'π': _pi_time, 'log': _log_time, 'ln': _log_time,
+                   'sin': _trig_time, 'cos': _trig_time, 'tan': _trig_time}
+
+_TIMES = (_add_time, _mul_time, _div_time, _transcendental_time)
+_ADD, _MUL, _DIV, _TRANSCENDENTAL = range(4)
+
+
+class _Unknown(Exception):
+    """The walk cannot follow the value (an unbound name, a division by zero, ...);
+    evaluating it fails quickly with the proper error, so no estimate is needed."""
+
+class _TooLarge(Exception):
+    """A magnitude does not even fit in a float."""
+
+class _TooSmall(Exception):
+    """A nonzero magnitude underflows a float, such as 0.5^9^9^9."""
+
+
+def _log_value(value):
+    """(sign, log10 |value|) of a Decimal or int of any size."""
+    if not value: return 0, -math.inf
+    if type(value) is int: return (-1 if value < 0 else 1), math.log10(abs(value))
+    if not value.is_finite(): raise _Unknown
+    exponent = value.adjusted()
+    return (-1 if value.is_signed() else 1), exponent + math.log10(float(abs(value.scaleb(-exponent))))
+
+
+def _is_integral(node, names):
+    """Whether the node's value is certainly an integer, for cheaper integer powers."""
+    kind = type(node)
+    if kind is engine.Num: return node.value == node.value.to_integral_value()
+    if kind is engine.Name:
+        try: value = names[node.name]
+        except (KeyError, TypeError): return False
+        return type(value) is int or value.is_finite() and value == value.to_integral_value()
+    if kind is engine.Unary: return _is_integral(node.operand, names)
+    if kind is not engine.Binary or node.op == '/': return False
+    if node.op == '^' and type(node.right) is engine.Unary: return False      # a negative power
+    return _is_integral(node.left, names) and _is_integral(node.right, names)
+
+
+def _int_value(node, names):
+    """The int of a literal or a name the engine keeps as an int, else None."""
+    if type(node) is engine.Num: return engine.exact_literal(node.value)
+    if type(node) is engine.Name:
+        try: value = names[node.name]
+        except (KeyError, TypeError): return None
+        return value if type(value) is int else None
+    return None
+
+
+class _Walk:
+    """Follows a tree in log space, recording the largest Decimal intermediate and the
+    operations charged. Values are (sign, log10 magnitude, exact), where exact means the
+    engine keeps the value as an int, which has no exponent range to overflow."""
+    def __init__(self, names):
+        self.names = names
+        self.peak = -math.inf       # largest log10 magnitude of any Decimal intermediate
+        self.counts = [0.0] * len(_TIMES)
+        self.exact_seconds = 0.0    # integer work, the same at any precision
+
+    def seconds(self, prec):
+        return self.exact_seconds + self.decimal_seconds(prec)
+
+    def decimal_seconds(self, prec):
+        """The part of `seconds` that depends on the precision."""
+        return sum(count * time(prec) for count, time in zip(self.counts, _TIMES))
+
+    def visit(self, node):
+        sign, magnitude, exact = self._visit(node)
+        if math.isnan(magnitude) or magnitude == math.inf: raise _TooLarge
+        if sign and magnitude == -math.inf: raise _TooSmall
+        if not exact and magnitude > self.peak: self.peak = magnitude
+        return sign, magnitude, exact
+
+    def _visit(self, node):
+        kind = type(node)
+        if kind is engine.Num: return _log_value(node.value) + (engine.exact_literal(node.value) is not None,)
+        if kind is engine.Const:
+            self.counts[_DIV] += 1
+            return 1, _LOG10_PI, False
+        if kind is engine.Name:
+            try: value = self.names[node.name]
+            except (KeyError, TypeError): raise _Unknown from None
+            return _log_value(value) + (type(value) is int,)
+        if kind is engine.Unary:
+            sign, magnitude, exact = self.visit(node.operand)
+            return (-sign if node.op == '-' else sign), magnitude, exact
+        (ls, lm, le), (rs, rm, re) = self.visit(node.left), self.visit(node.right)
+        op, exact = node.op, le and re
+        if op in ('+', '-'):
+            if not exact: self.counts[_ADD] += 1
+            if op == '-': rs = -rs
+            if not rs: return ls, lm, exact
+            if not ls: return rs, rm, exact
+            (big_sign, big), small = ((ls, lm), rm) if lm >= rm else ((rs, rm), lm)
+            if ls == rs: return big_sign, big + math.log10(1 + 10 ** (small - big)), exact
+            remainder = 1 - 10 ** (small - big)
+            return ((big_sign, big + math.log10(remainder)) if remainder > 0 else (0, -math.inf)) + (exact,)
+        if op == '*':
+            magnitude = lm + rm if ls and rs else -math.inf
+            if exact: self.exact_seconds += _int_mul_time(max(lm, rm, 0), max(min(lm, rm), 0))
+            else: self.counts[_MUL] += 1
+            return ls * rs, magnitude, exact
+        if op == '/':
+            if not rs: raise _Unknown
+            self.counts[_DIV] += 1
+            return ls * rs, lm - rm if ls else -math.inf, False
+        return self._power(node, ls, lm, le, rs, rm, re)
+
+    def _power(self, node, ls, lm, le, rs, rm, re):
+        integral = re or _is_integral(node.right, self.names)
+        if not ls:
+            if rs > 0: return 0, -math.inf, le and re
+            raise _Unknown                      # 0 to a negative power, or 0^0
+        if ls < 0 and not integral: raise _Unknown
+        exponent = rs * 10 ** rm if rm < 308 else rs * math.inf
+        magnitude = exponent * lm if rs and lm else 0.0
+        sign = -1 if ls < 0 and abs(exponent) < 2 ** 53 and round(exponent) % 2 else 1
+        # The engine keeps int ** positive int exact by the same rule
+        if le and re and rs > 0 and engine.exact_power_fits(math.floor(lm * _LOG2_10) + 1, exponent):
+            digits, base = max(magnitude, 0), _int_value(node.left, self.names)
+            if base is not None and base > 0 and not base & (base - 1): self.exact_seconds += _int_shift_time(digits)
+            else: self.exact_seconds += 0.5 * _int_mul_time(digits / 2, digits / 2)     # repeated squaring, fitted
+            return sign, magnitude, True
+        if integral: self.counts[_MUL] += max(1.0, 2 * rm * _LOG2_10)     # squarings and multiplies
+        else: self.counts[_TRANSCENDENTAL] += 1
+        return sign, magnitude, False
+
+
+def format_magnitude(sign, magnitude):
+    """Display text for a value known only by sign and log10 of its magnitude."""
+    if not sign or magnitude == -math.inf: return "≈ 0"
+    minus = '-' if sign < 0 else ''
+    if -5 < magnitude < 15: return f"≈ {minus}{decimal.Decimal(f'{10 ** magnitude:.5g}'):,f}"
+    if abs(magnitude) >= 1e10: return f"≈ {minus}10^{magnitude:.6g}" if abs(magnitude) >= 1e15 else f"≈ {minus}10^{math.floor(magnitude)}"
+    exponent = math.floor(magnitude)
+    return f"≈ {minus}{10 ** (magnitude - exponent):.5g} × 10^{exponent}"
+
+
+def describe_seconds(seconds):
+    for unit, size in (('years', 31557600), ('days', 86400), ('hours', 3600), ('minutes', 60)):
+        if seconds >= 2 * size: return f"about {seconds / size:,.0f} {unit}"
+    return f"about {seconds:.0f} s" if seconds >= 1 else "under a second"
+
+
+def plan(expression, context, names=None, limits=DEFAULT_LIMITS):
+    """How to evaluate a compiled expression with evaluate_stable under context,
+    given the values of the names it uses."""
+    walk = _Walk(names)
+    try: sign, magnitude, exact = walk.visit(expression.tree)
+    except _Unknown: return Plan(INLINE)
+    except _TooLarge: return Plan(REFUSE, text="Too large even to estimate")
+    except _TooSmall: return Plan(REFUSE, text="Too close to zero even to estimate")
+    except (OverflowError, decimal.DecimalException): return Plan(REFUSE, text="Too large even to estimate")
+    if walk.peak > context.Emax: return Plan(APPROXIMATE, 0.0, magnitude, format_magnitude(sign, magnitude))
+    # evaluate_stable usually takes two passes: at the guarded precision and at twice that;
+    # an exact integer result needs only the first
+    guarded = context.prec + engine.REFINE_GUARD_DIGITS
+    passes = (guarded,) if exact else (guarded, 2 * guarded)
+    seconds = sum(walk.seconds(prec) for prec in passes)
+    if seconds > limits.max_seconds:
+        # Exact integer work takes as long at any precision
+        if sum(walk.decimal_seconds(prec) for prec in passes) > limits.max_seconds:
+            return Plan(REFUSE, seconds, magnitude, f"That would take {describe_seconds(seconds)} at {context.prec:,} digits; try fewer digits")
+        return Plan(REFUSE, seconds, magnitude, f"That would take {describe_seconds(seconds)}")
+    return Plan(INLINE if seconds <= limits.inline_seconds else BACKGROUND, seconds, magnitude)
+
+
+def plan_factorial(n, limits=DEFAULT_LIMITS):
+    """How to compute n! exactly, or its approximate size when that would be too big or too slow."""
+    if n < 2: return Plan(INLINE, 0.0, 0.0)
+    try: magnitude = math.lgamma(n + 1) / math.log(10)
+    except OverflowError: return Plan(REFUSE, text="Too large even to estimate")
+    # Checked before timing: the time of a huge n! overflows a float
+    if magnitude + 1 > limits.max_digits: return Plan(APPROXIMATE, 0.0, magnitude, format_magnitude(1, magnitude))
+    seconds = _factorial_time(magnitude + 1)
+    if seconds > limits.max_seconds: return Plan(APPROXIMATE, seconds, magnitude, format_magnitude(1, magnitude))
+    return Plan(INLINE if seconds <= limits.inline_seconds else BACKGROUND, seconds, magnitude)
+
+
+def plan_function(name, prec, limits=DEFAULT_LIMITS):
+    """How to compute a scientific button's function (or π) at `prec` digits."""
+    seconds = _FUNCTION_TIMES[name](prec)
+    if seconds > limits.max_seconds:
+        return Plan(REFUSE, seconds, text=f"That would take {describe_seconds(seconds)} at {prec:,} digits; try fewer digits")
+    return Plan(INLINE if seconds <= limits.inline_seconds else BACKGROUND, seconds)
@@ -0,0 +1,554 @@
+"""Expression engine for Zenth: tokenizer, parser and compiled evaluation trees.
+
+Works without tkinter and without eval(). Compiled expressions are kept in a
+bounded LRU keyed by the normalized expression text. Names (variables, `ans`,
+other tabs written as `[Tab name]`) are left unresolved when compiling and
+looked up in the mapping passed to `evaluate`, so a cached expression works
+with any bindings.
+
+Integer literals are evaluated as Python ints, and so are sums, differences,
+products and non-negative powers of ints, so integer work is exact and never
+rounded to the context. An int is promoted to Decimal only where a division,
+a non-integer operand or a negative power needs it. Large integer powers use
+gmpy2 when it is installed. An expression whose value stays an int evaluates
+to an int; otherwise to a Decimal.
+"""
+import bisect
+import decimal
+import operator
+import re
+from collections import OrderedDict
+
+import bignum
+import constants
+
+CACHE_SIZE = 512
+REFINE_GUARD_DIGITS = 5
+REFINE_MAX_FACTOR = 8
+PREVIEW_CACHE_SIZE = 4096
+EXACT_INTEGERS = True       # False evaluates every literal as a Decimal, as before the exact path
+EXACT_MAX_BITS = 1 << 25    # an integer power larger than this (about 10 million digits) is left to Decimal
+INT_LITERAL_DIGITS = 10000  # integer literals with more digits (only via e-notation) stay Decimal
+GMPY2_MIN_BITS = 1 << 14    # integer powers from this size use gmpy2, when installed
+PREVIEW_EXACT_BITS = 1 << 16    # the live preview keeps integer powers exact up to this size (about 20000 digits)
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<op>\*\*|[-+*/^%()])
+      | (?P<const>π)
+      | (?P<name>[^\W\d]\w*)
+      | \[(?P<ref>[^\[\]]+)\]
+    )""", re.VERBOSE)
+
+
+class ParseError(ValueError):
+    """Raised when an expression cannot be tokenized or parsed."""
+
+class UndefinedName(ValueError):
+    """Raised when an expression uses a name that has no value."""
+    def __init__(self, name):
+        super().__init__(f"Unknown name {name!r}")
+        self.name = name
+
+
+# --- Evaluation tree ---
+
+class Num:
+    __slots__ = ('value',)
+    def __init__(self, value): self.value = value
+
+class Const:
+    __slots__ = ('name',)
+    def __init__(self, name): self.name = name
+
+class Name:
+    __slots__ = ('name',)
+    def __init__(self, name): self.name = name
+
+class Unary:
+    __slots__ = ('op', 'operand')
+    def __init__(self, op, operand): self.op, self.operand = op, operand
+
+class Binary:
+    __slots__ = ('op', 'left', 'right')
+    def __init__(self, op, left, right): self.op, self.left, self.right = op, left, right
+
+
+_gmpy2 = None
+
+def _load_gmpy2():
+    """The gmpy2 module, imported on the first large integer power, or False if it is not installed."""
+    global _gmpy2
+    if _gmpy2 is None:
+        try: import gmpy2 as _gmpy2
+        except ImportError: _gmpy2 = False
+    return _gmpy2
+
+
+def exact_literal(value):
+    """The int a Decimal literal denotes when it is written as an integer, else None."""
+    if not EXACT_INTEGERS or not value.is_finite() or value.as_tuple().exponent < 0 or value.adjusted() >= INT_LITERAL_DIGITS: return None
+    return int(value)
+
+def to_decimal(value):
+    """A Decimal for an int or Decimal operand; ints are converted exactly."""
+    return bignum.int_to_decimal(value) if type(value) is int else value
+
+def _divide(a, b):
+    # int / int would make a float
+    if type(a) is int and type(b) is int: a = to_decimal(a)
+    return a / b
+
+def exact_power_fits(base_bits, exponent, max_bits=EXACT_MAX_BITS):
+    """Whether an int of `base_bits` bits to a positive int power is kept exact. The power
+    has at least (base_bits - 1) * exponent + 1 bits, exactly that many for a power of two."""
+    return base_bits <= 1 or (base_bits - 1) * exponent + 1 <= max_bits
+
+def _power(base, exponent, max_bits=EXACT_MAX_BITS):
+    """Exact when an int is raised to a positive int power of at most `max_bits`;
+    otherwise a Decimal power in the current context."""
+    if type(base) is int:
+        if type(exponent) is int and (exponent > 0 or exponent == 0 and base) and exact_power_fits(base.bit_length(), exponent, max_bits):
+            if base > 0 and not base & (base - 1): return 1 << (base.bit_length() - 1) * exponent     # a power of two
+            if base.bit_length() * exponent >= GMPY2_MIN_BITS:
+                gmpy2 = _load_gmpy2()
+                if gmpy2: return int(gmpy2.mpz(base) ** exponent)
+            return base ** exponent
+        base = to_decimal(base)
+    return base ** exponent
+
+
+def pi_constant():
+    """π to the precision of the current decimal context."""
+    return constants.pi(decimal.getcontext().prec)
+
+CONSTANTS = {'π': pi_constant}
+
+_BINARY_OPS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv, '^': operator.pow}
+_UNARY_OPS = {'+': operator.pos, '-': operator.neg}
+_HUNDRED = decimal.Decimal(100)
+_END = (None, None)
+_bindings = [None]          # names for the evaluation in progress
+
+
+def lookup(name):
+    """Value bound to `name` in the evaluation in progress."""
+    names = _bindings[0]
+    try: return names[name]
+    except (KeyError, TypeError): raise UndefinedName(name) from None
+
+
+# --- Tokenizer and parser ---
+
+def normalize(text):
+    """Canonical form of an expression: no whitespace, no digit grouping, '^' for powers."""
+    return ''.join(text.split()).replace(',', '').replace('**', '^')
+
+def tokenize(text):
+    """Split normalized text into (kind, value) tokens, ending with an (None, None) sentinel."""
+    tokens, pos, end = [], 0, len(text)
+    match_token = _TOKEN_RE.match
+    while pos < end:
+        match = match_token(text, pos)
+        if not match:
+            if text[pos:].isspace(): break
+            raise ParseError(f"Unexpected character {text[pos]!r} at position {pos}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if value == '**': value = '^'
+        elif kind == 'ref': kind = 'name'
+        tokens.append((kind, value))
+        pos = match.end()
+    tokens.append(_END)
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser. Precedence, loosest first:
+    + -  |  * / and postfix %  |  unary + -  |  ^ (right-assoc)  |  atoms.
+    """
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][1]
+
+    def next(self):
+        token = self.tokens[self.pos]
+        if token is _END: raise ParseError("Unexpected end of expression")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if self.tokens[0] is _END: raise ParseError("Empty expression")
+        node = self.expression()
+        if self.tokens[self.pos] is not _END: raise ParseError(f"Unexpected token {self.peek()!r}")
+        return node
+
+    def expression(self):
+        node = self.term()
+        while self.peek() in ('+', '-'):
+            op = self.next()[1]
+            node = Binary(op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek() in ('*', '/', '%'):
+            op = self.next()[1]
+            # '%' is a postfix "divide by 100" at multiplicative precedence
+            if op == '%': node = Binary('/', node, Num(_HUNDRED))
+            else: node = Binary(op, node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek() in ('+', '-'):
+            op = self.next()[1]
+            return Unary(op, self.unary())
+        return self.power()
+
+    def power(self):
+        node = self.atom()
+        if self.peek() == '^':
+            self.next()
+            node = Binary('^', node, self.unary())
+        return node
+
+    def atom(self):
+        kind, value = self.next()
+        if kind == 'number': return Num(decimal.Decimal(value))
+        if kind == 'const': return Const(value)
+        if kind == 'name': return Name(value)
+        if value == '(':
+            node = self.expression()
+            if self.peek() != ')': raise ParseError("Missing closing parenthesis")
+            self.next()
+            return node
+        raise ParseError(f"Unexpected token {value!r}")
+
+
+def parse(text):
+    """Parse expression text into an evaluation tree."""
+    return _Parser(tokenize(normalize(text))).parse()
+
+
+# --- Compilation ---
+
+# What a compiled node evaluates to: always an int, always a Decimal, or either
+_INT, _DECIMAL, _EITHER = 'int', 'decimal', 'either'
+
+def _literal(node):
+    value = exact_literal(node.value)
+    return node.value if value is None else value
+
+def _compile_node(node):
+    return _compile(node)[0]
+
+def _compile(node):
+    """Turn a tree into nested closures so evaluation does no dispatching.
+    Returns the closure and what it evaluates to."""
+    kind = type(node)
+    if kind is Num:
+        value = _literal(node)
+        return (lambda: value), (_INT if type(value) is int else _DECIMAL)
+    if kind is Const:
+        return CONSTANTS[node.name], _DECIMAL
+    if kind is Name:
+        name = node.name
+        return (lambda: lookup(name)), _EITHER
+    if kind is Unary:
+        op, (operand, result) = _UNARY_OPS[node.op], _compile(node.operand)
+        return (lambda: op(operand())), result
+    (left, left_kind), (right, right_kind) = _compile(node.left), _compile(node.right)
+    # Plain operators wherever ints cannot reach an operation that would turn them into floats
+    if node.op == '/':
+        op, result = (operator.truediv if _DECIMAL in (left_kind, right_kind) else _divide), _DECIMAL
+    elif node.op == '^':
+        op, result = (operator.pow, _DECIMAL) if left_kind is _DECIMAL else (_power, _EITHER)
+    else:
+        op = _BINARY_OPS[node.op]
+        result = _DECIMAL if _DECIMAL in (left_kind, right_kind) else _INT if left_kind is right_kind is _INT else _EITHER
+    # Literal operands are captured directly, saving a call per evaluation
+    if type(node.right) is Num:
+        right = _literal(node.right)
+        return (lambda: op(left(), right)), result
+    if type(node.left) is Num:
+        left = _literal(node.left)
+        return (lambda: op(left, right())), result
+    return (lambda: op(left(), right())), result
+
+
+def _names_in(node):
+    kind = type(node)
+    if kind is Name: return {node.name}
+    if kind is Unary: return _names_in(node.operand)
+    if kind is Binary: return _names_in(node.left) | _names_in(node.right)
+    return set()
+
+
+class Expression:
+    """A parsed and compiled expression that can be evaluated repeatedly."""
+    __slots__ = ('text', 'tree', 'names', '_fn')
+
+    def __init__(self, text, tree):
+        self.text = text
+        self.tree = tree
+        self.names = frozenset(_names_in(tree))     # names it needs bound, as written
+        self._fn = _compile_node(tree)
+
+    def evaluate(self, context=None, names=None):
+        """Evaluate under `context` (defaults to the current decimal context),
+        with `names` mapping each name the expression uses to a Decimal or int.
+        Returns an int when the value is an exact integer, else a Decimal."""
+        saved, _bindings[0] = _bindings[0], names
+        try:
+            if context is None: return self._fn()
+            with decimal.localcontext(context):
+                return self._fn()
+        finally: _bindings[0] = saved
+
+    def evaluate_stable(self, context, max_factor=REFINE_MAX_FACTOR, names=None):
+        """Evaluate at doubling working precision until the result rounded to
+        `context.prec` stops changing, so cancellation cannot leak into the
+        displayed digits."""
+        working = context.copy()
+        working.prec = context.prec + REFINE_GUARD_DIGITS
+        previous = self.evaluate(working, names)
+        if type(previous) is int: return previous       # exact; more precision cannot change it
+        previous = context.plus(previous)
+        while working.prec < context.prec * max_factor:
+            working.prec *= 2
+            current = context.plus(self.evaluate(working, names))
+            if current == previous: return current
+            previous = current
+        return previous
+
+
+class CompileCache:
+    """Bounded LRU of compiled expressions keyed by normalized text."""
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, text):
+        key = normalize(text)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = Expression(key, _Parser(tokenize(key)).parse())
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize: self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self): return len(self._entries)
+
+
+_cache = CompileCache()
+
+def compile_expression(text):
+    """Return the compiled form of `text`, from the LRU when possible."""
+    return _cache.get(text)
+
+def evaluate(text, context=None, names=None):
+    """Parse (or fetch from cache) and evaluate an expression, returning a Decimal."""
+    return _cache.get(text).evaluate(context, names)
+
+
+# --- Incremental evaluation for live previews ---
+
+class IncrementalEvaluator:
+    """Evaluates successive edits of one expression, reusing earlier work.
+
+    Tokens before the first edited character are kept, and the value of
+    every sub-expression is cached by its character span. Spans that end
+    before the edit stay valid, so appending to an expression re-tokenizes
+    and re-evaluates only the changed tail. Missing closing parentheses are
+    supplied automatically, since the text is usually still being typed.
+    Cached spans assume `names` keeps its values; call reset() when they change.
+    Integers stay exact as in Expression.evaluate, so the preview agrees with the
+    final result, but powers above PREVIEW_EXACT_BITS are left to Decimal.
+    """
+    def __init__(self, context, cache_size=PREVIEW_CACHE_SIZE, names=None):
+        self.context = context
+        self.names = names
+        self.cache_size = cache_size
+        self.computed = 0           # spans evaluated by the last call, for profiling
+        self.reset()
+
+    def reset(self):
+        self._text = ''
+        self._kinds, self._values, self._starts, self._ends, self._depths = [], [], [], [], []
+        self._parents, self._closes = [], []     # enclosing '(' of each token; matching ')' of each '('
+        self._cache = OrderedDict()
+
+    def evaluate(self, text):
+        text = normalize(text)
+        unclosed = text.count('(') - text.count(')')
+        if unclosed > 0: text += ')' * unclosed
+        self._retokenize(text)
+        self.computed = 0
+        if not self._kinds: raise ParseError("Empty expression")
+        saved, _bindings[0] = _bindings[0], self.names
+        try:
+            with decimal.localcontext(self.context):
+                return self._span(0, len(self._kinds))
+        finally: _bindings[0] = saved
+
+    @property
+    def is_literal(self):
+        """True when the last expression was a single number, which needs no preview."""
+        return len(self._kinds) == 1 and self._kinds[0] == 'number'
+
+    def _retokenize(self, text):
+        old = self._text
+        # Longest common prefix by bisection; slice comparisons run at C speed
+        lo, hi = 0, min(len(old), len(text))
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if old[:mid] == text[:mid]: lo = mid
+            else: hi = mid - 1
+        kinds, values, starts, ends, depths = self._kinds, self._values, self._starts, self._ends, self._depths
+        parents, closes = self._parents, self._closes
+        keep = bisect.bisect_left(ends, lo)
+        # A token ending exactly at the edit survives unless typing could extend it
+        if keep < len(ends) and ends[keep] == lo and kinds[keep] not in ('number', 'name'): keep += 1
+        for column in (kinds, values, starts, ends, depths, parents, closes): del column[keep:]
+        stale = [key for key in self._cache if key[1] > (ends[-1] if ends else 0)]
+        for key in stale: del self._cache[key]
+
+        # Parentheses still open after the kept tokens lost their closing partner
+        stack = self._open_after(keep - 1) if keep else []
+        for index in stack: closes[index] = -1
+        pos = ends[-1] if ends else 0
+        depth = len(stack)
+        match_token, end = _TOKEN_RE.match, len(text)
+        self._text = text
+        while pos < end:
+            match = match_token(text, pos)
+            if not match:
+                self._text = text[:pos]
+                raise ParseError(f"Unexpected character {text[pos]!r} at position {pos}")
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == 'ref': kind = 'name'
+            if value == ')':
+                if depth == 0:
+                    self._text = text[:pos]
+                    raise ParseError("Unbalanced closing parenthesis")
+            index = len(kinds)
+            kinds.append(kind); values.append(value); starts.append(match.start(kind)); ends.append(match.end()); depths.append(depth)
+            parents.append(stack[-1] if stack else -1); closes.append(-1)
+            if value == '(':
+                depth += 1; stack.append(index)
+            elif value == ')':
+                depth -= 1; closes[stack.pop()] = index
+            pos = match.end()
+
+    def _open_after(self, index):
+        """Indices of the '(' tokens still open after token `index`, outermost first."""
+        value, parents = self._values[index], self._parents
+        if value == '(': open_index = index
+        elif value == ')': open_index = parents[parents[index]]
+        else: open_index = parents[index]
+        stack = []
+        while open_index != -1:
+            stack.append(open_index)
+            open_index = parents[open_index]
+        stack.reverse()
+        return stack
+
+    def _operand_ends_at(self, index):
+        return self._kinds[index] != 'op' or self._values[index] in (')', '%')
+
+    def _cached(self, i, j):
+        return self._cache.get((self._starts[i], self._ends[j - 1]))
+
+    def _store(self, i, j, value):
+        self._cache[(self._starts[i], self._ends[j - 1])] = value
+        if len(self._cache) > self.cache_size: self._cache.popitem(last=False)
+
+    def _span(self, i, j):
+        """Value of tokens[i:j], which always form a complete sub-expression."""
+        if i >= j: raise ParseError("Unexpected end of expression")
+        value = self._cached(i, j)
+        if value is not None: return value
+        self.computed += 1
+        # A fully parenthesised span needs none of the operator scans below
+        if self._closes[i] == j - 1: value = self._span(i + 1, j - 1)
+        else: value = self._additive(i, j)
+        self._store(i, j, value)
+        return value
+
+    def _splits(self, i, j, is_split):
+        """Split positions of a left-associative chain at the span's own depth,
+        collected backwards until a prefix whose value is already cached."""
+        base, depths, kinds, splits = self._depths[i], self._depths, self._kinds, []
+        for k in range(j - 1, i, -1):
+            if depths[k] == base and kinds[k] == 'op' and is_split(k):
+                splits.append(k)
+                if self._cached(i, k) is not None: break
+        splits.reverse()
+        return splits
+
+    def _additive(self, i, j):
+        values = self._values
+        splits = self._splits(i, j, lambda k: values[k] in ('+', '-') and self._operand_ends_at(k - 1))
+        if not splits: return self._multiplicative(i, j)
+        value = self._span(i, splits[0])
+        for index, k in enumerate(splits):
+            end = splits[index + 1] if index + 1 < len(splits) else j
+            operand = self._span(k + 1, end)
+            value = value + operand if values[k] == '+' else value - operand
+            if end != j: self._store(i, end, value)
+        return value
+
+    def _multiplicative(self, i, j):
+        values = self._values
+        splits = self._splits(i, j, lambda k: values[k] in ('*', '/', '%'))
+        if not splits: return self._unary(i, j)
+        value = self._span(i, splits[0])
+        for index, k in enumerate(splits):
+            end = splits[index + 1] if index + 1 < len(splits) else j
+            if values[k] == '%':
+                # postfix: nothing may sit between '%' and the next operator
+                if end != k + 1: raise ParseError("Unexpected token after '%'")
+                value = value / _HUNDRED
+            else:
+                operand = self._span(k + 1, end)
+                value = value * operand if values[k] == '*' else _divide(value, operand)
+            if end != j: self._store(i, end, value)
+        return value
+
+    def _unary(self, i, j):
+        kinds, values = self._kinds, self._values
+        if kinds[i] == 'op' and values[i] in ('+', '-'):
+            operand = self._span(i + 1, j)
+            return -operand if values[i] == '-' else +operand
+        base = self._depths[i]
+        for k in range(i, j):
+            if values[k] == '^' and self._depths[k] == base:
+                return _power(self._atom(i, k), self._span(k + 1, j), PREVIEW_EXACT_BITS)
+        return self._atom(i, j)
+
+    def _atom(self, i, j):
+        kinds, values = self._kinds, self._values
+        if j - i == 1:
+            if kinds[i] == 'number':
+                value = decimal.Decimal(values[i])
+                exact = exact_literal(value)
+                return value if exact is None else exact
+            if kinds[i] == 'const': return CONSTANTS[values[i]]()
+            if kinds[i] == 'name': return lookup(values[i])
+        elif self._closes[i] == j - 1 and j - i > 2:
+            return self._span(i + 1, j - 1)
+        raise ParseError(f"Unexpected token {values[i]!r}")
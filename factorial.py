@@ -0,0 +1,146 @@
+"""Factorial engine for Zenth's x! button.
+
+Factorials are built from balanced product trees, so the big multiplications
+are between numbers of similar size and stay subquadratic. Results are kept in
+a memory-capped cache so a larger n resumes from the nearest smaller cached n.
+"""
+import bisect
+import decimal
+import math
+from collections import OrderedDict
+
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MIN_N = 1000          # smaller factorials are cheaper to recompute than to cache
+_LEAF_SIZE = 32
+
+
+def range_product(lo, hi, step=1):
+    """Product of range(lo, hi, step) by binary splitting."""
+    count = len(range(lo, hi, step))
+    if count <= _LEAF_SIZE:
+        result = 1
+        for i in range(lo, hi, step): result *= i
+        return result
+    mid = lo + (count // 2) * step
+    return range_product(lo, mid, step) * range_product(mid, hi, step)
+
+
+class FactorialCache:
+    """LRU of n -> n! capped by total size of the cached integers."""
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._values = OrderedDict()
+        self._keys = []   # sorted, for nearest-below lookups
+
+    def get(self, n):
+        value = self._values.get(n)
+        if value is not None: self._values.move_to_end(n)
+        return value
+
+    def nearest_below(self, n):
+        index = bisect.bisect_left(self._keys, n)
+        if index == 0: return None
+        key = self._keys[index - 1]
+        self._values.move_to_end(key)
+        return key, self._values[key]
+
+    def put(self, n, value):
+        if n < CACHE_MIN_N or n in self._values: return
+        nbytes = (value.bit_length() + 7) // 8
+        if nbytes > self.max_bytes: return
+        self._values[n] = value
+        bisect.insort(self._keys, n)
+        self.size += nbytes
+        while self.size > self.max_bytes:
+            old_n, old_value = self._values.popitem(last=False)
+            del self._keys[bisect.bisect_left(self._keys, old_n)]
+            self.size -= (old_value.bit_length() + 7) // 8
+
+    def clear(self):
+        self._values.clear(); self._keys.clear(); self.size = 0
+
+    def __len__(self): return len(self._values)
+
+
+_cache = FactorialCache()
+
+
+def factorial(n):
+    """n! for a non-negative integer n."""
+    if n < 0: raise ValueError("factorial() not defined for negative values")
+    if n < CACHE_MIN_N: return math.factorial(n)
+    cached = _cache.get(n)
+    if cached is not None: return cached
+    nearest = _cache.nearest_below(n)
+    # Resuming only pays off when the remaining product is the smaller half
+    if nearest is not None and nearest[0] * 2 >= n:
+        m, m_factorial = nearest
+        result = m_factorial * range_product(m + 1, n + 1)
+    else:
+        # math.factorial is a C divide-and-conquer product tree over odd parts
+        result = math.factorial(n)
+    _cache.put(n, result)
+    return result
+
+
+def double_factorial(n):
+    """n!! = n * (n-2) * (n-4) * ...; (-1)!! and 0!! are 1."""
+    if n < -1: raise ValueError("double_factorial() not defined for n < -1")
+    if n <= 0: return 1
+    if n % 2 == 0:
+        half = n // 2
+        return factorial(half) << half
+    return range_product(1, n + 1, 2)
+
+
+def binomial(n, k):
+    """n choose k."""
+    return math.comb(n, k)
+
+
+# --- Gamma at Decimal precision (Spouge's approximation) ---
+
+_spouge_coefficients = {}
+
+def _spouge(prec):
+    """Spouge parameter `a` and coefficients for `prec` digits, cached per precision."""
+    entry = _spouge_coefficients.get(prec)
+    if entry is not None: return entry
+    a = int(prec * math.log(10) / math.log(2 * math.pi)) + 2
+    # The alternating coefficients grow like e^a, so carry that many guard digits
+    with decimal.localcontext(decimal.Context(prec=prec + int(a * math.log10(math.e)) + 10)) as ctx:
+        a_dec = ctx.create_decimal(a)
+        coefficients = []
+        k_factorial = 1
+        for k in range(1, a):
+            base = a_dec - k
+            c_k = base.sqrt() * base ** (k - 1) * base.exp() / k_factorial
+            coefficients.append(c_k if k % 2 == 1 else -c_k)
+            k_factorial *= k
+        # Gamma(1) = 1 pins down c_0 (= sqrt(2*pi)) without needing pi
+        c_0 = a_dec.exp() / a_dec.sqrt() - sum(c / k for k, c in enumerate(coefficients, 1))
+        entry = (a, c_0, coefficients, ctx.prec)
+    _spouge_coefficients[prec] = entry
+    return entry
+
+
+def gamma(x, context=None):
+    """Gamma(x) as a Decimal, correct to the precision of `context`."""
+    context = context or decimal.getcontext()
+    x = decimal.Decimal(x)
+    if x == x.to_integral_value():
+        if x <= 0: raise ValueError("gamma() has poles at non-positive integers")
+        return context.create_decimal(factorial(int(x) - 1))
+    a, c_0, coefficients, working_prec = _spouge(context.prec)
+    with decimal.localcontext(decimal.Context(prec=working_prec, Emax=context.Emax, Emin=context.Emin)):
+        # Shift negative arguments into Re(x) > 0 with Gamma(x) = Gamma(x + 1) / x
+        divisor = decimal.Decimal(1)
+        while x < 1:
+            divisor *= x
+            x += 1
+        z = x - 1
+        series = c_0 + sum(c / (z + k) for k, c in enumerate(coefficients, 1))
+        base = z + a
+        result = base ** (z + decimal.Decimal('0.5')) * (-base).exp() * series / divisor
+    return context.plus(result)
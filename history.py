@@ -0,0 +1,284 @@
+"""Persistent calculation history for Zenth.
+
+Entries are stored in an SQLite database in the data directory and shared by
+every window of the app. The Tk thread only queues writes; a background
+thread commits them in batches. Reads never wait for it: entries it has not
+committed yet are kept in memory and merged into what the database returns.
+Search matches substrings of the expression and the start of the result:
+through an FTS5 trigram index where SQLite provides one, and with a LIKE
+scan for queries shorter than a trigram or when it does not.
+"""
+import contextlib
+import csv
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+import appdata
+
+BATCH_SIZE = 500            # most writes committed in one transaction
+BATCH_DELAY = 0.05          # seconds the writer waits to gather a batch
+IMPORT_CHUNK = 2000
+FTS_RESULT_CHARS = 200      # leading characters of each result that are searchable
+FIELDS = ('expression', 'result', 'tab', 'timestamp', 'duration')
+
+Entry = namedtuple('Entry', ('id',) + FIELDS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    expression TEXT NOT NULL COLLATE NOCASE,
+    result TEXT NOT NULL,
+    tab TEXT NOT NULL DEFAULT '',
+    timestamp REAL NOT NULL,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS history_expression ON history (expression);
+"""
+_INSERT = "INSERT INTO history (expression, result, tab, timestamp, duration) VALUES (?, ?, ?, ?, ?)"
+_SELECT = "SELECT id, expression, result, tab, timestamp, duration FROM history"
+_STOP, _FLUSH = object(), object()
+
+
+def _create_fts(conn):
+    """Create the search index, returning its tokenizer or None if FTS5 is unavailable."""
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'history_fts'").fetchone()
+    if row: return 'trigram' if 'trigram' in row[0] else 'unicode61'
+    for tokenizer in ('trigram', 'unicode61'):
+        try:
+            with conn:
+                conn.execute(f"CREATE VIRTUAL TABLE history_fts USING fts5(expression, result, content='', tokenize='{tokenizer}')")
+                conn.execute(f"""CREATE TRIGGER history_fts_insert AFTER INSERT ON history BEGIN
+                    INSERT INTO history_fts (rowid, expression, result)
+                    VALUES (new.id, new.expression, substr(new.result, 1, {FTS_RESULT_CHARS})); END""")
+            return tokenizer
+        except sqlite3.OperationalError: continue
+    return None
+
+
+def _file_format(path):
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def _read_rows(path):
+    """Yield (expression, result, tab, timestamp, duration) tuples from a CSV or JSONL export."""
+    with open(path, newline='', encoding='utf-8') as f:
+        records = csv.DictReader(f) if _file_format(path) == 'csv' else (json.loads(line) for line in f if line.strip())
+        for record in records:
+            duration = record.get('duration')
+            yield (str(record['expression']), str(record['result']), str(record.get('tab') or ''),
+                   float(record.get('timestamp') or time.time()), float(duration) if duration not in (None, '') else None)
+
+
+class HistoryStore:
+    """Append-only calculation history with batched background writes."""
+    def __init__(self, path=None):
+        self.path = path
+        self.listeners = []                         # called with each new Entry, or None after clear()
+        self._conn = None
+        self._fts = None
+        self._queue = queue.Queue()
+        self._writer = None
+        # Writes queued but not committed; the writer commits and forgets them under the
+        # lock, so a read taken under it sees each entry exactly once
+        self._lock = threading.RLock()
+        self._pending = {}                          # sequence number: Entry, oldest first
+        self._clears = 0
+        self._sequence = itertools.count()
+
+    # --- Connection ---
+
+    def _connect(self):
+        if self.path == ':memory:':
+            # Shared cache so the writer thread sees the same in-memory database
+            return sqlite3.connect(f"file:zenth-history-{id(self)}?mode=memory&cache=shared", uri=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def open(self):
+        """Open the database on first use; falls back to memory if the data directory is unusable."""
+        if self._conn is not None: return self._conn
+        if self.path is None:
+            try: self.path = os.path.join(appdata.data_dir(), 'history.sqlite3')
+            except OSError: self.path = ':memory:'
+        try: self._conn = self._connect()
+        except sqlite3.Error:
+            self.path = ':memory:'
+            self._conn = self._connect()
+        self._conn.executescript(_SCHEMA)
+        self._fts = _create_fts(self._conn)
+        self._writer = threading.Thread(target=self._run_writer, name='zenth-history', daemon=True)
+        self._writer.start()
+        return self._conn
+
+    def close(self):
+        """Write out everything queued and stop the writer thread."""
+        if self._writer is None: return
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._writer = None
+        self._conn.close()
+        self._conn = None
+
+    # --- Writing ---
+
+    def add(self, expression, result, tab='', duration=None):
+        """Record a calculation. Returns at once; the row is written in the background."""
+        self.open()
+        entry, number = Entry(None, expression, result, tab, time.time(), duration), next(self._sequence)
+        with self._lock: self._pending[number] = entry
+        self._queue.put(('add', number, entry[1:]))
+        for listener in list(self.listeners): listener(entry)
+        return entry
+
+    def clear(self):
+        self.open()
+        with self._lock:
+            self._pending.clear()
+            self._clears += 1
+        self._queue.put(('clear',))
+        for listener in list(self.listeners): listener(None)
+
+    def import_file(self, path):
+        """Append the entries of a CSV or JSONL export; the file is streamed by the writer thread."""
+        self.open()
+        self._queue.put(('import', path))
+
+    @property
+    def busy(self):
+        """True while queued writes (such as an import) are still being committed."""
+        return bool(self._queue.unfinished_tasks)
+
+    def flush(self):
+        """Block until every queued write has been committed."""
+        if self._writer is None or not self._queue.unfinished_tasks: return
+        self._queue.put(_FLUSH)     # stops the writer waiting for a fuller batch
+        self._queue.join()
+
+    def _run_writer(self):
+        conn = self._connect()
+        # Connections to an in-memory database share a cache, where reading a table another
+        # connection is writing fails; there reads wait for the whole batch instead
+        shared = self._lock if self.path == ':memory:' else contextlib.nullcontext()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + BATCH_DELAY
+                while batch[-1] is not _STOP and batch[-1] is not _FLUSH and len(batch) < BATCH_SIZE:
+                    try: batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                    except queue.Empty: break
+                ops = [op for op in batch if op is not _STOP and op is not _FLUSH]
+                try:
+                    with shared:
+                        start = 0
+                        for i, op in enumerate(ops):
+                            # A bad import file must not take queued calculations down with it
+                            if op[0] == 'import': self._commit(conn, ops[start:i]); start = i
+                            try: self._apply(conn, op)
+                            except (sqlite3.Error, OSError, ValueError, KeyError, TypeError): conn.rollback()
+                        self._commit(conn, ops[start:])
+                finally:
+                    for _ in batch: self._queue.task_done()
+                if batch[-1] is _STOP: return
+        finally:
+            conn.close()
+
+    def _commit(self, conn, ops):
+        """Commit `ops` and stop keeping their entries in memory, committed or lost."""
+        with self._lock:
+            try: conn.commit()
+            except sqlite3.Error: conn.rollback()
+            finally:
+                for op in ops:
+                    if op[0] == 'add': self._pending.pop(op[1], None)
+                    elif op[0] == 'clear': self._clears -= 1
+
+    def _apply(self, conn, op):
+        if op[0] == 'add':
+            conn.execute(_INSERT, op[2])
+        elif op[0] == 'clear':
+            conn.execute("DELETE FROM history")
+            if self._fts: conn.execute("INSERT INTO history_fts (history_fts) VALUES ('delete-all')")
+        elif op[0] == 'import':
+            rows = _read_rows(op[1])
+            while True:
+                chunk = [row for _, row in zip(range(IMPORT_CHUNK), rows)]
+                if not chunk: break
+                conn.executemany(_INSERT, chunk)
+
+    # --- Reading (Tk thread) ---
+
+    # Entries not committed yet come last (newest) and have id None. Until a queued clear
+    # is committed, the rows in the database are already gone as far as readers know.
+
+    def count(self, text=''):
+        """Number of entries matching `text` (all entries when empty)."""
+        conn, (sql, params) = self.open(), self._where(text)
+        with self._lock:
+            stored = 0 if self._clears else conn.execute(f"SELECT count(*) FROM history {sql}", params).fetchone()[0]
+            return stored + len(self._pending_matching(text))
+
+    def page(self, offset, limit, text=''):
+        """Entries matching `text`, newest first, skipping `offset` of them."""
+        conn, (sql, params) = self.open(), self._where(text)
+        with self._lock:
+            pending = self._pending_matching(text)[::-1]
+            entries = pending[offset:offset + limit]
+            if len(entries) < limit and not self._clears:
+                cursor = conn.execute(f"{_SELECT} {sql} ORDER BY id DESC LIMIT ? OFFSET ?",
+                                      params + [limit - len(entries), max(0, offset - len(pending))])
+                entries += [Entry(*row) for row in cursor]
+        return entries
+
+    def _pending_matching(self, text):
+        """The uncommitted entries matching `text` the way _where does, oldest first."""
+        text = text.strip().casefold()
+        terms = text.split() if self._fts == 'unicode61' else [text]
+        return [entry for entry in self._pending.values()
+                if all(term in entry.expression.casefold() or term in entry.result[:FTS_RESULT_CHARS].casefold() for term in terms)]
+
+    def _where(self, text):
+        text = text.strip()
+        if not text: return '', []
+        if self._fts == 'trigram' and len(text) >= 3:
+            return "WHERE id IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)", ['"' + text.replace('"', '""') + '"']
+        if self._fts == 'unicode61':
+            terms = ' '.join('"' + term.replace('"', '""') + '"*' for term in text.split())
+            return "WHERE id IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)", [terms]
+        # Shorter than a trigram, or no FTS: a substring scan over the same text the index holds,
+        # so typing a third character never brings back rows the first two had hidden
+        pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return f"WHERE expression LIKE ? ESCAPE '\\' OR substr(result, 1, {FTS_RESULT_CHARS}) LIKE ? ESCAPE '\\'", [pattern, pattern]
+
+    def iter_entries(self, text=''):
+        """All matching entries, oldest first, read as they are iterated."""
+        conn, (sql, params) = self.open(), self._where(text)
+        with self._lock:
+            # The statement reads the database as it is now, however long it is iterated
+            cursor = iter(()) if self._clears else conn.execute(f"{_SELECT} {sql} ORDER BY id", params)
+            # except in a shared cache, where a statement left open would block the writer
+            if self.path == ':memory:': cursor = iter(list(cursor))
+            pending = self._pending_matching(text)
+        for row in cursor: yield Entry(*row)
+        yield from pending
+
+    def export_file(self, path, text=''):
+        """Stream matching entries to a CSV or JSONL file; returns the number written."""
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            if _file_format(path) == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(FIELDS)
+                for entry in self.iter_entries(text):
+                    writer.writerow(entry[1:]); count += 1
+            else:
+                for entry in self.iter_entries(text):
+                    f.write(json.dumps(dict(zip(FIELDS, entry[1:])), ensure_ascii=False) + '\n'); count += 1
+        return count
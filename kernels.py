@@ -0,0 +1,227 @@
+"""Decimal-precision elementary functions for Zenth's scientific buttons.
+
+Every function works at the precision of the given (or current) decimal
+context. Arguments are reduced against a high-precision π or ln 2 from
+`constants`, then shrunk further (angle tripling, halving, square roots)
+so the Taylor series converge in a handful of terms. Results are memoized
+per (function, argument, precision).
+"""
+import decimal
+import functools
+import math
+from collections import OrderedDict
+
+import constants
+
+MEMO_SIZE = 512
+AGM_THRESHOLD = 400         # digits above which ln() switches to the AGM method
+NATIVE_THRESHOLD = 200      # below this, decimal's own exp/log10 are faster
+
+D = decimal.Decimal
+_ZERO, _ONE, _TWO, _HALF = D(0), D(1), D(2), D('0.5')
+
+
+# --- Helpers ---
+
+def _guard(prec):
+    """Guard digits for a working precision, growing with the reduction depth."""
+    return 10 + int(math.sqrt(prec))
+
+def _steps(prec):
+    """How many halving/tripling steps to apply before summing a series."""
+    return max(1, int(math.sqrt(prec) / 2))
+
+@functools.lru_cache(maxsize=32)
+def _reduction_constants(prec):
+    """(π, π/2, π/180, ln 2, ln 10) at `prec` digits."""
+    with decimal.localcontext(decimal.Context(prec=prec)):
+        pi = constants.pi(prec)
+        return pi, pi / 2, pi / 180, constants.ln2(prec), constants.ln10(prec)
+
+def _series(first, ratio):
+    """Sum first + first*ratio(1) + ... until terms vanish at the working precision."""
+    total, term, n = first, first, 1
+    while True:
+        term = term * ratio(n)
+        new_total = total + term
+        if new_total == total: return total
+        total, n = new_total, n + 1
+
+
+_memo = OrderedDict()
+
+def _memoized(fn):
+    """Cache results per (function, argument, precision, rounding) in a shared LRU."""
+    name = fn.__name__
+    @functools.wraps(fn)
+    def wrapper(x, context=None):
+        context = context or decimal.getcontext()
+        x = D(x)
+        key = (name, x, context.prec, context.rounding)
+        result = _memo.get(key)
+        if result is not None:
+            _memo.move_to_end(key)
+            return result
+        result = fn(x, context)
+        _memo[key] = result
+        if len(_memo) > MEMO_SIZE: _memo.popitem(last=False)
+        return result
+    return wrapper
+
+def clear_memo(): _memo.clear()
+
+
+# --- Trigonometry ---
+
+def _sin_small(r, steps):
+    """sin(r) for |r| <= π/4: series on r / 3^steps, then the triple-angle formula."""
+    y = r / (3 ** steps)
+    y2 = -y * y
+    s = _series(y, lambda n: y2 / ((2 * n) * (2 * n + 1)))
+    for _ in range(steps): s = s * (3 - 4 * s * s)
+    return s
+
+def _sin_cos(x, prec):
+    """(sin x, cos x) at working precision `prec`, x in radians."""
+    wp = prec + max(0, x.adjusted())
+    with decimal.localcontext(decimal.Context(prec=wp)):
+        _, half_pi, _, _, _ = _reduction_constants(wp)
+        quadrant = (x / half_pi).to_integral_value()
+        r = x - quadrant * half_pi
+        s = _sin_small(r, _steps(prec))
+        c = (1 - s * s).sqrt()
+        quadrant = int(quadrant) % 4
+        # Negation rounds too, so it stays inside the working context
+        if quadrant == 0: return s, c
+        if quadrant == 1: return c, -s
+        if quadrant == 2: return -s, -c
+        return -c, s
+
+@_memoized
+def sin(x, context):
+    if not x: return context.plus(_ZERO)
+    s, _ = _sin_cos(x, context.prec + _guard(context.prec))
+    return context.plus(s)
+
+@_memoized
+def cos(x, context):
+    _, c = _sin_cos(x, context.prec + _guard(context.prec))
+    return context.plus(c)
+
+@_memoized
+def tan(x, context):
+    s, c = _sin_cos(x, context.prec + _guard(context.prec))
+    if not c: raise decimal.InvalidOperation("tan() is undefined here")
+    return context.divide(s, c)
+
+@_memoized
+def atan(x, context):
+    if not x: return context.plus(_ZERO)
+    prec = context.prec + _guard(context.prec)
+    steps = _steps(context.prec)
+    with decimal.localcontext(decimal.Context(prec=prec)):
+        _, half_pi, _, _, _ = _reduction_constants(prec)
+        y, invert = abs(x), abs(x) > 1
+        if invert: y = 1 / y
+        # atan(y) = 2 atan(y / (1 + sqrt(1 + y^2)))
+        for _ in range(steps): y = y / (1 + (1 + y * y).sqrt())
+        y2 = -y * y
+        result = _series(y, lambda n: y2 * (2 * n - 1) / (2 * n + 1)) * (2 ** steps)
+        if invert: result = half_pi - result
+        if x < 0: result = -result
+    return context.plus(result)
+
+
+# Exact results for angles where the calculator user expects them (sin at multiples of 30°)
+_EXACT_SIN_DEGREES = {0: _ZERO, 30: _HALF, 90: _ONE, 150: _HALF, 180: _ZERO, 210: -_HALF, 270: -_ONE, 330: -_HALF}
+
+def _reduce_degrees(x):
+    with decimal.localcontext(decimal.Context(prec=max(28, x.adjusted() + 10))):
+        return x % 360 if x >= 0 else 360 + x % 360
+
+def _degrees_to_radians(x, context):
+    prec = context.prec + _guard(context.prec)
+    with decimal.localcontext(decimal.Context(prec=prec)):
+        return x * _reduction_constants(prec)[2]
+
+def sin_degrees(x, context=None):
+    context = context or decimal.getcontext()
+    x = _reduce_degrees(D(x))
+    if x in _EXACT_SIN_DEGREES: return context.plus(_EXACT_SIN_DEGREES[x])
+    return sin(_degrees_to_radians(x, context), context)
+
+def cos_degrees(x, context=None):
+    context = context or decimal.getcontext()
+    return sin_degrees(_reduce_degrees(D(x) + 90), context)
+
+def tan_degrees(x, context=None):
+    context = context or decimal.getcontext()
+    x = _reduce_degrees(D(x))
+    if x % 90 == 0:
+        if x % 180: raise decimal.InvalidOperation("tan() is undefined at odd multiples of 90°")
+        return context.plus(_ZERO)
+    if x % 45 == 0: return context.plus(_ONE if x in (45, 225) else -_ONE)
+    return tan(_degrees_to_radians(x, context), context)
+
+
+# --- Exponential and logarithms ---
+
+@_memoized
+def exp(x, context):
+    if not x: return context.plus(_ONE)
+    if context.prec < NATIVE_THRESHOLD: return context.exp(x)
+    prec = context.prec + _guard(context.prec) + max(0, x.adjusted())
+    steps = _steps(context.prec)
+    with decimal.localcontext(decimal.Context(prec=prec, Emax=context.Emax, Emin=context.Emin)):
+        ln2 = _reduction_constants(prec)[3]
+        # x = k ln 2 + r with |r| <= ln 2 / 2, then exp(r) = (exp(r / 2^steps))^(2^steps)
+        k = (x / ln2).to_integral_value()
+        r = (x - k * ln2) / (2 ** steps)
+        u = _series(r, lambda n: r / (n + 1))       # exp(r) - 1, kept small to avoid cancellation
+        for _ in range(steps): u = u * (2 + u)
+        result = (1 + u) * _TWO ** int(k)
+    return context.plus(result)
+
+def _ln_near_one(f, prec):
+    """ln f by square-root halving and the atanh series; accurate for f close to 1."""
+    steps = _steps(prec)
+    with decimal.localcontext(decimal.Context(prec=prec + steps)):
+        for _ in range(steps): f = f.sqrt()
+        z = (f - 1) / (f + 1)
+        z2 = z * z
+        return 2 * _series(z, lambda n: z2 * (2 * n - 1) / (2 * n + 1)) * (2 ** steps)
+
+def _ln_agm(f, prec):
+    """ln f for f in [1, 10) by ln f = π / (2 AGM(1, 4/s)) - m ln 2 with s = f 2^m > 2^(bits/2)."""
+    wp = prec + len(str(prec))
+    with decimal.localcontext(decimal.Context(prec=wp)):
+        pi, _, _, ln2, _ = _reduction_constants(wp)
+        m = int(wp * math.log2(10) / 2) + 2
+        a, b = _ONE, 4 / (f * _TWO ** m)
+        eps = D(10) ** (4 - wp)
+        while abs(a - b) > eps * a: a, b = (a + b) / 2, (a * b).sqrt()
+        return pi / (a + b) - m * ln2
+
+@_memoized
+def ln(x, context):
+    if x <= 0: raise decimal.InvalidOperation("ln() requires a positive argument")
+    if x == 1: return context.plus(_ZERO)
+    prec = context.prec + _guard(context.prec)
+    exponent = x.adjusted()
+    with decimal.localcontext(decimal.Context(prec=prec + len(str(exponent)))):
+        f = x.scaleb(-exponent)                     # x = f * 10^exponent, 1 <= f < 10
+        if context.prec < AGM_THRESHOLD or (exponent == 0 and abs(f - 1) < D('0.1')):
+            result = _ln_near_one(f, prec)
+        else:
+            result = _ln_agm(f, prec)
+        if exponent: result += exponent * _reduction_constants(prec)[4]
+    return context.plus(result)
+
+@_memoized
+def log10(x, context):
+    if x > 0 and x.scaleb(-x.adjusted()) == 1: return context.plus(D(x.adjusted()))
+    if context.prec < NATIVE_THRESHOLD: return context.log10(x)
+    prec = context.prec + _guard(context.prec)
+    with decimal.localcontext(decimal.Context(prec=prec)):
+        result = ln(x, decimal.Context(prec=prec)) / _reduction_constants(prec)[4]
+    return context.plus(result)
@@ -0,0 +1,237 @@
+"""Function plots for Zenth, independent of Tk.
+
+The plane is cut into square tiles at discrete zoom levels, each level
+LEVELS_PER_OCTAVE steps finer than the one above it, so a tile keeps its
+content for as long as the level is shown. Panning reuses every tile already
+drawn; only tiles coming into view are new.
+
+Curves are sampled per tile column, shared by all the tiles stacked in it.
+Sampling starts uniform and is then refined in rounds: a segment is split
+where the curve bends away from its chord by more than TOLERANCE pixels or
+leaves its domain. All midpoints of a round are evaluated as one batch,
+vectorized with NumPy when it is installed (see table.float_function). A
+column can be drawn after the uniform round and refined later, which is how
+a zoom shows a sketch at once and sharpens it over the next frames.
+
+A tile is described as drawing operations in its own pixel coordinates;
+`render_image` turns them into a Pillow image, and a caller without Pillow
+can draw them as canvas items instead.
+"""
+import math
+from collections import OrderedDict
+
+import engine
+import table
+
+TILE_SIZE = 256             # px per side
+LEVELS_PER_OCTAVE = 4       # zoom levels per doubling of scale
+MIN_LEVEL, MAX_LEVEL = -160, 160
+INITIAL_SPACING = 8         # px between the uniform samples a column starts with
+MIN_SPACING = 0.25          # px; narrower segments are not split
+TOLERANCE = 0.5             # px a sample may stray from the chord of its neighbours
+MAX_DEPTH = 6               # refinement rounds per column
+SAMPLE_CACHE = 512          # sampled columns kept, per plot
+GRID_SPACING = 64           # px between grid lines, at least
+CURVE_WIDTH = 2
+COLORS = ('#4FC3F7', '#FF8A65', '#AED581', '#BA68C8', '#FFD54F', '#F06292')
+
+_MARGIN = CURVE_WIDTH       # px beyond the tile that segments are clipped to, so lines meet at edges
+
+
+_pillow = None
+
+def _load_pillow():
+    """Pillow's (Image, ImageDraw), imported on the first tile rendered, or False if it is not installed."""
+    global _pillow
+    if _pillow is None:
+        try:
+            from PIL import Image, ImageDraw
+            _pillow = (Image, ImageDraw)
+        except ImportError: _pillow = False
+    return _pillow
+
+
+def scale_at(level):
+    """World units per pixel at a zoom level."""
+    return 2.0 ** (level / LEVELS_PER_OCTAVE)
+
+def level_for(scale):
+    """The zoom level closest to `scale` world units per pixel."""
+    return max(MIN_LEVEL, min(MAX_LEVEL, round(math.log2(scale) * LEVELS_PER_OCTAVE)))
+
+def nice_step(minimum):
+    """The smallest 1, 2 or 5 times a power of ten that is at least `minimum`."""
+    power = 10.0 ** math.floor(math.log10(minimum))
+    for factor in (1, 2, 5, 10):
+        if factor * power >= minimum: return factor * power
+    return 10 * power
+
+
+class Curve:
+    """One expression in x, compiled to a batch float function."""
+    __slots__ = ('text', 'color', 'fn')
+
+    def __init__(self, text, color, names=None, variable=table.VARIABLE):
+        expression = engine.compile_expression(text)
+        self.text, self.color = expression.text, color
+        self.fn = table.float_function(text, variable, table.bind_names(expression, variable, names))
+
+
+class _Samples:
+    """The points of one curve over one tile column, refined a round at a time."""
+    __slots__ = ('fn', 'xs', 'ys', 'depth', 'done', 'min_width', 'tolerance', 'low', 'high', '_check')
+
+    def __init__(self, fn, x0, x1, scale):
+        count = max(2, round((x1 - x0) / scale / INITIAL_SPACING))
+        self.fn = fn
+        self.xs = [x0 + (x1 - x0) * i / count for i in range(count + 1)]
+        self.ys = fn(self.xs).tolist()
+        self.depth, self.done = 0, False
+        self.min_width, self.tolerance = MIN_SPACING * scale, TOLERANCE * scale
+        self.low, self.high = math.inf, -math.inf     # the band of y refined for so far
+        self._check = range(1, count)       # points whose neighbours changed since they were checked
+
+    def refine(self, depth=MAX_DEPTH, low=-math.inf, high=math.inf):
+        """Refine for drawing y in [low, high]; parts of the curve beyond it are left coarse."""
+        if low < self.low or high > self.high:
+            # A wider band can make points checked before worth splitting now
+            self.low, self.high = min(low, self.low), max(high, self.high)
+            self._check, self.depth, self.done = range(1, len(self.xs) - 1), 0, False
+        while self.depth < depth and not self.done:
+            split = self._to_split()
+            self.depth += 1
+            if not split: self.done = True; break
+            xs, ys = self.xs, self.ys
+            middles = [(xs[i] + xs[i + 1]) / 2 for i in split]
+            values = self.fn(middles).tolist()
+            new_xs, new_ys, start, check = [], [], 0, set()
+            for i, x, y in zip(split, middles, values):
+                new_xs += xs[start:i + 1]; new_ys += ys[start:i + 1]
+                check.update((len(new_xs) - 1, len(new_xs), len(new_xs) + 1))
+                new_xs.append(x); new_ys.append(y)
+                start = i + 1
+            self.xs, self.ys = new_xs + xs[start:], new_ys + ys[start:]
+            # Only the new points and their neighbours can need splitting next round
+            self._check = sorted(i for i in check if 0 < i < len(self.xs) - 1)
+        if self.depth >= MAX_DEPTH: self.done = True
+        return self
+
+    def _to_split(self):
+        """Indices of the segments to halve: both sides of a point that strays from the chord
+        of its neighbours, and segments where the curve enters or leaves its domain."""
+        xs, ys, isfinite, flagged = self.xs, self.ys, math.isfinite, set()
+        low, high = self.low, self.high
+        for i in self._check:
+            a, b, c = ys[i - 1], ys[i], ys[i + 1]
+            finite = isfinite(a) + isfinite(b) + isfinite(c)
+            if finite == 3:
+                if a < low and b < low and c < low or a > high and b > high and c > high: continue
+                chord = a + (c - a) * (xs[i] - xs[i - 1]) / (xs[i + 1] - xs[i - 1])
+                if abs(b - chord) <= self.tolerance: continue
+            elif not finite: continue
+            flagged.add(i - 1); flagged.add(i)
+        return sorted(i for i in flagged if xs[i + 1] - xs[i] > self.min_width)
+
+
+def sample(fn, x0, x1, scale, depth=MAX_DEPTH):
+    """(xs, ys) of y = fn(x) on [x0, x1], for drawing at `scale` world units per pixel."""
+    samples = _Samples(fn, x0, x1, scale).refine(depth)
+    return samples.xs, samples.ys
+
+
+def _clip(ax, ay, bx, by, low, high):
+    """The part of segment a-b inside the square [low, high]², or None (Liang-Barsky)."""
+    t0, t1, dx, dy = 0.0, 1.0, bx - ax, by - ay
+    for p, q in ((-dx, ax - low), (dx, high - ax), (-dy, ay - low), (dy, high - ay)):
+        if p == 0:
+            if q < 0: return None
+        else:
+            t = q / p
+            if p < 0:
+                if t > t1: return None
+                if t > t0: t0 = t
+            else:
+                if t < t0: return None
+                if t < t1: t1 = t
+    return ax + t0 * dx, ay + t0 * dy, ax + t1 * dx, ay + t1 * dy
+
+def _polylines(xs, ys, left, top, scale, min_width):
+    """Tile pixel polylines of the points, clipped to the tile. A line is broken where the
+    curve is undefined, and across a jump sampling could not resolve (an asymptote)."""
+    lines, line, last = [], None, None
+    low, high = -_MARGIN, TILE_SIZE + _MARGIN
+    isfinite = math.isfinite
+    for i in range(len(xs) - 1):
+        ya, yb = ys[i], ys[i + 1]
+        if not (isfinite(ya) and isfinite(yb)): continue
+        ax, ay, bx, by = xs[i] / scale - left, -ya / scale - top, xs[i + 1] / scale - left, -yb / scale - top
+        if abs(by - ay) > TILE_SIZE and xs[i + 1] - xs[i] <= 2 * min_width: continue
+        segment = _clip(ax, ay, bx, by, low, high)
+        if segment is None: continue
+        if line is None or (segment[0], segment[1]) != last:
+            line = [segment[0], segment[1]]
+            lines.append(line)
+        line += segment[2:]
+        last = (segment[2], segment[3])
+    return lines
+
+
+class Plot:
+    """Curves and the colours of the plane, drawn a tile at a time."""
+    def __init__(self, curves, background, grid, axis):
+        self.curves, self.background, self.grid, self.axis = curves, background, grid, axis
+        self._samples = OrderedDict()
+
+    def samples(self, index, level, column, band=None):
+        """The sampled column of curve `index`: sketched, or refined for y in band=(low, high)."""
+        key = (index, level, column)
+        samples = self._samples.get(key)
+        if samples is None:
+            scale = scale_at(level)
+            samples = self._samples[key] = _Samples(self.curves[index].fn, column * TILE_SIZE * scale, (column + 1) * TILE_SIZE * scale, scale)
+            if len(self._samples) > SAMPLE_CACHE: self._samples.popitem(last=False)
+        else: self._samples.move_to_end(key)
+        if band: samples.refine(MAX_DEPTH, *band)
+        return samples
+
+    def tile(self, level, column, row, refine=True):
+        """(drawing operations, final) for a tile. Operations are ('line', colour, width,
+        [x0, y0, x1, y1, ...]) and ('text', colour, (x, y), text) in tile pixels; final is
+        False while a curve is only sketched."""
+        scale, left, top = scale_at(level), column * TILE_SIZE, row * TILE_SIZE
+        ops, final = self._grid(scale, left, top), True
+        # Refined for the tile and a tile's height either side, so neighbours rarely need more
+        low, high = -(top + 2 * TILE_SIZE) * scale, -(top - TILE_SIZE) * scale
+        for index, curve in enumerate(self.curves):
+            samples = self.samples(index, level, column, (low, high) if refine else None)
+            final = final and samples.done and samples.low <= low and samples.high >= high
+            for line in _polylines(samples.xs, samples.ys, left, top, scale, samples.min_width):
+                ops.append(('line', curve.color, CURVE_WIDTH, line))
+        return ops, final
+
+    def _grid(self, scale, left, top):
+        """Grid lines, the axes and their labels crossing a tile."""
+        step = nice_step(GRID_SPACING * scale)
+        pixels = step / scale
+        ops, labels = [], []
+        axis_x, axis_y = -left, -top                # the axes, in tile pixels
+        for k in range(math.ceil(left / pixels), math.floor((left + TILE_SIZE) / pixels) + 1):
+            x = k * pixels - left
+            ops.append(('line', self.axis if k == 0 else self.grid, 1, [x, 0, x, TILE_SIZE]))
+            if k and 0 <= axis_y < TILE_SIZE: labels.append(('text', self.axis, (x + 2, axis_y + 2), f"{k * step:g}"))
+        for k in range(math.ceil(top / pixels), math.floor((top + TILE_SIZE) / pixels) + 1):
+            y = k * pixels - top
+            ops.append(('line', self.axis if k == 0 else self.grid, 1, [0, y, TILE_SIZE, y]))
+            if k and 0 <= axis_x < TILE_SIZE: labels.append(('text', self.axis, (axis_x + 2, y + 2), f"{-k * step:g}"))
+        return ops + labels
+
+
+def render_image(ops, background):
+    """A Pillow RGB image of a tile's drawing operations. Requires Pillow."""
+    Image, ImageDraw = _load_pillow()
+    image = Image.new('RGB', (TILE_SIZE, TILE_SIZE), background)
+    draw = ImageDraw.Draw(image)
+    for op in ops:
+        if op[0] == 'line': draw.line(op[3], fill=op[1], width=op[2], joint='curve')
+        else: draw.text(op[2], op[3], fill=op[1])
+    return image
@@ -0,0 +1,267 @@
+"""Startup timeline and runtime tracing for Zenth.
+
+Zenth.py imports this module first and marks each startup phase; the
+timeline is printed with --profile-startup. With --trace (or the debug
+overlay), `tracer` also records phase timings of calculations, slow Tk
+callbacks, event-loop stalls and memory samples, and can write them to a
+JSON trace file. With the flags absent, `mark` does nothing and `tracer`
+hands out a do-nothing span, so neither costs anything in normal use.
+"""
+import sys
+import time
+from collections import deque
+
+FLAG = '--profile-startup'
+_import_time = time.perf_counter()
+
+
+class Timeline:
+    """Named points in time, reported as per-phase and cumulative milliseconds."""
+    def __init__(self, enabled, start=None):
+        self.enabled = enabled
+        self.start = time.perf_counter() if start is None else start
+        self.marks = []
+
+    def mark(self, phase):
+        if self.enabled: self.marks.append((phase, time.perf_counter()))
+
+    def report(self, file=None):
+        """Print the timeline once; later marks are ignored."""
+        if not self.enabled: return
+        self.enabled = False
+        file = file or sys.stderr
+        print(f"{'phase':<20}{'ms':>9}{'total':>9}", file=file)
+        previous = self.start
+        for phase, when in self.marks:
+            print(f"{phase:<20}{(when - previous) * 1000:9.1f}{(when - self.start) * 1000:9.1f}", file=file)
+            previous = when
+
+
+startup = Timeline(FLAG in sys.argv, _import_time)
+
+
+# --- Runtime tracing, enabled with --trace or the debug overlay ---
+
+TRACE_FLAG = '--trace'
+TRACE_EVENTS = 5000         # newest events kept for the overlay and the trace file
+SLOW_CALLBACK = 16          # ms; Tk callbacks at least this long are recorded
+WATCHDOG_INTERVAL = 100     # ms between event-loop lag checks
+STALL_THRESHOLD = 50        # ms an after() timer may run late before it counts as a stall
+MEMORY_INTERVAL = 2000      # ms between memory samples
+
+
+class Span:
+    """One timed operation, split into phases: `phase(name)` closes the phase that ran
+    since the previous call (or the start)."""
+    __slots__ = ('name', 'args', 'started', 'last', 'phases')
+
+    def __init__(self, name, args):
+        self.name, self.args, self.phases = name, args, []
+        self.started = self.last = time.perf_counter()
+
+    def phase(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def finish(self, **args):
+        self.args.update(args)
+        tracer.add(self.name, self.started, time.perf_counter() - self.started, self.args, self.phases)
+
+
+class _NullSpan:
+    """Stands in for a Span while tracing is off, so hot paths need no checks."""
+    __slots__ = ()
+    def phase(self, name): pass
+    def finish(self, **args): pass
+
+NULL_SPAN = _NullSpan()
+
+
+def callback_name(func):
+    func = getattr(func, '__func__', func)
+    return getattr(func, '__qualname__', None) or repr(func)
+
+
+def deep_size(obj, _seen=None):
+    """Approximate bytes held by obj and everything it references through containers and slots."""
+    seen = set() if _seen is None else _seen
+    stack, total = [obj], 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, type): continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 0)
+        if isinstance(obj, dict): stack.extend(obj.keys()); stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)): stack.extend(obj)
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                if slot in ('__weakref__', '__dict__'): continue
+                try: stack.append(getattr(obj, slot))
+                except AttributeError: pass
+    return total
+
+
+class Tracer:
+    """Records spans, slow Tk callbacks, event-loop stalls and memory samples in a bounded
+    buffer. While disabled, `span()` returns NULL_SPAN and nothing else runs: the callback
+    timer is not installed and no watchdog or memory timer is pending."""
+    def __init__(self, enabled=False):
+        self.enabled = False
+        self.events = None
+        self.origin = time.perf_counter()
+        self.memory_source = None   # () -> {window: {tab: bytes}}, set by the app
+        self.memory = None          # last sample: (traced, peak, {window: {tab: bytes}})
+        self.lag = 0.0              # ms the watchdog's last timer ran late
+        self.max_lag = (0.0, None)  # (ms, blamed callback) of the worst stall
+        self._widget = None
+        self._jobs = []
+        self._slowest = None        # (ms, callback name) since the last watchdog tick
+        self._original_call = None
+        if enabled: self.enable()
+
+    def span(self, name, **args):
+        return Span(name, args) if self.enabled else NULL_SPAN
+
+    def add(self, name, started, duration, args=None, phases=()):
+        """Record a finished operation; times in perf_counter seconds."""
+        if self.enabled: self.events.append((name, started, duration, args or {}, tuple(phases)))
+
+    def job_callback(self, callback):
+        """Wrap a worker job's callback so the job's run time is recorded when it finishes."""
+        def record(job):
+            if self.enabled and job.started is not None and job.finished is not None:
+                ended = time.perf_counter() - (time.monotonic() - job.finished)
+                self.add('job', ended - (job.finished - job.started), job.finished - job.started,
+                         {'task': callback_name(job.func), 'state': job.state})
+            if callback: callback(job)
+        return record
+
+    def last(self, name):
+        """The newest recorded event called `name`, or None."""
+        for event in reversed(self.events or ()):
+            if event[0] == name: return event
+        return None
+
+    # --- Switching on and off ---
+
+    def enable(self, widget=None):
+        """Start recording. Tk callbacks registered from now on are timed, so tracing from
+        startup (--trace) covers every binding. With a widget, the watchdog starts too."""
+        if not self.enabled:
+            self.enabled = True
+            self.events = deque(maxlen=TRACE_EVENTS)
+            self.lag, self.max_lag, self.memory = 0.0, (0.0, None), None
+            self._install_callback_timer()
+            import tracemalloc
+            if not tracemalloc.is_tracing(): tracemalloc.start()
+        if widget is not None and self._widget is None: self.watch(widget)
+
+    def disable(self):
+        """Stop recording and tracemalloc; recorded events stay readable until the next enable."""
+        if not self.enabled: return
+        self.enabled = False
+        self._remove_callback_timer()
+        for job in self._jobs:
+            try: self._widget.after_cancel(job)
+            except Exception: pass
+        self._jobs, self._widget = [], None
+        import tracemalloc
+        tracemalloc.stop()
+
+    def _install_callback_timer(self):
+        import tkinter
+        if self._original_call is not None: return
+        original = self._original_call = tkinter.CallWrapper.__call__
+        tracer = self
+
+        def timed_call(wrapper, *args):
+            started = time.perf_counter()
+            try: return original(wrapper, *args)
+            finally: tracer._callback_done(wrapper.func, started)
+        tkinter.CallWrapper.__call__ = timed_call
+
+    def _remove_callback_timer(self):
+        import tkinter
+        if self._original_call is None: return
+        tkinter.CallWrapper.__call__, self._original_call = self._original_call, None
+
+    def _callback_done(self, func, started):
+        if not self.enabled: return
+        duration = time.perf_counter() - started
+        if duration * 1000 < SLOW_CALLBACK: return
+        name = callback_name(func)
+        self.events.append(('callback', started, duration, {'callback': name}, ()))
+        if self._slowest is None or duration * 1000 > self._slowest[0]: self._slowest = (duration * 1000, name)
+
+    # --- Watchdog and memory ---
+
+    def watch(self, widget):
+        """Time `after()` timers on widget's event loop; a timer running late by more than
+        STALL_THRESHOLD is recorded as a stall, blamed on the slowest callback since the last
+        tick (or on Tk itself, such as a redraw, when no Python callback was slow)."""
+        self._widget = widget
+        self._jobs = [None, None]
+        self._schedule_watchdog(time.perf_counter())
+        self._sample_memory()
+
+    def _schedule_watchdog(self, now):
+        self._jobs[0] = self._widget.after(WATCHDOG_INTERVAL, self._watchdog, now + WATCHDOG_INTERVAL / 1000)
+
+    def _watchdog(self, due):
+        now = time.perf_counter()
+        self.lag = max(0.0, (now - due) * 1000)
+        if self.lag >= STALL_THRESHOLD:
+            blamed = self._slowest[1] if self._slowest else 'Tk (redraw or event handling)'
+            self.events.append(('stall', due, now - due, {'callback': blamed}, ()))
+            if self.lag > self.max_lag[0]: self.max_lag = (self.lag, blamed)
+        self._slowest = None
+        if self.enabled: self._schedule_watchdog(now)
+
+    def _sample_memory(self):
+        import tracemalloc
+        traced, peak = tracemalloc.get_traced_memory()
+        tabs = self.memory_source() if self.memory_source else {}
+        self.memory = (traced, peak, tabs)
+        self.events.append(('memory', time.perf_counter(), 0.0, {'traced': traced, 'peak': peak,
+                            'windows': {window: sum(sizes.values()) for window, sizes in tabs.items()}}, ()))
+        if self.enabled: self._jobs[1] = self._widget.after(MEMORY_INTERVAL, self._sample_memory)
+
+    def describe(self, event):
+        """One line for the overlay: name, total ms and its phases."""
+        name, _, duration, args, phases = event
+        line = f"{name:<10}{duration * 1000:8.1f} ms"
+        if phases: line += ': ' + ' · '.join(f"{phase} {length * 1000:.1f}" for phase, length in phases)
+        extra = ', '.join(f"{key} {value}" for key, value in args.items() if key not in ('tab', 'callback'))
+        return f"{line} | {extra}" if extra else line
+
+    # --- Trace file ---
+
+    def trace_events(self):
+        """The recorded events in Chrome's trace event format (chrome://tracing, Perfetto)."""
+        def us(seconds): return round((seconds - self.origin) * 1e6, 1)
+        out = []
+        for name, started, duration, args, phases in self.events or ():
+            if name == 'memory':
+                counters = {'traced': args['traced'], 'peak': args['peak']}
+                counters.update(args['windows'])
+                out.append({'name': 'memory', 'ph': 'C', 'ts': us(started), 'pid': 1, 'tid': 1, 'args': counters})
+                continue
+            out.append({'name': name, 'ph': 'X', 'ts': us(started), 'dur': round(duration * 1e6, 1), 'pid': 1, 'tid': 1, 'args': args})
+            at = started
+            for phase, length in phases:
+                out.append({'name': phase, 'ph': 'X', 'ts': us(at), 'dur': round(length * 1e6, 1), 'pid': 1, 'tid': 1})
+                at += length
+        return out
+
+    def dump(self, path):
+        """Write the recorded events to path as a JSON trace file."""
+        import appdata
+        import json
+        appdata.atomic_write(path, json.dumps({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}))
+        return path
+
+
+# Enabled for --trace by the GUI's entry point, not here: pool workers re-import Zenth.py
+# with the parent's argv, and must not trace the work being measured
+tracer = Tracer()
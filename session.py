@@ -0,0 +1,112 @@
+"""Saved windows and tabs, so Zenth reopens the way it was left.
+
+A session is a directory in the data directory holding a small manifest
+(windows, their geometry and keybinds, and each tab's id and name) and one
+file per tab with its expression, previous result, precision, and the
+variables and result it defined in the workspace with their `ans`. Autosave
+only rewrites the files of tabs that changed, plus the manifest when it
+differs. Files are written atomically by a background thread that merges
+queued saves, so the Tk thread never waits on the disk. Restoring reads
+only the manifest; each tab's file is read when the tab is first shown.
+"""
+import json
+import os
+import threading
+
+import appdata
+
+VERSION = 1
+MANIFEST = 'session.json'
+_TAB_PREFIX, _TAB_SUFFIX = 'tab-', '.json'
+
+
+def new_tab_id():
+    return os.urandom(6).hex()
+
+
+def _tab_file(tab_id):
+    return f"{_TAB_PREFIX}{tab_id}{_TAB_SUFFIX}"
+
+
+class SessionStore:
+    """Reads a saved session and writes changes to it from a background thread."""
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._pending = {}          # file name -> data to write, or None to delete
+        self._cond = threading.Condition()
+        self._writer = None
+        self._stopping = False
+
+    def _dir(self):
+        if self.directory is None: self.directory = appdata.data_dir('session')
+        return self.directory
+
+    # --- Reading (Tk thread) ---
+
+    def load(self):
+        """The saved manifest, or None if there is none or it cannot be used.
+        Tab files the manifest no longer lists are removed."""
+        try:
+            with open(os.path.join(self._dir(), MANIFEST), encoding='utf-8') as f: manifest = json.load(f)
+            if manifest.get('version') != VERSION: return None
+            listed = {_tab_file(tab_id) for window in manifest['windows'] for tab_id, _ in window['tabs']}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError): return None
+        try:
+            for name in os.listdir(self.directory):
+                if name.startswith(_TAB_PREFIX) and name not in listed: os.remove(os.path.join(self.directory, name))
+        except OSError: pass
+        return manifest
+
+    def load_tab(self, tab_id):
+        """(expression, previous, precision, rounding, answer, definitions) of a saved tab,
+        or None. Definitions are [variable or None, expression, ans or None, time] lists;
+        files written before tabs kept their definitions have none."""
+        try:
+            with open(os.path.join(self._dir(), _tab_file(tab_id)), encoding='utf-8') as f:
+                expression, previous, prec, rounding, answer, definitions = (json.load(f) + [None, []])[:6]
+            definitions = [[None if target is None else str(target), str(text), None if ans is None else str(ans), float(stamp)]
+                           for target, text, ans, stamp in definitions]
+            return str(expression), str(previous), int(prec), str(rounding), None if answer is None else str(answer), definitions
+        except (OSError, ValueError, TypeError): return None
+
+    # --- Writing ---
+
+    def save(self, manifest=None, tabs=None, removed=()):
+        """Queue a new manifest, changed tabs ({tab_id: state}) and closed tab ids.
+        Returns at once; saves queued before the writer gets to them are merged."""
+        with self._cond:
+            for tab_id, state in (tabs or {}).items(): self._pending[_tab_file(tab_id)] = state
+            for tab_id in removed: self._pending[_tab_file(tab_id)] = None
+            if manifest is not None: self._pending[MANIFEST] = dict(manifest, version=VERSION)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run_writer, name='zenth-session', daemon=True)
+                self._writer.start()
+            self._cond.notify()
+
+    def close(self):
+        """Write out everything queued and stop the writer thread."""
+        if self._writer is None: return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._writer.join()
+        self._writer, self._stopping = None, False
+
+    def _run_writer(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping: self._cond.wait()
+                pending, self._pending = self._pending, {}
+                stopping = self._stopping
+            # The manifest goes last, so it never lists a tab whose file is not written yet
+            manifest = pending.pop(MANIFEST, None)
+            for name, data in pending.items(): self._write(name, data)
+            if manifest is not None: self._write(MANIFEST, manifest)
+            if stopping: return
+
+    def _write(self, name, data):
+        try:
+            path = os.path.join(self._dir(), name)
+            if data is None: os.remove(path)
+            else: appdata.atomic_write(path, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+        except OSError: pass
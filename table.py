@@ -0,0 +1,273 @@
+"""Function tables for Zenth: one expression in x evaluated over many inputs.
+
+The inputs are a range (start, stop and step) or a pasted column of
+numbers. A table is evaluated in batches of consecutive rows, each sent to a
+worker process, and results are stored as the batches come back, so the
+first rows can be shown while the rest are still being computed.
+
+Float tables are evaluated a whole batch at a time with NumPy when it is
+installed: the expression tree is compiled into array operations, so a batch
+costs a few array passes however many rows it has. Without NumPy the same
+tree runs row by row on floats. Decimal tables run the engine on every row
+at the tab's precision. Nothing here imports tkinter.
+"""
+import csv
+import decimal
+import math
+import operator
+import re
+from array import array
+
+import engine
+
+FLOAT, DECIMAL = 'float', 'decimal'
+VARIABLE = 'x'
+MAX_ROWS = 10_000_000
+FLOAT_BATCH = 65536         # rows per worker round trip in float mode
+DECIMAL_BATCH = 2000        # and in Decimal mode, where each row is an engine evaluation
+FLOAT_DIGITS = 12           # significant digits shown for float results
+
+# Range steps are exact: start + i * step never rounds in this context
+_EXACT = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+_COUNT_TOLERANCE = decimal.Decimal('1e-30')
+_SEPARATORS_RE = re.compile(r'[\s;,]+')
+
+
+class TableError(ValueError):
+    """Raised for an unusable range or column."""
+
+
+_numpy = None
+
+def _load_numpy():
+    """The numpy module, imported on the first float batch, or False if it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try: import numpy as _numpy
+        except ImportError: _numpy = False
+    return _numpy
+
+
+def _exact(value):
+    """An int for an integral Decimal input, so integer inputs stay exact in Decimal mode."""
+    integer = engine.exact_literal(value)
+    return value if integer is None else integer
+
+
+# --- Inputs ---
+
+class Range:
+    """start, start + step, ... up to and including stop."""
+    __slots__ = ('start', 'stop', 'step', 'count')
+
+    def __init__(self, start, stop, step):
+        if not all(value.is_finite() for value in (start, stop, step)): raise TableError("The range must be finite")
+        if not step: raise TableError("The step cannot be 0")
+        if (stop - start) * step < 0: raise TableError("The step goes away from the end of the range")
+        self.start, self.stop, self.step = start, stop, step
+        # A step such as π/100 rarely divides the range exactly; a quotient within
+        # rounding error of a whole number still reaches stop
+        quotient = decimal.Context(prec=50).divide(stop - start, step)
+        nearest = quotient.to_integral_value()
+        steps = nearest if abs(quotient - nearest) <= _COUNT_TOLERANCE * max(1, nearest) else quotient.to_integral_value(decimal.ROUND_FLOOR)
+        count = int(steps) + 1
+        if count > MAX_ROWS: raise TableError(f"That range has {count:,} rows; the most is {MAX_ROWS:,}")
+        self.count = count
+
+    @classmethod
+    def parse(cls, start, stop, step, context):
+        """A range from three expressions, such as "0", "2*π" and "π/100", evaluated under context."""
+        return cls(*(engine.to_decimal(engine.compile_expression(text).evaluate(context)) for text in (start, stop, step)))
+
+    def __len__(self): return self.count
+
+    def part(self, first, count):
+        """(inputs, first) to send to a worker for rows first..first+count; a range sends itself."""
+        return self, first
+
+    def decimal_at(self, index): return _exact(_EXACT.fma(self.step, index, self.start))
+
+    def decimals(self, first, count):
+        fma, step, start = _EXACT.fma, self.step, self.start
+        return [_exact(fma(step, index, start)) for index in range(first, first + count)]
+
+    def floats(self, first, count):
+        start, step = float(self.start), float(self.step)
+        np = _load_numpy()
+        if np: return start + step * np.arange(first, first + count, dtype=float)
+        return array('d', [start + step * index for index in range(first, first + count)])
+
+
+class Column:
+    """Pasted values, one row each."""
+    __slots__ = ('values',)
+
+    def __init__(self, values):
+        if not values: raise TableError("The column has no values")
+        if len(values) > MAX_ROWS: raise TableError(f"The column has {len(values):,} values; the most is {MAX_ROWS:,}")
+        self.values = values
+
+    @classmethod
+    def parse(cls, text):
+        """Values separated by newlines, commas, semicolons or spaces."""
+        values = []
+        for token in _SEPARATORS_RE.split(text.strip()):
+            if not token: continue
+            try: value = decimal.Decimal(token)
+            except decimal.InvalidOperation: raise TableError(f"{token[:20]!r} is not a number") from None
+            if not value.is_finite(): raise TableError(f"{token[:20]!r} is not a finite number")
+            values.append(value)
+        return cls(values)
+
+    def __len__(self): return len(self.values)
+
+    def part(self, first, count):
+        return Column(self.values[first:first + count]), 0
+
+    def decimal_at(self, index): return _exact(self.values[index])
+
+    def decimals(self, first, count): return [_exact(value) for value in self.values[first:first + count]]
+
+    def floats(self, first, count):
+        values = [float(value) for value in self.values[first:first + count]]
+        np = _load_numpy()
+        return np.array(values, dtype=float) if np else array('d', values)
+
+
+# --- Float evaluation ---
+
+def _float_power(a, b):
+    result = a ** b
+    return math.nan if type(result) is complex else result     # a negative base to a fractional power
+
+_SCALAR_OPS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv, '^': _float_power}
+
+def _vectorize(node, variable, names, np):
+    """Compile a tree into a function of x. With NumPy, x is an array of a batch's inputs
+    and each operation runs over all of them; otherwise x is one float."""
+    kind = type(node)
+    if kind is engine.Num:
+        value = float(node.value)
+        return lambda x: value
+    if kind is engine.Const:
+        return lambda x: math.pi
+    if kind is engine.Name:
+        if node.name == variable: return lambda x: x
+        value = names[node.name]
+        return lambda x: value
+    if kind is engine.Unary:
+        operand = _vectorize(node.operand, variable, names, np)
+        return operand if node.op == '+' else (lambda x: -operand(x))
+    left, right = _vectorize(node.left, variable, names, np), _vectorize(node.right, variable, names, np)
+    if np: op = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.true_divide, '^': np.power}[node.op]
+    else: op = _SCALAR_OPS[node.op]
+    return lambda x: op(left(x), right(x))
+
+def float_function(text, variable, names):
+    """f as a function of a batch of float inputs, returning a float64 array (NumPy's, or
+    array('d')). `names` binds every other name to a float. Inputs with no real value give
+    NaN; with NumPy, overflows and divisions by zero give ±inf."""
+    np = _load_numpy()
+    fn = _vectorize(engine.compile_expression(text).tree, variable, names, np)
+    if np:
+        def evaluate(values):
+            x = np.asarray(values, dtype=float)
+            with np.errstate(all='ignore'): y = fn(x)
+            # An expression without x gives one value for the whole batch
+            return np.array(np.broadcast_to(y, x.shape), dtype=float)
+        return evaluate
+    def evaluate(values):
+        results = array('d')
+        for x in values:
+            try: results.append(fn(x))
+            except ArithmeticError: results.append(math.nan)
+        return results
+    return evaluate
+
+def evaluate_floats(text, variable, values, names):
+    """f(x) for a batch of float inputs; see float_function."""
+    return float_function(text, variable, names)(values)
+
+
+def bind_names(expression, variable, names, mode=FLOAT):
+    """{name: value} for every name of a compiled expression except the variable, taken
+    from `names` once; floats in float mode."""
+    bound = {}
+    for name in expression.names - {variable}:
+        try: value = names[name]
+        except (KeyError, TypeError): raise engine.UndefinedName(name) from None
+        try: bound[name] = float(value) if mode == FLOAT else value
+        except OverflowError: raise TableError(f"{name} is too large for floats") from None
+    return bound
+
+
+# --- Tables ---
+
+class Table:
+    """The inputs of a table and the results received so far, in row order.
+
+    Results arrive a batch at a time and in any order; `ready(row)` says
+    whether a row's batch is in. Float results are kept in one float64 array,
+    Decimal results as display text.
+    """
+    def __init__(self, text, inputs, mode=FLOAT, variable=VARIABLE, names=None, context=None):
+        expression = engine.compile_expression(text)
+        self.text, self.inputs, self.mode, self.variable = expression.text, inputs, mode, variable
+        self.context = context or decimal.getcontext()
+        # Other names are bound once, from their values when the table is started
+        self.names = bind_names(expression, variable, names, mode)
+        count = len(inputs)
+        self.batch_size = FLOAT_BATCH if mode == FLOAT else DECIMAL_BATCH
+        if mode == FLOAT:
+            np = _load_numpy()
+            self.results = np.full(count, math.nan) if np else array('d', [math.nan]) * count
+        else: self.results = [None] * count
+        self.received = bytearray(-(-count // self.batch_size))
+        self.done = 0               # rows received
+
+    def __len__(self): return len(self.inputs)
+
+    @property
+    def complete(self): return self.done == len(self.inputs)
+
+    def batches(self):
+        """(first row, row count) of every batch, in order."""
+        count, size = len(self.inputs), self.batch_size
+        return [(first, min(size, count - first)) for first in range(0, count, size)]
+
+    def batch_args(self, first, count):
+        """Arguments for worker.table_batch_task to evaluate one batch. The inputs
+        themselves are generated in the worker."""
+        inputs, offset = self.inputs.part(first, count)
+        return self.mode, self.text, self.variable, inputs, offset, count, self.names, self.context
+
+    def store(self, first, results):
+        self.results[first:first + len(results)] = results
+        self.received[first // self.batch_size] = 1
+        self.done += len(results)
+
+    def ready(self, row): return bool(self.received[row // self.batch_size])
+
+    def row(self, index):
+        """(x, f(x)) as display text; f(x) is None while its batch is still running."""
+        if self.mode == FLOAT:
+            x = format(self.inputs.floats(index, 1)[0], f'.{FLOAT_DIGITS}g')
+            return x, format(float(self.results[index]), f'.{FLOAT_DIGITS}g') if self.ready(index) else None
+        return str(self.inputs.decimal_at(index)), self.results[index]
+
+    def write_csv(self, path):
+        """Write the received rows as CSV with an x, f(x) header. Floats are written
+        with every digit needed to read them back exactly. Returns the rows written."""
+        written = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow((self.variable, self.text))
+            for first, count in self.batches():
+                if not self.received[first // self.batch_size]: continue
+                if self.mode == FLOAT:
+                    xs, ys = self.inputs.floats(first, count).tolist(), self.results[first:first + count].tolist()
+                    writer.writerows(zip(map(repr, xs), map(repr, ys)))
+                else:
+                    writer.writerows(zip(map(str, self.inputs.decimals(first, count)), self.results[first:first + count]))
+                written += count
+        return written
@@ -0,0 +1,37 @@
+import json
+
+import zenth_cli
+
+
+def write_input(tmp_path, lines):
+    path = tmp_path / 'input.txt'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def test_read_expressions_skips_blanks_and_comments(tmp_path):
+    path = write_input(tmp_path, ['# heading', '1+1', '', '  2*3  '])
+    assert list(zenth_cli.read_expressions([path])) == [(2, '1+1'), (4, '2*3')]
+
+
+def test_results_in_input_order(tmp_path):
+    lines = [f"{i}^2" for i in range(40)] + ['1/0', '2^100', '1/3']
+    path, output = write_input(tmp_path, lines), tmp_path / 'out.jsonl'
+    code = zenth_cli.main([path, '-f', 'jsonl', '-o', str(output), '-j', '2', '--chunk-size', '7', '-p', '10'])
+    records = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert code == 1                        # one expression failed
+    assert [record['line'] for record in records] == list(range(1, len(lines) + 1))
+    assert [record['result'] for record in records[:40]] == [str(i * i) for i in range(40)]
+    assert 'error' in records[40]
+    assert records[41]['result'] == str(2 ** 100) and records[42]['result'] == '0.3333333333'
+
+
+def test_text_output(tmp_path, capsys):
+    assert zenth_cli.main([write_input(tmp_path, ['2+2', '7/2']), '-j', '1']) == 0
+    assert capsys.readouterr().out.splitlines() == ['4', '3.5']
+
+
+def test_unwritable_output(tmp_path, capsys):
+    path = write_input(tmp_path, ['1+1'])
+    assert zenth_cli.main([path, '-o', str(tmp_path / 'missing' / 'out.txt')]) == 2
+    assert capsys.readouterr().err.startswith('zenth: ')
@@ -0,0 +1,71 @@
+import decimal
+
+import cost
+import engine
+
+CONTEXT = decimal.Context(prec=100)
+
+
+def plan(text, context=CONTEXT, names=None):
+    return cost.plan(engine.compile_expression(text), context, names)
+
+
+def test_cheap_expressions_run_inline():
+    assert plan('2+2').route == cost.INLINE
+    assert plan('2^10000').route == cost.INLINE      # a shift
+    assert plan('x*2', names={'x': 3}).route == cost.INLINE
+
+
+def test_slow_decimal_work_goes_to_the_background():
+    result = plan('1/7', decimal.Context(prec=100000))
+    assert result.route == cost.BACKGROUND
+    assert cost.INLINE_SECONDS < result.seconds < cost.MAX_SECONDS
+
+
+def test_too_slow_is_refused_with_the_precision():
+    result = plan('1/7', decimal.Context(prec=3000000))
+    assert result.route == cost.REFUSE
+    assert '3,000,000 digits' in result.text
+
+
+def test_limits_move_the_thresholds():
+    expression = engine.compile_expression('1/7')
+    context = decimal.Context(prec=100000)
+    assert cost.plan(expression, context, limits=cost.Limits(inline_seconds=10)).route == cost.INLINE
+    assert cost.plan(expression, context, limits=cost.Limits(max_seconds=0.01)).route == cost.REFUSE
+
+
+def test_overflow_is_approximated():
+    result = plan('9^9^9')
+    assert result.route == cost.APPROXIMATE
+    assert result.text == '≈ 4.2812 × 10^369693099'
+    assert plan('2^(10^8)').route == cost.APPROXIMATE
+
+
+def test_underflow_is_refused():
+    result = plan('0.5^9^9^9')
+    assert result.route == cost.REFUSE
+    assert 'close to zero' in result.text
+
+
+def test_unknown_values_are_left_to_evaluation():
+    assert plan('y+1').route == cost.INLINE
+    assert plan('1/0').route == cost.INLINE
+
+
+def test_plan_factorial():
+    assert cost.plan_factorial(1).route == cost.INLINE
+    assert cost.plan_factorial(10).route == cost.INLINE
+    assert cost.plan_factorial(10 ** 5).route == cost.BACKGROUND
+    assert cost.plan_factorial(10 ** 7).route == cost.APPROXIMATE
+    assert cost.plan_factorial(10 ** 300).route == cost.APPROXIMATE
+
+
+def test_plan_function():
+    assert cost.plan_function('sqrt', 100).route == cost.INLINE
+    assert cost.plan_function('π', 100).route == cost.INLINE
+    assert cost.plan_function('ln', 10000).route == cost.BACKGROUND
+    refused = cost.plan_function('ln', 100000)
+    assert refused.route == cost.REFUSE and '100,000 digits' in refused.text
+    # sin is costlier than sqrt at every precision
+    assert all(cost.plan_function('sin', p).seconds > cost.plan_function('sqrt', p).seconds for p in (100, 1000, 10000))
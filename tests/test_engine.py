@@ -0,0 +1,86 @@
+import decimal
+
+import pytest
+
+import engine
+
+CONTEXT = decimal.Context(prec=20)
+
+
+def evaluate(text, names=None):
+    return engine.evaluate(text, CONTEXT, names)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('-2^2', -4),           # unary minus binds looser than ^
+    ('(-2)^2', 4),
+    ('2^3^2', 512),         # ^ is right-associative
+    ('2**10', 1024),
+    ('2+3*4', 14),
+    ('(2+3)*4', 20),
+    ('10-4-3', 3),
+])
+def test_precedence(text, expected):
+    assert evaluate(text) == expected
+
+
+def test_integers_stay_exact():
+    value = evaluate('2^100 + 1')
+    assert type(value) is int and value == 2 ** 100 + 1
+    assert evaluate('3^200 - 3^200 + 1') == 1          # far beyond 20 digits, yet exact
+    assert type(evaluate('1e3 * 2')) is int
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('7/2', '3.5'),
+    ('6/3', '2'),           # division always leaves the exact path
+    ('2^-1', '0.5'),
+    ('10%', '0.1'),
+    ('0.1+0.2', '0.3'),
+])
+def test_decimal_results(text, expected):
+    value = evaluate(text)
+    assert type(value) is decimal.Decimal and value == decimal.Decimal(expected)
+
+
+def test_decimal_rounds_to_context():
+    assert evaluate('1/3') == decimal.Decimal('0.33333333333333333333')
+    assert evaluate('π') == decimal.Decimal('3.1415926535897932385')
+
+
+def test_exact_power_fits():
+    assert engine.exact_power_fits(1, 10 ** 9)
+    assert engine.exact_power_fits(2, engine.EXACT_MAX_BITS - 1)
+    assert not engine.exact_power_fits(2, engine.EXACT_MAX_BITS)
+    assert engine.exact_power_fits(5, 10, max_bits=100)
+    assert not engine.exact_power_fits(5, 100, max_bits=100)
+
+
+def test_power_beyond_exact_limit_is_decimal():
+    value = engine._power(3, 100, max_bits=64)
+    assert type(value) is decimal.Decimal
+    assert engine._power(4, 10) == 1 << 20       # powers of two are shifts
+
+
+def test_names_and_undefined():
+    expression = engine.compile_expression('x^2 + y')
+    assert expression.names == {'x', 'y'}
+    assert expression.evaluate(CONTEXT, {'x': 3, 'y': decimal.Decimal('0.5')}) == decimal.Decimal('9.5')
+    with pytest.raises(engine.UndefinedName):
+        expression.evaluate(CONTEXT, {'x': 3})
+
+
+@pytest.mark.parametrize('text', ['2*(3+4', '2+', '3 $ 4', ')'])
+def test_parse_errors(text):
+    with pytest.raises(engine.ParseError):
+        evaluate(text)
+
+
+def test_compile_cache_normalizes():
+    assert engine.compile_expression('2+3') is engine.compile_expression(' 2 + 3 ')
+
+
+def test_evaluate_stable_refines_cancellation():
+    expression, context = engine.compile_expression('1e8+0.5-1e8'), decimal.Context(prec=3)
+    assert expression.evaluate(context) == 0
+    assert expression.evaluate_stable(context) == decimal.Decimal('0.5')
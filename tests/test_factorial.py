@@ -0,0 +1,62 @@
+import decimal
+import math
+
+import pytest
+
+import constants
+import factorial
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(factorial, '_cache', factorial.FactorialCache())
+
+
+@pytest.mark.parametrize('n', [0, 1, 5, 31, 32, 33, 999, 1000, 5000])
+def test_factorial(n):
+    assert factorial.factorial(n) == math.factorial(n)
+
+
+def test_resumes_from_a_cached_factorial():
+    factorial.factorial(3000)
+    assert factorial._cache.nearest_below(4000)[0] == 3000
+    assert factorial.factorial(4000) == math.factorial(4000)
+    assert len(factorial._cache) == 2
+
+
+def test_cache_is_capped():
+    cache = factorial.FactorialCache(max_bytes=8000)
+    for n in (1000, 2000, 3000, 4000):
+        cache.put(n, math.factorial(n))
+    assert cache.size <= 8000
+    assert cache.get(1000) is None and cache.get(4000) == math.factorial(4000)
+    cache.put(10 ** 4, math.factorial(10 ** 4))     # larger than the whole cache: not kept
+    assert cache.get(10 ** 4) is None
+
+
+def test_range_product():
+    assert factorial.range_product(1, 101) == math.factorial(100)
+    assert factorial.range_product(1, 200, 2) == math.prod(range(1, 200, 2))
+    assert factorial.range_product(5, 5) == 1
+
+
+def test_double_factorial():
+    assert [factorial.double_factorial(n) for n in range(-1, 9)] == [1, 1, 1, 2, 3, 8, 15, 48, 105, 384]
+    assert factorial.double_factorial(2001) == math.prod(range(1, 2002, 2))
+    with pytest.raises(ValueError):
+        factorial.double_factorial(-2)
+
+
+def test_negative():
+    with pytest.raises(ValueError):
+        factorial.factorial(-1)
+
+
+def test_gamma():
+    context = decimal.Context(prec=40)
+    assert factorial.gamma(5, context) == 24
+    half = factorial.gamma(decimal.Decimal('0.5'), context)
+    assert abs(context.multiply(half, half) - constants.pi(40)) < decimal.Decimal('1e-38')
+    assert abs(context.fma(2, half, factorial.gamma(decimal.Decimal('-0.5'), context))) < decimal.Decimal('1e-38')
+    with pytest.raises(ValueError):
+        factorial.gamma(0, context)
@@ -0,0 +1,84 @@
+import pytest
+
+import history
+
+ENTRIES = [('2^10', '1,024'), ('sqrt(2)', '1.41421356'), ('x = 12*4', '48'), ('100%', '1'), ('12/4', '3')]
+
+
+@pytest.fixture(params=['index', 'like'])
+def store(request, tmp_path):
+    store = history.HistoryStore(str(tmp_path / 'history.sqlite3'))
+    store.open()
+    if request.param == 'like': store._fts = None      # as where SQLite has no FTS5
+    for expression, result in ENTRIES: store.add(expression, result, tab='Calc 1')
+    store.flush()
+    yield store
+    store.close()
+
+
+def expressions(entries): return [entry.expression for entry in entries]
+
+
+def test_newest_first(store):
+    assert store.count() == len(ENTRIES)
+    assert expressions(store.page(0, 2)) == ['12/4', '100%']
+    assert expressions(store.page(3, 10)) == ['sqrt(2)', '2^10']
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('12', ['12/4', 'x = 12*4']),
+    ('12*', ['x = 12*4']),
+    ('SQRT', ['sqrt(2)']),          # case-insensitive
+    ('1.414', ['sqrt(2)']),         # the start of the result is searched too
+    ('%', ['100%']),                # LIKE wildcards are matched literally
+    ('2^', ['2^10']),
+    ('nothing', []),
+])
+def test_search(store, query, expected):
+    if store._fts == 'unicode61' and not query.isalnum(): pytest.skip("word tokens do not match punctuation")
+    assert expressions(store.page(0, 10, query)) == expected
+    assert store.count(query) == len(expected)
+
+
+def test_longer_queries_narrow_shorter_ones(store):
+    # A query reaching the trigram length must not bring back rows its prefix had hidden
+    for short, longer in (('2', '2^1'), ('12', '12*')):
+        assert set(expressions(store.page(0, 10, longer))) <= set(expressions(store.page(0, 10, short)))
+
+
+def test_pending_entries_are_read_before_commit(tmp_path):
+    store = history.HistoryStore(str(tmp_path / 'history.sqlite3'))
+    seen = []
+    store.listeners.append(seen.append)
+    store.add('1+1', '2')
+    store.add('2+2', '4')
+    # Whether or not the writer has committed them yet, each entry is seen once
+    assert store.count() == 2
+    assert expressions(store.page(0, 10)) == ['2+2', '1+1']
+    assert expressions(store.page(0, 10, '2+2')) == ['2+2']
+    assert [entry.expression for entry in seen] == ['1+1', '2+2']
+    store.flush()
+    assert store.count() == 2 and all(entry.id for entry in store.page(0, 10))
+    store.close()
+
+
+def test_clear(store):
+    seen = []
+    store.listeners.append(seen.append)
+    store.clear()
+    assert store.count() == 0 and store.page(0, 10) == []
+    store.add('3*3', '9')
+    assert expressions(store.page(0, 10)) == ['3*3']
+    store.flush()
+    assert store.count() == 1 and seen[0] is None
+
+
+@pytest.mark.parametrize('name', ['history.csv', 'history.jsonl'])
+def test_export_import(store, tmp_path, name):
+    path = str(tmp_path / name)
+    assert store.export_file(path, '12') == 2
+    store.clear()
+    store.import_file(path)
+    store.flush()
+    assert expressions(store.page(0, 10)) == ['12/4', 'x = 12*4']
+    assert store.page(0, 1)[0].tab == 'Calc 1'
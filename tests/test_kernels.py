@@ -0,0 +1,83 @@
+import decimal
+
+import pytest
+
+import constants
+import kernels
+
+D = decimal.Decimal
+
+
+@pytest.fixture(autouse=True)
+def no_disk_cache(monkeypatch):
+    monkeypatch.setattr(constants, 'DISK_CACHE_ENABLED', False)
+    kernels.clear_memo()
+
+
+def reference_trig(x, prec):
+    """Plain Taylor series at generous precision, from the decimal module's recipes."""
+    with decimal.localcontext(decimal.Context(prec=prec + 20)):
+        x = x % (2 * constants.pi(prec + 20))
+        sin, cos, term_s, term_c, n = D(0), D(0), x, D(1), 0
+        while term_s or term_c:
+            sin, cos = sin + term_s, cos + term_c
+            term_s = -term_s * x * x / ((2 * n + 2) * (2 * n + 3))
+            term_c = -term_c * x * x / ((2 * n + 1) * (2 * n + 2))
+            n += 1
+            if abs(term_s) < D(10) ** -(prec + 15) and abs(term_c) < D(10) ** -(prec + 15): break
+        return sin, cos, sin / cos
+
+
+def close(value, expected, prec):
+    """Within one unit in the last of `prec` digits."""
+    with decimal.localcontext(decimal.Context(prec=2 * prec + 20)):
+        return abs(value - expected) <= abs(expected).scaleb(-prec + 1) if expected else abs(value) < D(10) ** -prec
+
+
+@pytest.mark.parametrize('prec', [30, 250, 600])
+@pytest.mark.parametrize('x', ['0.5', '-2', '10', '1234.5678'])
+def test_sin_cos_tan(prec, x):
+    context = decimal.Context(prec=prec)
+    sin, cos, tan = reference_trig(D(x), prec)
+    assert close(kernels.sin(D(x), context), sin, prec)
+    assert close(kernels.cos(D(x), context), cos, prec)
+    assert close(kernels.tan(D(x), context), tan, prec)
+
+
+@pytest.mark.parametrize('prec', [30, 250, 600])
+@pytest.mark.parametrize('x', ['0.001', '0.95', '2', '12345.678', '1e-50', '7e300'])
+def test_ln_log10_exp_match_decimal(prec, x):
+    context = decimal.Context(prec=prec)
+    assert close(kernels.ln(D(x), context), context.ln(D(x)), prec)
+    assert close(kernels.log10(D(x), context), context.log10(D(x)), prec)
+    if D(x) < 1000: assert close(kernels.exp(D(x), context), context.exp(D(x)), prec)
+
+
+def test_atan():
+    context = decimal.Context(prec=50)
+    assert close(context.multiply(4, kernels.atan(D(1), context)), constants.pi(50), 49)
+    assert close(kernels.atan(D(-3), context), context.subtract(kernels.atan(context.divide(1, 3), context), context.divide(constants.pi(50), 2)), 49)
+
+
+def test_degrees_are_exact_where_expected():
+    context = decimal.Context(prec=30)
+    assert kernels.sin_degrees(D(30), context) == D('0.5')
+    assert kernels.sin_degrees(D(-90), context) == -1
+    assert kernels.cos_degrees(D(720), context) == 1
+    assert kernels.tan_degrees(D(225), context) == 1
+    assert kernels.tan_degrees(D(180), context) == 0
+    with pytest.raises(decimal.InvalidOperation):
+        kernels.tan_degrees(D(90), context)
+
+
+def test_domain_errors():
+    context = decimal.Context(prec=30)
+    with pytest.raises(decimal.InvalidOperation):
+        kernels.ln(D(0), context)
+    with pytest.raises(decimal.InvalidOperation):
+        kernels.ln(D(-1), context)
+
+
+def test_pi():
+    assert str(constants.pi(50)) == '3.1415926535897932384626433832795028841971693993751'
+    assert constants.pi(20) == decimal.Context(prec=20).plus(constants.pi(50))
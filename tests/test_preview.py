@@ -0,0 +1,39 @@
+import decimal
+
+import pytest
+
+import engine
+
+CONTEXT = decimal.Context(prec=12)
+
+
+@pytest.mark.parametrize('text', ['2^400', '-2^2', '7/2', '10%', '2*3+4', '1.5*2', '(1+2)*(3+4)/5', '2^-3', 'x^2+1'])
+def test_preview_matches_evaluate(text):
+    names = {'x': 5}
+    preview = engine.IncrementalEvaluator(CONTEXT, names=names).evaluate(text)
+    final = engine.evaluate(text, CONTEXT, names)
+    assert preview == final and type(preview) is type(final)
+
+
+def test_large_powers_stay_decimal():
+    value = engine.IncrementalEvaluator(CONTEXT).evaluate('3^100000')
+    assert type(value) is decimal.Decimal
+
+
+def test_closes_parentheses():
+    assert engine.IncrementalEvaluator(CONTEXT).evaluate('(2+3)*(4') == 20
+
+
+def test_typing_reuses_spans():
+    evaluator = engine.IncrementalEvaluator(CONTEXT)
+    text = '+'.join(str(i) for i in range(200))
+    evaluator.evaluate(text[:-1])
+    assert evaluator.evaluate(text) == sum(range(200))
+    assert evaluator.computed < 10
+
+
+def test_parse_error_then_recovers():
+    evaluator = engine.IncrementalEvaluator(CONTEXT)
+    with pytest.raises(engine.ParseError):
+        evaluator.evaluate('2+')
+    assert evaluator.evaluate('2+3') == 5
@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+import session
+
+
+@pytest.fixture
+def store(tmp_path):
+    return session.SessionStore(str(tmp_path))
+
+
+def test_round_trip(store):
+    definitions = [['x', ' 2^100', None, 1.0], [None, 'x + ans', '5', 2.0]]
+    manifest = {'windows': [{'tabs': [['a1', 'Calc 1'], ['b2', 'Calc 2']]}]}
+    store.save(manifest, {'a1': ('1+1', '2 =', 50, 'ROUND_HALF_EVEN', '2', definitions),
+                          'b2': ('', '', 100, 'ROUND_DOWN', None, [])})
+    store.close()
+    assert store.load()['windows'] == manifest['windows']
+    assert store.load_tab('a1') == ('1+1', '2 =', 50, 'ROUND_HALF_EVEN', '2', definitions)
+    assert store.load_tab('b2') == ('', '', 100, 'ROUND_DOWN', None, [])
+    assert store.load_tab('missing') is None
+
+
+def test_old_tab_files_have_no_definitions(store, tmp_path):
+    (tmp_path / 'tab-old.json').write_text(json.dumps(['1+1', '', 100, 'ROUND_HALF_EVEN']))
+    assert store.load_tab('old') == ('1+1', '', 100, 'ROUND_HALF_EVEN', None, [])
+
+
+def test_unlisted_and_closed_tabs_are_removed(store, tmp_path):
+    state = ('', '', 100, 'ROUND_HALF_EVEN', None, [])
+    store.save({'windows': [{'tabs': [['a1', 'A'], ['b2', 'B']]}]}, {'a1': state, 'b2': state, 'c3': state})
+    store.save({'windows': [{'tabs': [['a1', 'A']]}]}, removed=['b2'])
+    store.close()
+    assert not os.path.exists(tmp_path / 'tab-b2.json')
+    store.load()
+    assert sorted(os.listdir(tmp_path)) == ['session.json', 'tab-a1.json']
+
+
+def test_unusable_manifest(store, tmp_path):
+    assert store.load() is None
+    (tmp_path / 'session.json').write_text('{"version": 0, "windows": []}')
+    assert store.load() is None
+    (tmp_path / 'session.json').write_text('not json')
+    assert store.load() is None
+
+
+def test_workspace_definitions_are_restored(store):
+    Zenth = pytest.importorskip('Zenth')      # tkinter is imported, but no window is opened
+    import workspace
+    recalculator = Zenth.Recalculator(workspace.Workspace())
+    a, b = Zenth.TabModel('A'), Zenth.TabModel('B')
+    recalculator.define(a, 'x', ' 2^100')
+    recalculator.define(b, None, 'x + 1')
+    recalculator.define(a, 'y', ' x*3')
+    recalculator.define(a, 'x', ' 7')
+    store.save(tabs={a.key: a.state(), b.key: b.state()})
+    store.close()
+
+    restored = Zenth.Recalculator(workspace.Workspace())
+    a2, b2 = Zenth.TabModel('A', key=a.key), Zenth.TabModel('B', key=b.key)
+    b2.restore(store.load_tab(b.key))
+    assert restored.restore(b2)             # x is defined in A, which is not read yet
+    a2.restore(store.load_tab(a.key))
+    assert not restored.restore(a2)
+    cells = restored.cells
+    assert {key: cell.text for key, cell in cells.cells.items()} == {
+        'var:x': ' 7', 'var:y': ' x*3', a.key: 'x', b.key: 'x + 1'}
+    assert cells.cells[b.key].deps == {'var:x'}
+    assert restored.statements[a.key] == 'x = 7'
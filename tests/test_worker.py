@@ -0,0 +1,91 @@
+import decimal
+import os
+import threading
+import time
+
+import pytest
+
+import bignum
+import worker
+
+CONTEXT = decimal.Context(prec=30)
+
+
+@pytest.fixture
+def pool():
+    pool = worker.EvaluationWorker(processes=2, timeout=30)
+    yield pool
+    pool.shutdown()
+
+
+def run(pool, *jobs, limit=30):
+    deadline = time.monotonic() + limit
+    while any(job.active for job in jobs) and time.monotonic() < deadline: pool.wait(1)
+    return jobs
+
+
+def test_results_and_callbacks(pool):
+    done = []
+    exact = pool.submit(worker.evaluate_cell_task, '2^100', CONTEXT, {}, callback=done.append)
+    decimal_ = pool.submit(worker.evaluate_cell_task, 'x/3', CONTEXT, {'x': 1})
+    run(pool, exact, decimal_)
+    assert exact.state == worker.DONE and done == [exact]
+    value, result = exact.result
+    assert value == 2 ** 100 and isinstance(result, bignum.BigResult)
+    assert decimal_.result[1] == '0.' + '3' * 30
+
+
+def test_scientific_tasks(pool):
+    sqrt = pool.submit(worker.function_task, 'sqrt', decimal.Decimal(2), CONTEXT)
+    sin = pool.submit(worker.function_task, 'sin', decimal.Decimal(30), CONTEXT)
+    pi = pool.submit(worker.pi_task, 30)
+    run(pool, sqrt, sin, pi)
+    assert sqrt.result == str(CONTEXT.sqrt(2))
+    assert decimal.Decimal(sin.result) == decimal.Decimal('0.5')
+    assert pi.result == '3.14159265358979323846264338328'
+
+
+def test_errors(pool):
+    job, = run(pool, pool.submit(worker.evaluate_cell_task, '1/0', CONTEXT, {}))
+    assert job.state == worker.FAILED and job.error == 'DivisionByZero'
+
+
+def test_timeout_and_recovery(pool):
+    slow = pool.submit(time.sleep, 20, timeout=0.5)
+    run(pool, slow)
+    assert slow.state == worker.TIMED_OUT
+    job, = run(pool, pool.submit(worker.evaluate_cell_task, '1+1', CONTEXT, {}))
+    assert job.result[0] == 2
+
+
+def test_cancel(pool):
+    running = pool.submit(time.sleep, 20)
+    queued = [pool.submit(time.sleep, 20) for _ in range(2)]
+    pool.cancel(running)
+    pool.cancel(queued[-1])
+    assert running.state == queued[-1].state == worker.CANCELLED
+    assert queued[0].state == worker.RUNNING        # it took the freed slot
+    pool.cancel(queued[0])
+    assert not pool.pending
+
+
+def test_crashed_worker(pool):
+    job, = run(pool, pool.submit(os._exit, 3))
+    assert job.state == worker.FAILED and 'exited' in job.error
+
+
+def test_unpicklable_job_fails_alone(pool):
+    lock = threading.Lock()
+    bad = pool.submit(worker.evaluate_cell_task, '1', CONTEXT, {'x': lock})
+    good = pool.submit(worker.evaluate_cell_task, '1+2', CONTEXT, {})
+    assert bad.state == worker.FAILED and 'pickle' in bad.error
+    assert bad in pool.poll()           # reported like any finished job
+    run(pool, good)
+    assert good.state == worker.DONE and good.result[0] == 3
+
+
+def test_format_preview():
+    assert worker.format_preview(2 ** 10, 12) == '1,024'
+    assert worker.format_preview(decimal.Decimal('2.500'), 12) == '2.5'
+    assert worker.format_preview(decimal.Decimal('1E+5'), 12) == '100,000'
+    assert worker.format_preview(10 ** 100, 12).endswith('E+100')
@@ -0,0 +1,104 @@
+import decimal
+
+import pytest
+
+import engine
+import workspace
+
+CONTEXT = decimal.Context(prec=20)
+
+
+def compute(cells):
+    """Evaluate ready cells until none are dirty, as the recalculator does; returns the keys in order."""
+    order, ready = [], cells.ready()
+    while ready:
+        cell = ready.pop()
+        order.append(cell.key)
+        try: value = cell.expression.evaluate(cell.context, cells.inputs(cell.key))
+        except (workspace.InputError, engine.UndefinedName) as exc: ready.extend(cells.set_result(cell.key, error=str(exc)))
+        else: ready.extend(cells.set_result(cell.key, value))
+    return order
+
+
+@pytest.fixture
+def cells():
+    cells = workspace.Workspace()
+    cells.define('var:a', '2', CONTEXT, name='a')
+    cells.define('var:b', 'a * 10', CONTEXT, name='b')
+    cells.define('var:c', 'b + a', CONTEXT, name='c')
+    cells.define('tab', 'c / 4', CONTEXT)
+    compute(cells)
+    return cells
+
+
+def test_values(cells):
+    assert [cells.cells[key].value for key in ('var:a', 'var:b', 'var:c', 'tab')] == [2, 20, 22, decimal.Decimal('5.5')]
+    assert not any(cell.dirty for cell in cells.cells.values())
+
+
+def test_redefinition_marks_downstream_dirty_in_order(cells):
+    assert cells.define('var:b', 'a * 100', CONTEXT, name='b') == ['var:b', 'var:c', 'tab']
+    assert not cells.cells['var:a'].dirty
+    assert [cell.key for cell in cells.ready()] == ['var:b']
+    assert compute(cells) == ['var:b', 'var:c', 'tab']
+    assert cells.cells['tab'].value == decimal.Decimal('50.5')
+
+
+def test_cycles_are_refused(cells):
+    with pytest.raises(workspace.CycleError):
+        cells.define('var:a', 'c + 1', CONTEXT, name='a')
+    assert cells.cells['var:a'].text == '2'
+
+
+def test_names(cells):
+    with pytest.raises(workspace.NameClash):
+        cells.define('var:other', '1', CONTEXT, name='A')       # names ignore case
+    with pytest.raises(workspace.NameClash):
+        cells.define('var:ans', '1', CONTEXT, name='ans')
+    with pytest.raises(engine.UndefinedName):
+        cells.define('var:d', 'nothing + 1', CONTEXT, name='d')
+    cells.rename('tab', 'Calc 1')
+    assert cells.lookup('calc1').key == 'tab'
+
+
+def test_fixed_names_are_not_cells(cells):
+    cells.define('tab', 'ans + a', CONTEXT, fixed={workspace.ANS: 40})
+    compute(cells)
+    assert cells.cells['tab'].value == 42 and cells.cells['tab'].deps == {'var:a'}
+
+
+def test_errors_propagate(cells):
+    cells.define('var:a', '1/0', CONTEXT, name='a')
+    with pytest.raises(decimal.DivisionByZero):
+        compute(cells)
+    cells.set_result('var:a', error='DivisionByZero')
+    compute(cells)
+    assert 'DivisionByZero' in cells.cells['var:b'].error
+    with pytest.raises(workspace.InputError):
+        cells.inputs('var:c')
+
+
+def test_remove_fails_dependents(cells):
+    assert cells.remove('var:c') == ['tab']
+    compute(cells)
+    assert cells.cells['tab'].error
+
+
+def test_scope(cells):
+    scope = cells.scope({workspace.ANS: 7})
+    assert scope['ans'] == 7 and scope['B'] == 20
+    with pytest.raises(KeyError):
+        scope['missing']
+    assert engine.evaluate('b + ans', CONTEXT, scope) == 27
+
+
+def test_split_assignment():
+    assert workspace.split_assignment('x = 2+3') == ('x', ' 2+3')
+    assert workspace.split_assignment('x == 2') == (None, 'x == 2')
+    assert workspace.split_assignment('2+3') == (None, '2+3')
+
+
+@pytest.mark.parametrize('value', [5, -3 ** 9000, decimal.Decimal('2.50'), decimal.Decimal('1E+5'), decimal.Decimal('-0.001')])
+def test_value_text_round_trip(value):
+    restored = workspace.parse_value(workspace.value_text(value))
+    assert restored == value and type(restored) is type(value)
@@ -0,0 +1,172 @@
+"""Unit conversion for Zenth, independent of Tk.
+
+Categories and units are read from units.json. Each unit maps onto its
+category's base unit as base = value * factor + offset. Factors and offsets
+are exact Fractions, so temperature scales are ordinary offset units, not a
+special case. For every pair of units in a category, the coefficients are
+worked out once when the category is built, so a conversion is a lookup plus
+one multiply-add:
+
+    to = (from * num + shift_num) / den
+
+Decimal values are converted exactly and rounded once, to the given
+context. Columns of floats are converted with NumPy when it is installed.
+"""
+import decimal
+import json
+import math
+import os
+from fractions import Fraction
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'units.json')
+VERSION = 1
+
+# Multiplications and additions in this context never round
+_EXACT = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+
+
+class UnitError(ValueError):
+    """Unknown category or unit, or a malformed units file."""
+
+
+_numpy = None
+
+def _load_numpy():
+    """The numpy module, imported on first bulk conversion, or False if it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try: import numpy as _numpy
+        except ImportError: _numpy = False
+    return _numpy
+
+
+class Unit:
+    __slots__ = ('name', 'factor', 'offset')
+
+    def __init__(self, name, factor, offset=0):
+        self.name, self.factor, self.offset = name, Fraction(factor), Fraction(offset)
+        if not self.factor: raise UnitError(f"unit {name!r} has a zero factor")
+
+    @property
+    def affine(self): return bool(self.offset)
+
+
+class _Pair:
+    """Coefficients of one conversion, to = (from * num + shift_num) / den, kept as Fractions, Decimals and floats."""
+    __slots__ = ('scale', 'shift', 'num', 'shift_num', 'den', 'float_scale', 'float_shift')
+
+    def __init__(self, source, target):
+        self.scale = source.factor / target.factor
+        self.shift = (source.offset - target.offset) / target.factor
+        # Integers over a common denominator, for exact Decimal arithmetic
+        self.den = self.scale.denominator * self.shift.denominator // math.gcd(self.scale.denominator, self.shift.denominator)
+        self.num = decimal.Decimal(self.scale.numerator * (self.den // self.scale.denominator))
+        self.shift_num = decimal.Decimal(self.shift.numerator * (self.den // self.shift.denominator))
+        self.float_scale, self.float_shift = float(self.scale), float(self.shift)
+
+    def convert(self, value, context=None):
+        """Convert one value: Decimal in gives Decimal rounded once to `context`,
+        float in gives float, int or Fraction in gives an exact Fraction."""
+        if isinstance(value, decimal.Decimal):
+            context = context or decimal.getcontext()
+            total = _EXACT.fma(value, self.num, self.shift_num)
+            return context.divide(total, self.den) if self.den != 1 else context.plus(total)
+        if isinstance(value, float): return value * self.float_scale + self.float_shift
+        return Fraction(value) * self.scale + self.shift
+
+
+class Category:
+    """A set of interconvertible units with every pairwise conversion precomputed."""
+    def __init__(self, name, units):
+        self.name = name
+        self.units = {unit.name: unit for unit in units}
+        if not self.units: raise UnitError(f"category {name!r} has no units")
+        self._pairs = {(a.name, b.name): _Pair(a, b) for a in units for b in units}
+
+    def __iter__(self): return iter(self.units)
+    def __len__(self): return len(self.units)
+    def __contains__(self, name): return name in self.units
+
+    def pair(self, source, target):
+        try: return self._pairs[source, target]
+        except KeyError: raise UnitError(f"{self.name} has no unit {source if source not in self.units else target!r}") from None
+
+    def convert(self, value, source, target, context=None):
+        return self.pair(source, target).convert(value, context)
+
+    def convert_many(self, values, source, target, context=None):
+        """Convert a column of values. Float columns (and NumPy arrays) are converted
+        in one vectorized step when NumPy is available; the result is then an array."""
+        pair = self.pair(source, target)
+        np = _load_numpy()
+        if np and _is_float_column(values, np): return np.asarray(values, dtype=float) * pair.float_scale + pair.float_shift
+        return [pair.convert(value, context) for value in values]
+
+    def convert_all(self, value, source, context=None):
+        """{unit: value in that unit} for every unit of the category, in one pass.
+        `value` may also be a column, giving {unit: column}."""
+        pairs = [(target, self.pair(source, target)) for target in self.units]
+        if isinstance(value, (decimal.Decimal, float, int, Fraction)):
+            return {target: pair.convert(value, context) for target, pair in pairs}
+        np = _load_numpy()
+        if np and _is_float_column(value, np):
+            # One broadcast multiply-add gives a column per unit
+            scales = np.array([pair.float_scale for _, pair in pairs])
+            shifts = np.array([pair.float_shift for _, pair in pairs])
+            table = np.asarray(value, dtype=float)[:, None] * scales + shifts
+            return {target: table[:, i] for i, (target, _) in enumerate(pairs)}
+        values = list(value)
+        return {target: [pair.convert(v, context) for v in values] for target, pair in pairs}
+
+
+def _is_float_column(values, np):
+    if isinstance(values, np.ndarray): return values.dtype.kind in 'fiu'
+    return isinstance(values, (list, tuple)) and bool(values) and all(type(v) is float for v in values)
+
+
+class Registry:
+    """Categories by name, in the order they were registered."""
+    def __init__(self, categories=()):
+        self.categories = {}
+        for category in categories: self.register(category)
+
+    def register(self, category):
+        self.categories[category.name] = category
+        return category
+
+    def __getitem__(self, name):
+        try: return self.categories[name]
+        except KeyError: raise UnitError(f"no unit category {name!r}") from None
+
+    def __iter__(self): return iter(self.categories)
+    def __len__(self): return len(self.categories)
+
+    def convert(self, value, category, source, target, context=None):
+        return self[category].convert(value, source, target, context)
+
+    @classmethod
+    def from_file(cls, path=DATA_FILE):
+        """Load a units file: {"version": 1, "categories": {category: {unit: spec}}}, where a spec
+        is a factor such as "0.3048" or "5/9", or {"factor": ..., "offset": ...}."""
+        try:
+            with open(path, encoding='utf-8') as f: data = json.load(f)
+            if data.get('version') != VERSION: raise UnitError(f"{path}: unsupported units file version {data.get('version')!r}")
+            return cls(Category(name, [_parse_unit(unit, spec) for unit, spec in units.items()])
+                       for name, units in data['categories'].items())
+        except UnitError: raise
+        except (KeyError, TypeError, AttributeError, ValueError, ZeroDivisionError) as exc:
+            raise UnitError(f"{path}: malformed units file ({exc})") from None
+
+
+def _parse_unit(name, spec):
+    if isinstance(spec, dict): return Unit(name, Fraction(spec['factor']), Fraction(spec.get('offset', 0)))
+    return Unit(name, Fraction(spec))
+
+
+_default = None
+
+def default_registry():
+    """The registry from the bundled units.json, loaded on first use."""
+    global _default
+    if _default is None: _default = Registry.from_file()
+    return _default
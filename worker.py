@@ -0,0 +1,260 @@
+"""Background evaluation pool for Zenth.
+
+Jobs run in separate processes so big-integer work never blocks the Tk
+mainloop. Running jobs can be cancelled or timed out by terminating the
+worker process, which is respawned on demand. Nothing here imports tkinter;
+the GUI calls `poll()` from an `after()` loop to collect results.
+
+Workers are started with spawn, which re-imports the parent's main module in
+each child. Under the GUI that is Zenth.py, so a worker does import tkinter,
+though it never creates a Tk instance or runs any of the GUI; the cost is
+that import, once per worker start.
+"""
+import decimal
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing.reduction import ForkingPickler
+
+import bignum
+import constants
+import engine
+import factorial
+import kernels
+import table
+
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_PROCESSES = max(1, min(4, (os.cpu_count() or 2) - 1))
+SEND_ATTEMPTS = 3           # worker processes tried for a job before it fails
+
+# normalize() rounds to its context's precision; this one never rounds
+_EXACT = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED, TIMED_OUT = 'pending', 'running', 'done', 'failed', 'cancelled', 'timed out'
+
+
+# --- Tasks (run inside worker processes) ---
+
+def to_result(value):
+    """Calculator result for a Decimal or int: a BigResult for integers, plain text otherwise."""
+    if type(value) is int: return bignum.BigResult(value)
+    value = value.normalize(_EXACT)
+    if value == value.to_integral_value(): return bignum.BigResult(int(value))
+    return str(value)
+
+def format_preview(value, digits):
+    """Display text for a result computed to `digits` digits; never expands huge integers."""
+    if type(value) is int: return bignum.BigResult(value).display()
+    value = value.normalize(_EXACT)
+    if value == value.to_integral_value() and value.adjusted() < digits: return f"{int(value):,}"
+    return str(value)
+
+def describe_error(exc):
+    """Short message for a failed task; decimal signals only carry a list of classes."""
+    if isinstance(exc, decimal.DecimalException): return type(exc).__name__
+    return f"{type(exc).__name__}: {exc}"
+
+def format_plain(value, digits):
+    """Ungrouped text for a result computed to `digits` digits, as written by the CLI.
+    Exact integers are written in full."""
+    if type(value) is int: return bignum.to_decimal_string(value)
+    value = value.normalize(_EXACT)
+    if value == value.to_integral_value() and value.adjusted() < digits: return format(value, 'f')
+    return str(value)
+
+def evaluate_cell_task(expression, context, names):
+    """Evaluate a workspace cell; returns its Decimal value (for the cells that use it)
+    and the result to display."""
+    value = engine.compile_expression(expression).evaluate_stable(context, names=names)
+    return value, to_result(value)
+
+def evaluate_batch_task(expressions, context):
+    """Evaluate many expressions in one round trip; returns (ok, text) per expression."""
+    results = []
+    for expression in expressions:
+        try: results.append((True, format_plain(engine.compile_expression(expression).evaluate_stable(context), context.prec)))
+        except Exception as exc: results.append((False, describe_error(exc)))
+    return results
+
+def table_batch_task(mode, text, variable, inputs, first, count, names, context):
+    """Evaluate rows first..first+count of a function table (see table.Table.batch_args).
+    A float batch comes back as a float64 array; a Decimal one as text per row, or that row's error."""
+    if mode == table.FLOAT: return table.evaluate_floats(text, variable, inputs.floats(first, count), names)
+    expression, bound, results = engine.compile_expression(text), dict(names), []
+    for value in inputs.decimals(first, count):
+        bound[variable] = value
+        try: results.append(format_plain(expression.evaluate_stable(context, names=bound), context.prec))
+        except Exception as exc: results.append(describe_error(exc))
+    return results
+
+# The scientific buttons that apply a function to the number in the entry
+FUNCTIONS = {
+    'sqrt': lambda value, context: value.sqrt(context),
+    'log': kernels.log10, 'ln': kernels.ln,
+    'sin': kernels.sin_degrees, 'cos': kernels.cos_degrees, 'tan': kernels.tan_degrees,
+}
+
+def function_task(name, value, context):
+    return str(FUNCTIONS[name](value, context))
+
+def pi_task(prec):
+    return str(constants.pi(prec))
+
+def factorial_task(num):
+    return bignum.BigResult(factorial.factorial(num))
+
+def full_text_task(result):
+    return result.full()
+
+
+def _worker_main(conn):
+    if hasattr(sys, 'set_int_max_str_digits'): sys.set_int_max_str_digits(0)
+    while True:
+        try: message = conn.recv()
+        except EOFError: return
+        if message is None: return
+        job_id, func, args = message
+        try: conn.send((job_id, True, func(*args)))
+        except Exception as exc: conn.send((job_id, False, describe_error(exc)))
+
+
+# --- Pool ---
+
+class Job:
+    __slots__ = ('id', 'func', 'args', 'timeout', 'callback', 'state', 'result', 'error', 'started', 'finished')
+
+    def __init__(self, job_id, func, args, timeout, callback):
+        self.id, self.func, self.args, self.timeout, self.callback = job_id, func, args, timeout, callback
+        self.state, self.result, self.error = PENDING, None, None
+        self.started = self.finished = None
+
+    @property
+    def active(self): return self.state in (PENDING, RUNNING)
+
+
+class _Slot:
+    """One worker process and the pipe used to talk to it."""
+    __slots__ = ('process', 'conn', 'job')
+
+    def __init__(self, mp_context):
+        self.conn, child_conn = mp_context.Pipe()
+        self.process = mp_context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.job = None
+
+    def kill(self):
+        try: self.process.terminate(); self.process.join(1)
+        except (OSError, ValueError): pass
+        self.conn.close()
+
+
+class EvaluationWorker:
+    """A small process pool with per-job timeouts and hard cancellation."""
+    def __init__(self, processes=DEFAULT_PROCESSES, timeout=DEFAULT_TIMEOUT):
+        self.processes = processes
+        self.timeout = timeout
+        # spawn starts children without the parent's Tk state on every platform
+        self._mp = multiprocessing.get_context('spawn')
+        self._slots = []
+        self._queue = deque()
+        self._failed = []           # jobs that never reached a worker, reported by the next poll()
+        self._ids = itertools.count(1)
+
+    @property
+    def pending(self):
+        return bool(self._queue or self._failed) or any(slot.job for slot in self._slots)
+
+    def warm_up(self):
+        """Start the worker processes ahead of the first job."""
+        while len(self._slots) < self.processes: self._slots.append(_Slot(self._mp))
+
+    def submit(self, func, *args, timeout=None, callback=None):
+        job = Job(next(self._ids), func, args, self.timeout if timeout is None else timeout, callback)
+        self._queue.append(job)
+        self._dispatch()
+        return job
+
+    def cancel(self, job):
+        if job is None or not job.active: return
+        if job.state == PENDING:
+            self._queue.remove(job)
+        else:
+            for slot in self._slots:
+                if slot.job is job: self._replace(slot)
+        job.state, job.finished = CANCELLED, time.monotonic()
+
+    def wait(self, timeout=None):
+        """Block until a running job finishes, fails or times out (or `timeout` passes), then poll()."""
+        busy = [slot for slot in self._slots if slot.job]
+        if busy and not self._failed:
+            now = time.monotonic()
+            limits = [slot.job.started + slot.job.timeout - now for slot in busy if slot.job.timeout]
+            if timeout is not None: limits.append(timeout)
+            handles = [slot.conn for slot in busy] + [slot.process.sentinel for slot in busy]
+            multiprocessing.connection.wait(handles, max(0, min(limits)) if limits else None)
+        return self.poll()
+
+    def poll(self):
+        """Collect finished and timed-out jobs and run their callbacks. Never blocks."""
+        now, finished = time.monotonic(), []
+        for slot in list(self._slots):
+            job = slot.job
+            if job is None: continue
+            try:
+                if slot.conn.poll():
+                    job_id, ok, value = slot.conn.recv()
+                    slot.job = None
+                    if ok: job.state, job.result = DONE, value
+                    else: job.state, job.error = FAILED, value
+                elif not slot.process.is_alive():
+                    self._replace(slot); job.state, job.error = FAILED, "Worker process exited"
+                elif job.timeout and now - job.started > job.timeout:
+                    self._replace(slot); job.state, job.error = TIMED_OUT, "Timed out"
+                else: continue
+            except (EOFError, OSError):
+                self._replace(slot); job.state, job.error = FAILED, "Worker process exited"
+            job.finished = now
+            finished.append(job)
+        self._dispatch()
+        finished += self._failed; self._failed = []
+        for job in finished:
+            if job.callback: job.callback(job)
+        return finished
+
+    def shutdown(self):
+        for job in self._queue: job.state = CANCELLED
+        self._queue.clear()
+        for slot in self._slots: slot.kill()
+        self._slots.clear()
+
+    def _replace(self, slot):
+        slot.kill()
+        self._slots.remove(slot)
+
+    def _dispatch(self):
+        while self._queue:
+            slot = next((s for s in self._slots if s.job is None), None)
+            if slot is None and len(self._slots) >= self.processes: return
+            job = self._queue.popleft()
+            # Pickled once, here, so a job that cannot be pickled fails alone and costs no worker
+            try: message = ForkingPickler.dumps((job.id, job.func, job.args))
+            except Exception as exc: self._fail(job, describe_error(exc)); continue
+            for _ in range(SEND_ATTEMPTS):
+                try:
+                    if slot is None: slot = _Slot(self._mp); self._slots.append(slot)
+                    slot.conn.send_bytes(message)
+                    break
+                except (OSError, ValueError):
+                    if slot is not None: self._replace(slot); slot = None
+            else:
+                self._fail(job, "Could not start a worker process"); continue
+            slot.job, job.state, job.started = job, RUNNING, time.monotonic()
+
+    def _fail(self, job, error):
+        job.state, job.error, job.finished = FAILED, error, time.monotonic()
+        self._failed.append(job)
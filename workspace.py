@@ -0,0 +1,223 @@
+"""Variables and cross-tab references for Zenth, recomputed incrementally.
+
+A workspace holds cells: each tab's last calculation and every variable
+assigned with `name = expression`. A cell can use other cells by name (tab
+names as `[Tab name]`; names compare without spaces or case), plus `ans`,
+the tab's previous result, which is fixed when the cell is defined.
+
+Cells form a dependency graph. Redefining a cell marks it and everything
+downstream dirty. `ready()` yields the dirty cells whose inputs are all up
+to date, so a caller can evaluate those in parallel and then ask again.
+Cells are recomputed in topological order and only when an input changed.
+Nothing here imports tkinter or runs evaluations itself.
+"""
+import decimal
+import re
+
+import bignum
+import engine
+
+ANS = 'ans'
+
+_ASSIGNMENT_RE = re.compile(r'^\s*([^\W\d]\w*)\s*=(?!=)(.*)$', re.DOTALL)
+
+
+class CycleError(ValueError):
+    """Raised when a definition would make a cell depend on itself."""
+
+class NameClash(ValueError):
+    """Raised when a variable would take a name already used by a tab or a reserved name."""
+
+class InputError(ValueError):
+    """Raised when a cell cannot be evaluated because one of its inputs failed."""
+
+
+def name_key(name):
+    """Names compare without whitespace and case, so [Calc 1] finds a tab named "calc 1"."""
+    return ''.join(name.split()).casefold()
+
+def value_text(value):
+    """Text for a cell value, as saved with a session; ints are written in full."""
+    return bignum.to_decimal_string(value) if type(value) is int else str(value)
+
+def parse_value(text):
+    """The value value_text() wrote. Integral text without an exponent comes back as an int."""
+    value = decimal.Decimal(text)
+    return int(value) if value.as_tuple().exponent == 0 else value
+
+def split_assignment(text):
+    """(variable name, expression) for `name = expression`, else (None, text)."""
+    match = _ASSIGNMENT_RE.match(text)
+    if match: return match.group(1), match.group(2)
+    return None, text
+
+
+class Cell:
+    __slots__ = ('key', 'name', 'text', 'expression', 'context', 'fixed', 'inputs', 'deps', 'dependents',
+                 'value', 'error', 'dirty')
+
+    def __init__(self, key):
+        self.key = key
+        self.name = None            # the name other cells use for it, if any
+        self.text = ''
+        self.expression = None
+        self.context = None
+        self.fixed = {}             # names bound when the cell was defined, such as ans
+        self.inputs = {}            # name as written -> key of the cell it refers to
+        self.deps = set()           # keys of cells this one uses
+        self.dependents = set()     # keys of cells that use this one
+        self.value = None           # Decimal, or an int when exact, once computed
+        self.error = None
+        self.dirty = False
+
+
+class Workspace:
+    """Cells by key, with their names and dependency edges."""
+    def __init__(self):
+        self.cells = {}
+        self._names = {}            # name_key -> cell key
+        self._dirty = set()         # keys of dirty cells
+        self.version = 0            # bumped whenever a value or a name changes
+
+    def lookup(self, name):
+        """The cell a name refers to, or None."""
+        key = self._names.get(name_key(name))
+        return self.cells.get(key) if key is not None else None
+
+    def scope(self, fixed=None):
+        """A read-only mapping for previews: names resolve to the current values."""
+        return _Scope(self, fixed or {})
+
+    # --- Definitions ---
+
+    def define(self, key, text, context, name=None, fixed=None):
+        """Set the expression of cell `key` (creating it), optionally giving it a name.
+        Returns the keys now needing recomputation, in topological order."""
+        expression = engine.compile_expression(text)
+        fixed = dict(fixed or {})
+        inputs = {}
+        for written in expression.names:
+            if written in fixed: continue
+            cell = self.lookup(written)
+            if cell is None: raise engine.UndefinedName(written)
+            inputs[written] = cell.key
+        if key in self._upstream(inputs.values()):
+            raise CycleError(f"{text.strip()!r} would depend on itself")
+        if name is not None:
+            owner = self._names.get(name_key(name))
+            if name_key(name) == ANS or owner is not None and owner != key:
+                raise NameClash(f"The name {name!r} is already in use")
+
+        cell = self.cells.get(key)
+        if cell is None: cell = self.cells[key] = Cell(key)
+        for dep in cell.deps: self.cells[dep].dependents.discard(key)
+        cell.text, cell.expression, cell.context, cell.fixed = text, expression, context, fixed
+        cell.inputs, cell.deps = inputs, set(inputs.values())
+        for dep in cell.deps: self.cells[dep].dependents.add(key)
+        if name is not None: self._name(cell, name)
+        return self.invalidate(key)
+
+    def rename(self, key, name):
+        """Give a cell a new name. A name already taken by another cell is not claimed."""
+        cell = self.cells.get(key)
+        if cell is None: return
+        if self._names.get(name_key(name), key) == key: self._name(cell, name)
+        else: self._unname(cell)
+
+    def remove(self, key):
+        """Drop a cell. Cells that used it are marked dirty and will fail until redefined.
+        Returns the keys needing recomputation."""
+        cell = self.cells.pop(key, None)
+        if cell is None: return []
+        self._dirty.discard(key)
+        self._unname(cell)
+        for dep in cell.deps: self.cells[dep].dependents.discard(key)
+        dirty = []
+        for dependent in cell.dependents: dirty.extend(self.invalidate(dependent))
+        return dirty
+
+    def _name(self, cell, name):
+        self._unname(cell)
+        cell.name = name
+        self._names[name_key(name)] = cell.key
+        self.version += 1
+
+    def _unname(self, cell):
+        if cell.name is not None and self._names.get(name_key(cell.name)) == cell.key:
+            del self._names[name_key(cell.name)]
+            self.version += 1
+        cell.name = None
+
+    # --- Graph ---
+
+    def _upstream(self, keys):
+        """`keys` and the keys of every cell they depend on, directly or not."""
+        seen, stack = set(keys), list(keys)
+        while stack:
+            cell = self.cells.get(stack.pop())
+            if cell is None: continue
+            for dep in cell.deps:
+                if dep not in seen: seen.add(dep); stack.append(dep)
+        return seen
+
+    def invalidate(self, key):
+        """Mark a cell and everything downstream dirty; returns their keys in topological order."""
+        # Depth-first post-order over dependents gives a reverse topological order
+        order, seen, stack = [], {key}, [(key, iter(self.cells[key].dependents))]
+        while stack:
+            k, dependents = stack[-1]
+            dependent = next((d for d in dependents if d not in seen), None)
+            if dependent is None:
+                stack.pop(); order.append(k)
+            else:
+                seen.add(dependent); stack.append((dependent, iter(self.cells[dependent].dependents)))
+        order.reverse()
+        for k in order: self.cells[k].dirty = True
+        self._dirty.update(order)
+        return order
+
+    def _is_ready(self, cell):
+        return cell.dirty and not any(self.cells[dep].dirty for dep in cell.deps if dep in self.cells)
+
+    def ready(self):
+        """Dirty cells none of whose inputs are dirty; they can be evaluated together."""
+        return [cell for cell in map(self.cells.get, self._dirty) if self._is_ready(cell)]
+
+    # --- Evaluation ---
+
+    def inputs(self, key):
+        """{name as written: value} for evaluating a cell. Raises InputError if an input
+        failed or is gone, so the cell can be failed without evaluating it."""
+        cell = self.cells[key]
+        names = dict(cell.fixed)
+        for written, dep in cell.inputs.items():
+            source = self.cells.get(dep)
+            if source is None: raise engine.UndefinedName(written)
+            if source.error is not None: raise InputError(f"{written}: {source.error}")
+            if source.value is None: raise InputError(f"{written} has no value")
+            names[written] = source.value
+        return names
+
+    def set_result(self, key, value=None, error=None):
+        """Record a cell's new value (or error). Returns the dependents that this made
+        ready, so a caller can go on without scanning for them."""
+        cell = self.cells.get(key)
+        if cell is None: return []
+        cell.value, cell.error, cell.dirty = value, error, False
+        self._dirty.discard(key)
+        self.version += 1
+        return [dependent for dependent in map(self.cells.get, cell.dependents) if self._is_ready(dependent)]
+
+
+class _Scope:
+    """Mapping view of a workspace for engine lookups."""
+    __slots__ = ('workspace', 'fixed')
+
+    def __init__(self, workspace, fixed):
+        self.workspace, self.fixed = workspace, fixed
+
+    def __getitem__(self, name):
+        if name in self.fixed: return self.fixed[name]
+        cell = self.workspace.lookup(name)
+        if cell is None or cell.value is None: raise KeyError(name)
+        return cell.value
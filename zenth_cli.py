@@ -0,0 +1,157 @@
+"""Headless batch evaluation: python -m zenth_cli [files...]
+
+Reads one expression per line from files or stdin and evaluates them with
+Zenth's engine in a pool of worker processes. Results are written in input
+order as soon as they are ready. Nothing here imports tkinter.
+
+Expressions are sent to the workers in chunks, and --timeout limits each
+chunk. A chunk that runs out of time is rerun one expression at a time, each
+with the full limit, so an expression only fails with a timeout when it takes
+that long on its own; a chunk of many slow expressions costs the rerun.
+"""
+import argparse
+import csv
+import decimal
+import json
+import os
+import sys
+from collections import deque
+
+import worker
+
+DEFAULT_PRECISION = 100
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_CHUNK_SIZE = 256
+BATCHES_PER_PROCESS = 4     # chunks queued ahead per process, bounding memory on huge inputs
+ROUNDING = {name[len('ROUND_'):].lower(): getattr(decimal, name) for name in dir(decimal) if name.startswith('ROUND_')}
+
+
+def read_expressions(paths):
+    """Yield (line number, expression) for every non-blank, non-comment input line."""
+    number = 0
+    for path in paths or ['-']:
+        f = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            for line in f:
+                number += 1
+                line = line.strip()
+                if line and not line.startswith('#'): yield number, line
+        finally:
+            if f is not sys.stdin: f.close()
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size: yield chunk; chunk = []
+    if chunk: yield chunk
+
+
+class _Batch:
+    """A chunk of input lines and the jobs evaluating it."""
+    __slots__ = ('lines', 'parts', 'results')
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.parts = []         # (start, end, job) over self.lines
+        self.results = [None] * len(lines)
+
+    def submit(self, pool, context, start=0, end=None):
+        end = len(self.lines) if end is None else end
+        expressions = [expression for _, expression in self.lines[start:end]]
+        self.parts.append((start, end, pool.submit(worker.evaluate_batch_task, expressions, context)))
+
+    def collect(self, pool, context):
+        """Take results from finished jobs. A chunk that timed out or crashed is retried
+        one expression at a time, each with the whole timeout, so only the culprit gets the error."""
+        remaining = []
+        for start, end, job in self.parts:
+            if job.active: remaining.append((start, end, job)); continue
+            if job.state == worker.DONE: self.results[start:end] = job.result
+            elif end - start > 1:
+                for index in range(start, end):
+                    remaining.append((index, index + 1, pool.submit(worker.evaluate_batch_task, [self.lines[index][1]], context)))
+            else: self.results[start] = (False, job.error)
+        self.parts = remaining
+        return not remaining
+
+
+class _Writer:
+    def __init__(self, out, fmt):
+        self.out, self.fmt = out, fmt
+        self.errors = 0
+        if fmt == 'csv':
+            self._csv = csv.writer(out)
+            self._csv.writerow(('line', 'expression', 'result', 'error'))
+
+    def write(self, number, expression, ok, text):
+        if not ok: self.errors += 1
+        if self.fmt == 'jsonl':
+            record = {'line': number, 'expression': expression, 'result' if ok else 'error': text}
+            self.out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        elif self.fmt == 'csv':
+            self._csv.writerow((number, expression, text if ok else '', '' if ok else text))
+        else:
+            self.out.write((text if ok else 'Error') + '\n')
+            if not ok: print(f"zenth: line {number}: {text}", file=sys.stderr)
+
+
+def run(expressions, context, writer, processes, timeout, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Evaluate (line number, expression) pairs, writing results in input order."""
+    pool = worker.EvaluationWorker(processes=processes, timeout=timeout)
+    chunks, window = _chunks(expressions, chunk_size), deque()
+    try:
+        while True:
+            while len(window) < processes * BATCHES_PER_PROCESS:
+                lines = next(chunks, None)
+                if lines is None: break
+                batch = _Batch(lines)
+                batch.submit(pool, context)
+                window.append(batch)
+            if not window: return
+            pool.wait()
+            for batch in window: batch.collect(pool, context)
+            while window and not window[0].parts:
+                batch = window.popleft()
+                for (number, expression), (ok, text) in zip(batch.lines, batch.results):
+                    writer.write(number, expression, ok, text)
+                writer.out.flush()
+    finally:
+        pool.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m zenth_cli', description="Evaluate Zenth expressions, one per line, from files or stdin.")
+    parser.add_argument('files', nargs='*', help="input files; '-' or none reads stdin")
+    parser.add_argument('-p', '--precision', type=int, default=DEFAULT_PRECISION, help=f"significant digits (default {DEFAULT_PRECISION})")
+    parser.add_argument('-r', '--rounding', choices=sorted(ROUNDING), default='half_even')
+    parser.add_argument('-f', '--format', choices=('text', 'jsonl', 'csv'), default='text')
+    parser.add_argument('-o', '--output', help="write results to this file instead of stdout")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help="worker processes (default: all cores)")
+    parser.add_argument('-t', '--timeout', type=float, default=DEFAULT_TIMEOUT, help=f"seconds allowed per chunk of expressions; a chunk that runs out is retried one expression at a time (default {DEFAULT_TIMEOUT:g})")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="expressions sent to a worker at once")
+    args = parser.parse_args(argv)
+    if not 1 <= args.precision <= decimal.MAX_PREC: parser.error("precision out of range")
+    if args.jobs < 1 or args.chunk_size < 1: parser.error("--jobs and --chunk-size must be positive")
+
+    context = decimal.Context(prec=args.precision, rounding=ROUNDING[args.rounding])
+    try: out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    except OSError as exc:
+        print(f"zenth: {exc}", file=sys.stderr)
+        return 2
+    try:
+        writer = _Writer(out, args.format)
+        run(read_expressions(args.files), context, writer, args.jobs, args.timeout, args.chunk_size)
+    except KeyboardInterrupt:
+        return 130
+    except OSError as exc:
+        print(f"zenth: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if out is not sys.stdout: out.close()
+    return 1 if writer.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())